@@ -0,0 +1,256 @@
+"""Measure how the command layer scales with the number of receivers.
+
+Run from the repository root:
+
+    python benchmarks/bench_hub.py [--ports 1,4,8,16] [--duration S] [--json FILE]
+
+Every port gets its own simulated receiver, each in a separate process so
+its threads and CPU time do not count against the integration. Each
+receiver is polled back to back while user commands arrive, in three
+setups:
+
+- executor: the threaded Denon232Receiver, every call an executor job,
+  as entities calling it from Home Assistant would
+- tasks: one AsyncDenon232Receiver per port, each with its own scheduler
+- hub: the same receivers serviced by one Denon232Hub
+
+Reported per setup and port count: commands written per second, latency
+of user commands, CPU time per command, the most threads seen, and the
+fewest and most commands any one port got through (fairness).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from common import ROOT, load_integration, summarize, write_results
+
+const = load_integration("const")
+Denon232Receiver = load_integration("denon232_receiver").Denon232Receiver
+AsyncDenon232Receiver = load_integration("async_receiver").AsyncDenon232Receiver
+Denon232Hub = load_integration("hub").Denon232Hub
+
+SIMULATOR = ROOT / "tools" / "avr_simulator.py"
+# Alternating steps are never merged, so every one reaches the wire
+LOAD_COMMANDS = ["MVUP", "MVDOWN"]
+# Pause between user commands on each port
+PRESS_INTERVAL = 0.05
+# Home Assistant's default executor is sized about like this
+EXECUTOR_WORKERS = 16
+
+
+def start_simulators(count: int, directory: str, latency: float) -> list:
+    """Start count simulator processes, return them with their paths."""
+    processes = []
+    for index in range(count):
+        link = os.path.join(directory, f"denon{index}")
+        process = subprocess.Popen(
+            [sys.executable, str(SIMULATOR), "--link", link, "--latency", str(latency)],
+            stdout=subprocess.DEVNULL,
+        )
+        processes.append((process, link))
+    deadline = time.monotonic() + 10
+    for _, link in processes:
+        while not os.path.lexists(link):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"simulator at {link} did not start")
+            time.sleep(0.01)
+    return processes
+
+
+def stop_simulators(processes: list) -> None:
+    """Stop the simulator processes."""
+    for process, _ in processes:
+        process.terminate()
+    for process, _ in processes:
+        process.wait()
+
+
+class Probe:
+    """Track CPU time and the most threads alive while a setup runs."""
+
+    def __init__(self) -> None:
+        """Start measuring."""
+        self.peak_threads = threading.active_count()
+        self._start = resource.getrusage(resource.RUSAGE_SELF)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(0.05):
+            # Not counting the probe itself
+            self.peak_threads = max(self.peak_threads, threading.active_count() - 1)
+
+    def finish(self) -> float:
+        """Stop measuring and return the CPU seconds used."""
+        self._stop.set()
+        self._thread.join()
+        end = resource.getrusage(resource.RUSAGE_SELF)
+        return (end.ru_utime - self._start.ru_utime) + (
+            end.ru_stime - self._start.ru_stime
+        )
+
+
+async def drive(receiver, duration: float, presses: list[float]) -> int:
+    """Poll one receiver and press buttons on it, return commands written."""
+    end = time.monotonic() + duration
+    written = 0
+
+    async def poll() -> None:
+        nonlocal written
+        while time.monotonic() < end:
+            await receiver.batch_query(
+                const.POLL_QUERIES, pipelined=True, priority=1
+            )
+            written += len(const.POLL_QUERIES)
+
+    poller = asyncio.create_task(poll())
+    index = 0
+    while time.monotonic() < end:
+        await asyncio.sleep(PRESS_INTERVAL)
+        start = time.perf_counter()
+        await receiver.serial_command(LOAD_COMMANDS[index % 2])
+        presses.append(time.perf_counter() - start)
+        written += 1
+        index += 1
+    await poller
+    return written
+
+
+async def drive_executor(
+    loop, executor, receiver, duration: float, presses: list[float]
+) -> int:
+    """Poll one threaded receiver and press buttons, all as executor jobs."""
+    end = time.monotonic() + duration
+    written = 0
+
+    async def poll() -> None:
+        nonlocal written
+        while time.monotonic() < end:
+            await loop.run_in_executor(
+                executor, receiver.batch_query, const.POLL_QUERIES
+            )
+            written += len(const.POLL_QUERIES)
+
+    poller = asyncio.create_task(poll())
+    index = 0
+    while time.monotonic() < end:
+        await asyncio.sleep(PRESS_INTERVAL)
+        start = time.perf_counter()
+        await loop.run_in_executor(
+            executor, receiver.serial_command, LOAD_COMMANDS[index % 2]
+        )
+        presses.append(time.perf_counter() - start)
+        written += 1
+        index += 1
+    await poller
+    return written
+
+
+async def run_setup(setup: str, paths: list[str], duration: float) -> dict:
+    """Drive every port for duration seconds in one setup."""
+    loop = asyncio.get_running_loop()
+    presses: list[float] = []
+    hub = executor = None
+    if setup == "executor":
+        executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS)
+        receivers = [Denon232Receiver(path) for path in paths]
+    elif setup == "hub":
+        hub = Denon232Hub()
+        receivers = [hub.receiver(path) for path in paths]
+    else:
+        receivers = [AsyncDenon232Receiver(path) for path in paths]
+    if setup != "executor":
+        for receiver in receivers:
+            await receiver.connect()
+
+    probe = Probe()
+    start = time.perf_counter()
+    if setup == "executor":
+        counts = await asyncio.gather(
+            *(
+                drive_executor(loop, executor, receiver, duration, presses)
+                for receiver in receivers
+            )
+        )
+    else:
+        counts = await asyncio.gather(
+            *(drive(receiver, duration, presses) for receiver in receivers)
+        )
+    elapsed = time.perf_counter() - start
+    cpu = probe.finish()
+
+    if hub is not None:
+        hub.close()
+    else:
+        for receiver in receivers:
+            receiver.close()
+    if executor is not None:
+        executor.shutdown()
+
+    total = sum(counts)
+    return {
+        "commands_per_second": round(total / elapsed, 1),
+        "press": summarize(presses),
+        "cpu_us_per_command": round(cpu / total * 1_000_000, 1) if total else 0.0,
+        "peak_threads": probe.peak_threads,
+        "fewest_per_port": min(counts),
+        "most_per_port": max(counts),
+    }
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ports", default="1,4,8,16",
+                        help="comma separated receiver counts")
+    parser.add_argument("--duration", type=float, default=3.0,
+                        help="seconds each setup runs")
+    parser.add_argument("--latency", type=float, default=0.03,
+                        help="simulated reply latency")
+    parser.add_argument("--setups", default="executor,tasks,hub")
+    parser.add_argument("--json", metavar="FILE", help='write JSON results, "-" for stdout')
+    args = parser.parse_args()
+
+    results: dict = {"latency_s": args.latency, "duration_s": args.duration}
+    for count in (int(value) for value in args.ports.split(",")):
+        with tempfile.TemporaryDirectory() as directory:
+            processes = start_simulators(count, directory, args.latency)
+            try:
+                for setup in args.setups.split(","):
+                    result = asyncio.run(
+                        run_setup(setup, [link for _, link in processes], args.duration)
+                    )
+                    results.setdefault(setup, {})[str(count)] = result
+                    if args.json != "-":
+                        press = result["press"]
+                        print(
+                            f"{setup:8} {count:3} ports: "
+                            f"{result['commands_per_second']:7.1f} cmd/s, "
+                            f"press p50 {press['p50_ms']} ms p95 {press['p95_ms']} ms, "
+                            f"{result['cpu_us_per_command']:7.1f} us CPU/cmd, "
+                            f"{result['peak_threads']:3} threads, "
+                            f"per port {result['fewest_per_port']}-"
+                            f"{result['most_per_port']}",
+                            flush=True,
+                        )
+                    # Let the echoes of this setup drain before the next
+                    time.sleep(0.3)
+            finally:
+                stop_simulators(processes)
+
+    write_results(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
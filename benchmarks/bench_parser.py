@@ -0,0 +1,116 @@
+"""Measure how many status lines per second the protocol parser handles.
+
+Run from the repository root:
+
+    python benchmarks/bench_parser.py [--lines N] [--json]
+
+Also measures the line framer on the same traffic, received in chunks
+the size a serial read returns, with and without line noise in it.
+
+The parser and the framer have no Home Assistant dependencies, so the
+benchmark runs without a Home Assistant install.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from common import load_integration
+
+# Bytes per read when the receiver streams events
+CHUNK = 64
+
+# A mix of what a busy receiver sends: polled replies, knob turns,
+# surround and channel level events, zone 2 traffic and unknown lines
+SAMPLE_LINES = [
+    "PWON",
+    "MV50",
+    "MV505",
+    "MVMAX 98",
+    "MUOFF",
+    "SIDVD",
+    "MSDOLBY DIGITAL",
+    "CVFL 50",
+    "CVSW 00",
+    "CVC 505",
+    "Z2ON",
+    "Z245",
+    "Z2CD",
+    "Z2MUOFF",
+    "Z2CVFL 48",
+    "SDAUTO",
+    "PSTONE CTRL OFF",
+]
+
+
+def throughput(total_lines: int, elapsed: float) -> dict[str, float]:
+    """Return the figures for total_lines handled in elapsed seconds."""
+    return {
+        "lines": total_lines,
+        "seconds": round(elapsed, 4),
+        "lines_per_second": round(total_lines / elapsed),
+        "ns_per_line": round(elapsed / total_lines * 1e9, 1),
+    }
+
+
+def run(total_lines: int) -> dict[str, float]:
+    """Parse total_lines lines and return the throughput."""
+    parse_line = load_integration("parser").parse_line
+    lines = (SAMPLE_LINES * (total_lines // len(SAMPLE_LINES) + 1))[:total_lines]
+
+    start = time.perf_counter()
+    for line in lines:
+        parse_line(line)
+    elapsed = time.perf_counter() - start
+    return throughput(total_lines, elapsed)
+
+
+def run_framer(total_lines: int, noise: bool = False) -> dict[str, float]:
+    """Frame total_lines lines received in chunks, return the throughput.
+
+    With noise, one line in a hundred has a byte that is not ASCII.
+    """
+    framer = load_integration("framing").LineFramer()
+    lines = (SAMPLE_LINES * (total_lines // len(SAMPLE_LINES) + 1))[:total_lines]
+    stream = bytearray()
+    for index, line in enumerate(lines):
+        stream += line.encode("ascii")
+        if noise and index % 100 == 0:
+            stream += b"\xfe"
+        stream += b"\r"
+    chunks = [bytes(stream[i : i + CHUNK]) for i in range(0, len(stream), CHUNK)]
+
+    start = time.perf_counter()
+    for chunk in chunks:
+        framer.feed(chunk)
+    elapsed = time.perf_counter() - start
+    return throughput(total_lines, elapsed)
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--json", action="store_true", help="print JSON only")
+    args = parser.parse_args()
+
+    results = {
+        "parser": run(args.lines),
+        "framer": run_framer(args.lines),
+        "framer_noisy": run_framer(args.lines, noise=True),
+    }
+    if args.json:
+        print(json.dumps(results))
+        return
+    for name, result in results.items():
+        print(
+            f"{name}: {result['lines']} lines in {result['seconds']} s: "
+            f"{result['lines_per_second']:,} lines/s "
+            f"({result['ns_per_line']} ns/line)"
+        )
+
+
+if __name__ == "__main__":
+    main()
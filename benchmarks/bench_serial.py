@@ -0,0 +1,242 @@
+"""Measure the serial command layer against the simulated receiver.
+
+Run from the repository root:
+
+    python benchmarks/bench_serial.py [--iterations N] [--json FILE]
+
+Reports, for the threaded and the asyncio receiver:
+
+- round trip of a single query (serial_command with a response)
+- duration of a poll cycle for each zone and for the whole receiver,
+  sequential and pipelined
+- commands per second under sustained load, counted until the receiver
+  echoed the last one
+- latency of user commands while the coordinator keeps polling
+
+Pass --json - to print the results as JSON, or a file name to write them
+there and compare runs across commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import threading
+import time
+
+from common import SimulatedAVR, load_integration, summarize, write_results
+
+const = load_integration("const")
+Denon232Receiver = load_integration("denon232_receiver").Denon232Receiver
+AsyncDenon232Receiver = load_integration("async_receiver").AsyncDenon232Receiver
+
+CYCLES = {
+    "main": const.MAIN_ZONE_QUERIES,
+    "zone2": const.ZONE2_QUERIES,
+    "full": const.POLL_QUERIES,
+}
+# Alternating steps are never merged, so every one reaches the wire
+LOAD_COMMANDS = ["MVUP", "MVDOWN"]
+# How long the echoes of a load run may trail its last write
+ECHO_TIMEOUT = 10.0
+
+
+def timed(func, *args, **kwargs) -> float:
+    """Return how long a call took."""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+async def timed_async(coro) -> float:
+    """Return how long awaiting coro took."""
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+class EchoCounter:
+    """Count the receiver's echoes of the load commands as they arrive.
+
+    A write only fills a buffer; a command is done once the receiver took
+    it and answered with the new volume.
+    """
+
+    def __init__(self, expected: int) -> None:
+        """Wait for expected echoes."""
+        self.expected = expected
+        self.count = 0
+        self.last = 0.0
+        self.done = threading.Event()
+
+    def __call__(self, line: str, *_event) -> None:
+        """Listener of either receiver."""
+        if line.startswith("MV") and not line.startswith("MVMAX"):
+            self.count += 1
+            self.last = time.perf_counter()
+            if self.count >= self.expected:
+                self.done.set()
+
+    def rate(self, start: float) -> float:
+        """Return the echoed commands per second since start."""
+        return round(self.count / (self.last - start), 1) if self.count else 0.0
+
+
+def bench_sync(path: str, iterations: int) -> dict:
+    """Benchmark Denon232Receiver."""
+    receiver = Denon232Receiver(path)
+    try:
+        results = {
+            "round_trip": summarize(
+                [timed(receiver.serial_command, "PW?", True) for _ in range(iterations)]
+            )
+        }
+        for zone, queries in CYCLES.items():
+            for pipelined in (False, True):
+                name = f"poll_{zone}_{'pipelined' if pipelined else 'sequential'}"
+                results[name] = summarize(
+                    [
+                        timed(receiver.batch_query, queries, pipelined=pipelined)
+                        for _ in range(iterations)
+                    ]
+                )
+
+        count = iterations * 10
+        echoes = EchoCounter(count)
+        receiver.start_listener()
+        remove = receiver.add_listener(echoes)
+        start = time.perf_counter()
+        for i in range(count):
+            receiver.serial_command(LOAD_COMMANDS[i % 2])
+        echoes.done.wait(ECHO_TIMEOUT)
+        remove()
+        results["commands_per_second"] = echoes.rate(start)
+    finally:
+        receiver.close()
+    return results
+
+
+async def bench_async(path: str, iterations: int) -> dict:
+    """Benchmark AsyncDenon232Receiver."""
+    receiver = AsyncDenon232Receiver(path)
+    await receiver.connect()
+    try:
+        results = {
+            "round_trip": summarize(
+                [
+                    await timed_async(receiver.serial_command("PW?", True))
+                    for _ in range(iterations)
+                ]
+            )
+        }
+        for zone, queries in CYCLES.items():
+            for pipelined in (False, True):
+                name = f"poll_{zone}_{'pipelined' if pipelined else 'sequential'}"
+                results[name] = summarize(
+                    [
+                        await timed_async(
+                            receiver.batch_query(queries, pipelined=pipelined)
+                        )
+                        for _ in range(iterations)
+                    ]
+                )
+
+        # Everything queued at once, the scheduler keeps the wire busy
+        count = iterations * 10
+        echoes = EchoCounter(count)
+        remove = receiver.add_listener(echoes)
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(receiver.serial_command(LOAD_COMMANDS[i % 2]) for i in range(count))
+        )
+        deadline = time.perf_counter() + ECHO_TIMEOUT
+        while not echoes.done.is_set() and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        remove()
+        results["commands_per_second"] = echoes.rate(start)
+    finally:
+        receiver.close()
+    return results
+
+
+async def bench_contention(path: str, iterations: int) -> dict:
+    """Time user commands while full poll cycles run back to back."""
+    receiver = AsyncDenon232Receiver(path)
+    await receiver.connect()
+    try:
+        return await _contend(receiver, iterations)
+    finally:
+        receiver.close()
+
+
+async def _contend(receiver, iterations: int) -> dict:
+    polling = True
+    cycles: list[float] = []
+
+    async def poll() -> None:
+        while polling:
+            cycles.append(
+                await timed_async(receiver.batch_query(const.POLL_QUERIES, pipelined=True))
+            )
+
+    poller = asyncio.create_task(poll())
+    commands = []
+    queries = []
+    for i in range(iterations):
+        # Spread the presses over the poll cycle
+        await asyncio.sleep(0.037)
+        commands.append(await timed_async(receiver.serial_command(LOAD_COMMANDS[i % 2])))
+        queries.append(await timed_async(receiver.serial_command("MU?", True)))
+    polling = False
+    await poller
+    return {
+        "command": summarize(commands),
+        "query": summarize(queries),
+        "poll_cycle": summarize(cycles),
+        "queue_delay": receiver.queue_delay_stats(),
+    }
+
+
+def print_results(results: dict, indent: str = "") -> None:
+    """Print nested results as an indented listing."""
+    for name, value in results.items():
+        if isinstance(value, dict) and "p50_ms" not in value:
+            print(f"{indent}{name}:")
+            print_results(value, indent + "  ")
+        elif isinstance(value, dict):
+            print(
+                f"{indent}{name}: p50 {value['p50_ms']} ms, p95 {value['p95_ms']} ms, "
+                f"p99 {value['p99_ms']} ms, max {value['max_ms']} ms"
+            )
+        else:
+            print(f"{indent}{name}: {value}")
+
+
+def main() -> None:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument(
+        "--latency", type=float, default=0.03, help="simulated reply latency"
+    )
+    parser.add_argument("--json", metavar="FILE", help='write JSON results, "-" for stdout')
+    args = parser.parse_args()
+
+    results = {"latency_s": args.latency, "iterations": args.iterations}
+    with SimulatedAVR(latency=args.latency) as avr:
+        # Each run starts once the echoes of the previous one are through
+        results["sync"] = bench_sync(avr.path, args.iterations)
+        avr.wait_idle()
+        results["async"] = asyncio.run(bench_async(avr.path, args.iterations))
+        avr.wait_idle()
+        results["contention"] = asyncio.run(
+            bench_contention(avr.path, args.iterations)
+        )
+
+    if args.json != "-":
+        print_results(results)
+    write_results(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
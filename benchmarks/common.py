@@ -0,0 +1,63 @@
+"""Shared helpers for the benchmarks.
+
+The integration is imported with the tools' load_integration(), so the
+benchmarks run on a machine that only has pyserial.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(ROOT / "tools"))
+
+# pylint: disable=wrong-import-position
+from avr_simulator import SimulatedAVR  # noqa: E402
+from integration import load_integration  # noqa: E402
+
+# pylint: enable=wrong-import-position
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Return count and p50/p95/p99/max of samples in seconds, as ms."""
+    latencies = load_integration("stats").LatencySamples(window=len(samples) or 1)
+    for sample in samples:
+        latencies.add(sample)
+    return latencies.as_dict()
+
+
+def metadata() -> dict[str, str]:
+    """Describe what the results were measured on."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_results(results: dict, output: str | None) -> None:
+    """Write results as JSON to output, or to stdout for "-"."""
+    data = json.dumps({"meta": metadata(), **results}, indent=2)
+    if output == "-":
+        print(data)
+    elif output:
+        Path(output).write_text(data + "\n", encoding="utf-8")
+
+
+__all__ = ["SimulatedAVR", "load_integration", "summarize", "write_results"]
@@ -2,33 +2,103 @@
 from __future__ import annotations
 
 import logging
+import math
+from typing import Any
+
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.start import async_at_started
 
-from .const import CONF_SERIAL_PORT, DOMAIN
-from .denon232_receiver import Denon232Receiver
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_MUTE,
+    ATTR_POWER,
+    ATTR_SOURCE,
+    ATTR_VOLUME_LEVEL,
+    CONF_NAME,
+    CONF_SERIAL_PORT,
+    DATA_HUB,
+    DEFAULT_VOLUME_MAX,
+    DOMAIN,
+    SERVICE_APPLY_SCENE,
+    SERVICE_START_RECORDING,
+    SERVICE_STOP_RECORDING,
+    ZONE2_PREFIX,
+)
+from .coordinator import Denon232Coordinator, async_remove_storage
+from .hub import Denon232Hub
+from .parser import ZONE_2, ZONE_MAIN
+from .scene import ZoneScene, scene_commands
+from .state import FIELD_MAX_VOLUME
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.MEDIA_PLAYER]
+APPLY_SCENE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        **{
+            vol.Optional(f"{prefix}{key}"): validator
+            for prefix in ("", ZONE2_PREFIX)
+            for key, validator in (
+                (ATTR_POWER, cv.boolean),
+                (ATTR_SOURCE, cv.string),
+                (ATTR_VOLUME_LEVEL, cv.small_float),
+                (ATTR_MUTE, cv.boolean),
+            )
+        },
+    }
+)
+
+PLATFORMS: list[Platform] = [Platform.MEDIA_PLAYER, Platform.SENSOR]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Denon AVR RS-232 from a config entry."""
     serial_port = entry.data[CONF_SERIAL_PORT]
     
-    # Create receiver instance in executor (blocking operation)
-    receiver = await hass.async_add_executor_job(Denon232Receiver, serial_port)
+    # The receiver is serviced from the event loop; it streams unsolicited
+    # status lines so entities don't have to poll. One hub schedules the
+    # commands of every configured receiver.
+    if (hub := hass.data.get(DATA_HUB)) is None:
+        hub = hass.data[DATA_HUB] = Denon232Hub()
+    receiver = hub.receiver(serial_port)
+
+    # One coordinator polls every zone of this receiver in a single cycle.
+    # Until it has started, entities show what was stored at the last
+    # shutdown, so setup never waits for the port.
+    coordinator = Denon232Coordinator(
+        hass, receiver, entry.entry_id, entry.data[CONF_NAME]
+    )
+    await coordinator.async_restore()
     
-    # Store receiver in hass.data for platforms to access
+    # Store coordinator in hass.data for platforms to access
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = receiver
+    hass.data[DOMAIN][entry.entry_id] = coordinator
     
-    # Forward setup to media_player platform
+    _async_register_services(hass)
+
+    # Forward setup to the media_player and sensor platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    
+
+    @callback
+    def _async_start(_: HomeAssistant) -> None:
+        """Connect once Home Assistant has started, without holding it up."""
+        entry.async_create_background_task(
+            hass, coordinator.async_start(), f"{DOMAIN} {entry.title} start"
+        )
+
+    entry.async_on_unload(async_at_started(hass, _async_start))
     return True
 
 
@@ -39,8 +109,126 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     if unload_ok:
         # Close receiver connection and remove from hass.data
-        receiver: Denon232Receiver = hass.data[DOMAIN].pop(entry.entry_id)
-        await hass.async_add_executor_job(receiver.close)
+        coordinator: Denon232Coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator.receiver.close()
+        if not hass.data[DOMAIN]:
+            # Last receiver gone, stop the hub's task and threads
+            hass.data.pop(DATA_HUB).close()
     
     return unload_ok
 
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget what was stored for a removed entry."""
+    await async_remove_storage(hass, entry.entry_id)
+
+
+def _async_register_services(hass: HomeAssistant) -> None:
+    """Register the integration's services, once for all receivers."""
+    if hass.services.has_service(DOMAIN, SERVICE_START_RECORDING):
+        return
+
+    async def async_start_recording(call: ServiceCall) -> None:
+        """Capture the serial traffic of every receiver to the config dir."""
+        for entry_id, coordinator in hass.data[DOMAIN].items():
+            path = hass.config.path(DOMAIN, f"{entry_id}.cap")
+            coordinator.receiver.start_recording(path)
+
+    async def async_stop_recording(call: ServiceCall) -> None:
+        """Stop capturing serial traffic."""
+        for coordinator in hass.data[DOMAIN].values():
+            coordinator.receiver.stop_recording()
+
+    async def async_apply_scene(call: ServiceCall) -> ServiceResponse:
+        """Set both zones of a receiver in one transaction."""
+        coordinator = _scene_coordinator(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        receiver = coordinator.receiver
+        if not receiver.available:
+            raise HomeAssistantError(f"Receiver at {receiver.serial_port} is not available")
+
+        # Whatever MVMAX the receiver last reported, however long ago
+        cached = receiver.state.get(ZONE_MAIN, FIELD_MAX_VOLUME, math.inf)
+        commands = scene_commands(
+            _zone_scene(
+                coordinator, call.data, ZONE_MAIN, "", cached and cached.value
+            ),
+            _zone_scene(coordinator, call.data, ZONE_2, ZONE2_PREFIX, None),
+        )
+        steps = await receiver.transaction(commands)
+        confirmed = all(step.confirmed for step in steps)
+        if not confirmed:
+            _LOGGER.warning(
+                "Scene not confirmed by %s: %s",
+                receiver.serial_port,
+                [step.cmd for step in steps if not step.confirmed],
+            )
+        if not call.return_response:
+            return None
+        return {
+            "confirmed": confirmed,
+            "duration_ms": round(
+                max((step.sent + step.elapsed for step in steps), default=0) * 1000, 1
+            ),
+            "steps": [
+                {
+                    "command": step.cmd,
+                    "reply": step.reply,
+                    "confirmed": step.confirmed,
+                    "sent_ms": round(step.sent * 1000, 1),
+                    "elapsed_ms": round(step.elapsed * 1000, 1),
+                }
+                for step in steps
+            ],
+        }
+
+    hass.services.async_register(DOMAIN, SERVICE_START_RECORDING, async_start_recording)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_RECORDING, async_stop_recording)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_SCENE,
+        async_apply_scene,
+        schema=APPLY_SCENE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def _scene_coordinator(hass: HomeAssistant, entry_id: str | None) -> Denon232Coordinator:
+    """Return the coordinator a scene is for, the only one if not given."""
+    coordinators: dict[str, Denon232Coordinator] = hass.data.get(DOMAIN, {})
+    if entry_id is None:
+        if len(coordinators) != 1:
+            raise ServiceValidationError(
+                f"{ATTR_CONFIG_ENTRY_ID} is required with more than one receiver"
+            )
+        return next(iter(coordinators.values()))
+    if entry_id not in coordinators:
+        raise ServiceValidationError(f"No loaded receiver with entry id {entry_id}")
+    return coordinators[entry_id]
+
+
+def _zone_scene(
+    coordinator: Denon232Coordinator,
+    data: dict[str, Any],
+    zone: str,
+    prefix: str,
+    volume_max: float | None,
+) -> ZoneScene:
+    """Return the settings of one zone in a scene call, keys carry prefix."""
+    source = data.get(f"{prefix}{ATTR_SOURCE}")
+    if source is not None:
+        sources = coordinator.capabilities.sources[zone]
+        if source not in sources:
+            raise ServiceValidationError(
+                f"Unknown source {source}, expected one of {', '.join(sorted(sources))}"
+            )
+        source = sources[source]
+    volume = data.get(f"{prefix}{ATTR_VOLUME_LEVEL}")
+    if volume is not None:
+        # Scaled like the media players scale volume_level
+        volume *= volume_max or DEFAULT_VOLUME_MAX
+    return ZoneScene(
+        power=data.get(f"{prefix}{ATTR_POWER}"),
+        source=source,
+        volume=volume,
+        mute=data.get(f"{prefix}{ATTR_MUTE}"),
+    )
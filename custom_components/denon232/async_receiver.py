@@ -0,0 +1,857 @@
+"""
+Asyncio interface to control the receiver.
+
+Speaks the same protocol and offers the same command/batch API as
+Denon232Receiver, but every method is awaitable. The serial port is put in
+non-blocking mode and serviced from the event loop with loop.add_reader,
+so no executor thread is tied up sleeping or waiting for a read timeout.
+Serial bridges given as socket:// or rfc2217:// URLs are serviced the
+same way through their TCP connection.
+
+All traffic goes through a scheduler with two priority classes. Commands
+from the user are interactive and are written before any background
+refresh query that is still waiting, so a button press never sits behind
+a whole poll cycle. After switching the receiver on, commands are held
+until it listens again (see settle.py) and then sent straight away.
+
+When the port fails, the receiver reopens it in the background with
+jittered exponential backoff and tells its connection listeners once it
+is back, so they can resync.
+
+A receiver runs its own scheduler task, unless it belongs to a
+Denon232Hub, which then services the queues of all its receivers from
+one task.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import logging
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+import serial
+
+from .connection import Backoff, PortResolver
+from .framing import LineFramer
+from .denon232_receiver import COMMAND_DELAY, DEFAULT_TIMEOUT, MIN_COMMAND_INTERVAL
+from .parser import DenonEvent, parse_line
+from .protocol import (
+    RESPONSE_SPECS,
+    ResponseCollector,
+    coalesce_key,
+    echo_spec,
+    route_line,
+)
+from .ramp import DEFAULT_CURVE, LEVEL_PREFIX, VolumeRamp
+from .state import FIELD_VOLUME, REFRESH_QUERIES, CachedValue, ReceiverState
+from .recorder import DEFAULT_BACKUP_COUNT, DEFAULT_MAX_BYTES, RX, TX, TrafficRecorder
+from .settle import PROBE, PROBE_INTERVAL, PowerSettle
+from .stats import CommandMetrics, LatencySamples
+from .transport import LocalPort, TcpPort, open_port
+
+if TYPE_CHECKING:
+    from .hub import Denon232Hub
+
+# Scheduling classes, lower values are written first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+# Upper bound on commands waiting for the wire per class, for every kind of
+# job; superseded volume and source commands are merged and never count
+# twice. Callers beyond it wait until the scheduler takes a job.
+MAX_QUEUED_COMMANDS = 16
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Job:
+    """A command waiting for the wire and everyone waiting on it."""
+
+    __slots__ = (
+        "cmd",
+        "key",
+        "collector",
+        "exclusive",
+        "futures",
+        "group",
+        "queued_at",
+        "seq",
+        "wait",
+        "write",
+    )
+
+    def __init__(
+        self,
+        cmd: str,
+        future: asyncio.Future,
+        collector: ResponseCollector | None = None,
+        exclusive: bool = False,
+        group: object | None = None,
+    ) -> None:
+        """Initialize the job."""
+        self.cmd = cmd
+        self.key = None if collector else coalesce_key(cmd)
+        self.collector = collector
+        # Exclusive jobs keep the wire until their reply is complete
+        self.exclusive = exclusive
+        self.futures = [future]
+        # Jobs of a group only share the wire with each other
+        self.group = group
+        self.queued_at = time.monotonic()
+        # Number of the write that sent it, once sent
+        self.seq = 0
+        # Time spent waiting for the wire, and writing once it got it
+        self.wait = 0.0
+        self.write = 0.0
+
+
+class TransactionStep(NamedTuple):
+    """How one command of a transaction went."""
+
+    cmd: str
+    # Lines the receiver answered it with
+    reply: list[str]
+    # The reply reports the setting the command asked for
+    confirmed: bool
+    # Seconds from the start of the transaction until it was written
+    sent: float
+    # Seconds its reply took, or was waited for
+    elapsed: float
+
+
+class AsyncDenon232Receiver:
+    """Denon232 receiver driven by the asyncio event loop."""
+
+    def __init__(
+        self,
+        serial_port: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        hub: Denon232Hub | None = None,
+    ) -> None:
+        """Prepare the connection, call connect() to open the port.
+
+        Receivers of a hub are created with Denon232Hub.receiver().
+        """
+        self._serial_port = serial_port
+        self._timeout = timeout
+        self._hub = hub
+        self._available = False
+        self._port: LocalPort | TcpPort | None = None
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._fd: int | None = None
+        self._write_buffer = bytearray()
+        self._listeners: list[Callable[[str, DenonEvent | None], None]] = []
+        self._connection_listeners: list[Callable[[bool], None]] = []
+        # Everything the receiver reported, and when
+        self.state = ReceiverState()
+
+        # Scheduler state: one queue per priority class, the queries whose
+        # replies are still being collected, and the earliest time the
+        # receiver accepts the next command
+        self._queues: dict[int, list[_Job]] = {
+            PRIORITY_INTERACTIVE: [],
+            PRIORITY_BACKGROUND: [],
+        }
+        self._in_flight: list[_Job] = []
+        self._next_write = 0.0
+        # Writes so far, and the write whose reply is being dispatched
+        self._written = 0
+        self._answering: int | None = None
+        self._wakeup = asyncio.Event()
+        self._room = asyncio.Event()
+        self._expiry: asyncio.TimerHandle | None = None
+        self._scheduler_task: asyncio.Task | None = None
+        self._queue_delay = {priority: LatencySamples() for priority in PRIORITY_NAMES}
+        self.metrics = CommandMetrics()
+        self._framer = LineFramer(on_error=self.metrics.framing_error)
+        self._recorder: TrafficRecorder | None = None
+        # Volume ramps in progress, by zone
+        self._ramps: dict[str, VolumeRamp] = {}
+        # Commands are held while the receiver starts up after a power-on
+        self._settle = PowerSettle()
+        self._settle_timer: asyncio.TimerHandle | None = None
+
+        self._resolver = PortResolver(serial_port)
+        self._backoff = Backoff()
+        self._reconnect_task: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def available(self) -> bool:
+        """Return True if the receiver connection is available."""
+        return self._available
+
+    @property
+    def serial_port(self) -> str:
+        """Return the configured port or URL."""
+        return self._serial_port
+
+    def add_listener(
+        self, callback: Callable[[str, DenonEvent | None], None]
+    ) -> Callable[[], None]:
+        """Register a callback for every line received from the receiver.
+
+        Callbacks get the line and its parsed event, None if it did not
+        parse. They run in the event loop and must not block.
+
+        Returns a function that removes the callback again.
+        """
+        self._listeners.append(callback)
+
+        def remove_listener() -> None:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+        return remove_listener
+
+    @property
+    def written(self) -> int:
+        """Return the number of commands written so far."""
+        return self._written
+
+    @property
+    def answering(self) -> int | None:
+        """Return the number of the write the line being dispatched answers.
+
+        Only meaningful inside a line listener. None for echoes of
+        settings and for lines the receiver pushed on its own.
+        """
+        return self._answering
+
+    def add_connection_listener(
+        self, callback: Callable[[bool], None]
+    ) -> Callable[[], None]:
+        """Register a callback for when the connection is lost or restored.
+
+        The callback gets the new availability and runs in the event loop.
+
+        Returns a function that removes the callback again.
+        """
+        self._connection_listeners.append(callback)
+
+        def remove_listener() -> None:
+            if callback in self._connection_listeners:
+                self._connection_listeners.remove(callback)
+
+        return remove_listener
+
+    def _notify_connection(self, available: bool) -> None:
+        """Tell every connection listener about a change in availability."""
+        for callback in list(self._connection_listeners):
+            try:
+                callback(available)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error in connection listener")
+
+    @property
+    def recording(self) -> bool:
+        """Return True if traffic is being captured."""
+        return self._recorder is not None
+
+    def start_recording(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+    ) -> None:
+        """Capture every line sent and received to a rotating file."""
+        self.stop_recording()
+        self._recorder = TrafficRecorder(path, max_bytes, backup_count)
+        _LOGGER.info("Recording serial traffic of %s to %s", self._serial_port, path)
+
+    def stop_recording(self) -> None:
+        """Stop capturing traffic, after writing what was captured."""
+        if self._recorder is None:
+            return
+        recorder, self._recorder = self._recorder, None
+        # The recorder thread finishes the file, the event loop moves on
+        recorder.close(wait=False)
+        _LOGGER.info("Stopped recording %s to %s", self._serial_port, recorder.path)
+
+    async def connect(self) -> bool:
+        """Open the serial port and start reading from it.
+
+        If the port cannot be opened, it is retried in the background.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._closed = False
+        if self._hub is None and self._scheduler_task is None:
+            self._scheduler_task = self._loop.create_task(self._run_scheduler())
+        try:
+            await self._open_port()
+        except (serial.SerialException, OSError) as err:
+            _LOGGER.warning(
+                "Could not connect to serial port %s: %s. "
+                "Running in development/offline mode.",
+                self._serial_port,
+                err,
+            )
+            self._schedule_reconnect()
+            return False
+        return True
+
+    async def _open_port(self) -> None:
+        """Open the port and attach it to the event loop."""
+        # Finding and opening the device can block briefly, reads and
+        # writes never do
+        executor = self._hub.executor if self._hub is not None else None
+        path, self._port = await self._loop.run_in_executor(
+            executor, self._resolve_and_open
+        )
+        self._fd = self._port.fileno()
+        self._loop.add_reader(self._fd, self._on_readable)
+        self._backoff.reset()
+        self._available = True
+        _LOGGER.info("Connected to Denon receiver at %s", path)
+
+    def _resolve_and_open(self) -> tuple[str, LocalPort | TcpPort]:
+        """Open the port by its current path, in the executor.
+
+        The resolver looks at /dev/serial/by-id, so it is only used here.
+        """
+        path = self._resolver.resolve()
+        port = open_port(path)
+        self._resolver.connected(path)
+        return path, port
+
+    def _schedule_reconnect(self) -> None:
+        """Start reopening the port in the background, unless already doing so."""
+        if self._closed or self._reconnect_task is not None:
+            return
+        self._reconnect_task = self._loop.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        """Reopen the port with backoff until it works or we are closed."""
+        try:
+            while not self._closed:
+                delay = self._backoff.next_delay()
+                _LOGGER.debug(
+                    "Reconnecting to %s in %.1f s (attempt %d)",
+                    self._serial_port,
+                    delay,
+                    self._backoff.attempts,
+                )
+                await asyncio.sleep(delay)
+                try:
+                    await self._open_port()
+                except (serial.SerialException, OSError) as err:
+                    _LOGGER.debug("Reconnect to %s failed: %s", self._serial_port, err)
+                    continue
+                self._notify_connection(True)
+                return
+        finally:
+            self._reconnect_task = None
+
+    def _on_readable(self) -> None:
+        """Read whatever is available and dispatch complete lines."""
+        try:
+            data = self._port.read()
+        except BlockingIOError:
+            return
+        except OSError as err:
+            self._connection_lost(err)
+            return
+        if not data:
+            # Only telnet negotiation arrived
+            return
+
+        for line in self._framer.feed(data, self._record_rx()):
+            _LOGGER.debug("Received: %s", line)
+            if self._settle.observe(line):
+                self._stop_settling()
+            self._answering = self._route(line)
+            # Parsed once here, for the state and every listener
+            event = parse_line(line)
+            self.state.apply(event)
+            self._dispatch(line, event)
+        self._answering = None
+
+    def _record_rx(self) -> Callable[[bytes], None] | None:
+        """Return what records received lines, None if not recording."""
+        if (recorder := self._recorder) is None:
+            return None
+        return lambda line: recorder.record(RX, line)
+
+    def _dispatch(self, line: str, event: DenonEvent | None) -> None:
+        """Hand a received line to every registered listener."""
+        for callback in list(self._listeners):
+            try:
+                callback(line, event)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error in listener for line %s", line)
+
+    def _write(self, data: bytes) -> None:
+        """Write data, queueing whatever the port does not take right away."""
+        if self._fd is None:
+            raise serial.SerialException("Serial port is not open")
+        if self._write_buffer:
+            self._write_buffer += data
+            return
+        try:
+            written = self._port.write(data)
+        except BlockingIOError:
+            written = 0
+        if written < len(data):
+            self._write_buffer += data[written:]
+            self._loop.add_writer(self._fd, self._on_writable)
+
+    def _on_writable(self) -> None:
+        """Flush queued output once the port accepts more data."""
+        try:
+            written = self._port.write(self._write_buffer)
+        except BlockingIOError:
+            return
+        except OSError as err:
+            self._connection_lost(err)
+            return
+        del self._write_buffer[:written]
+        if not self._write_buffer:
+            self._loop.remove_writer(self._fd)
+
+    def _connection_lost(self, err: Exception | None) -> None:
+        """Stop using a port that failed underneath us."""
+        _LOGGER.error("Serial communication error: %s", err or "port closed")
+        self.metrics.error()
+        self._available = False
+        self._release_port()
+        self._fail_pending()
+        # Nothing reported before the loss can be trusted afterwards
+        self.state.clear()
+        self._notify_connection(False)
+        self._schedule_reconnect()
+
+    def _release_port(self) -> None:
+        """Detach the port from the event loop and close it."""
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            self._loop.remove_writer(self._fd)
+            self._fd = None
+        self._framer.clear()
+        self._write_buffer.clear()
+        self._settle.reset()
+        if self._settle_timer is not None:
+            self._settle_timer.cancel()
+            self._settle_timer = None
+        if self._port is None:
+            return
+        port, self._port = self._port, None
+        try:
+            port.close()
+        except (serial.SerialException, OSError) as err:
+            _LOGGER.error("Error closing serial connection: %s", err)
+
+    @staticmethod
+    def _finish(job: _Job) -> None:
+        """Resolve everyone waiting on job with the reply collected so far."""
+        lines = job.collector.lines if job.collector else None
+        for future in job.futures:
+            if not future.done():
+                future.set_result(lines)
+
+    def _fail_pending(self) -> None:
+        """Finish every queued and in-flight job after the port went away."""
+        for queue in self._queues.values():
+            for job in queue:
+                self._finish(job)
+            queue.clear()
+        for job in self._in_flight:
+            self._finish(job)
+        self._in_flight.clear()
+        self._room.set()
+
+    def _route(self, line: str) -> int | None:
+        """Hand a received line to the in-flight query it answers.
+
+        Returns the number of that query's write, None if none claimed it.
+        """
+        if not self._in_flight:
+            return None
+        collector = route_line([job.collector for job in self._in_flight], line)
+        if collector is None:
+            return None
+        seq = next(job.seq for job in self._in_flight if job.collector is collector)
+        self._expire_in_flight()
+        return seq
+
+    def _expire_in_flight(self) -> None:
+        """Finish queries whose reply is complete or overdue."""
+        if self._expiry is not None:
+            self._expiry.cancel()
+            self._expiry = None
+
+        now = time.monotonic()
+        waiting = []
+        for job in self._in_flight:
+            if job.collector.done(now):
+                self.metrics.record(job.cmd, job.wait, job.write, job.collector)
+                self._finish(job)
+            else:
+                waiting.append(job)
+        self._in_flight = waiting
+
+        if waiting:
+            deadline = min(job.collector.deadline for job in waiting)
+            self._expiry = self._loop.call_later(
+                max(0.0, deadline - now), self._expire_in_flight
+            )
+        # A finished exclusive query frees the wire for the next job
+        self._wake()
+
+    def _submit(self, job: _Job, priority: int) -> None:
+        """Queue a job, merging it into a queued one of the same kind.
+
+        The older command is dropped and the newer one takes its place at
+        the end of the queue, so the receiver only sees the final value.
+        """
+        queue = self._queues[priority]
+        if job.key is not None:
+            for index, queued in enumerate(queue):
+                if queued.key == job.key:
+                    del queue[index]
+                    _LOGGER.debug("Command %s supersedes %s", job.cmd, queued.cmd)
+                    queued.cmd = job.cmd
+                    queued.futures.extend(job.futures)
+                    queue.append(queued)
+                    return
+        queue.append(job)
+        self._wake()
+
+    def _wake(self) -> None:
+        """Tell whoever runs the scheduler that there may be work."""
+        if self._hub is not None:
+            self._hub.wake(self)
+        else:
+            self._wakeup.set()
+
+    async def _enqueue(self, job: _Job, priority: int) -> None:
+        """Queue a job once the queue bound leaves room for it."""
+        await self._wait_for_room(job, priority)
+        self._submit(job, priority)
+
+    async def _wait_for_room(self, job: _Job, priority: int) -> None:
+        """Wait until job can be queued without exceeding the queue bound."""
+        queue = self._queues[priority]
+        while len(queue) >= MAX_QUEUED_COMMANDS:
+            if job.key is not None and any(q.key == job.key for q in queue):
+                # Will be merged and takes no extra room
+                return
+            self._room.clear()
+            await self._room.wait()
+
+    def _next_job(self) -> _Job | None:
+        """Return the job to write next, or None if nothing may go now."""
+        if any(job.exclusive for job in self._in_flight):
+            return None
+        for priority in sorted(self._queues):
+            queue = self._queues[priority]
+            if not queue:
+                continue
+            if queue[0].exclusive and self._in_flight:
+                # Let the queries in flight finish before taking the wire
+                return None
+            if any(job.group is not queue[0].group for job in self._in_flight):
+                # A reply in flight must not be claimed by the other side
+                return None
+            job = queue.pop(0)
+            self._queue_delay[priority].add(time.monotonic() - job.queued_at)
+            self._room.set()
+            return job
+        return None
+
+    async def _run_scheduler(self) -> None:
+        """Write queued jobs in priority order, for as long as we run."""
+        while True:
+            if (due := self.service()) is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            elif (delay := due - time.monotonic()) > 0:
+                # Anything queued meanwhile competes for the next slot
+                await asyncio.sleep(delay)
+
+    def service(self) -> float | None:
+        """Write the next queued job if the receiver accepts one now.
+
+        Returns the monotonic time to be called again, or None if there is
+        nothing to do until new work arrives. Called by the scheduler task,
+        or by the hub the receiver belongs to.
+        """
+        if self._next_write > time.monotonic():
+            return self._next_write
+        if self._settle.settling:
+            # Woken again once the receiver answers
+            return None
+        if (job := self._next_job()) is None:
+            return None
+
+        _LOGGER.debug("Command: %s", job.cmd)
+        start = time.monotonic()
+        job.wait = start - job.queued_at
+        try:
+            # Denon uses the suffix \r, so add those to the above cmd.
+            self._write(f"{job.cmd}\r".encode("utf-8"))
+            if self._recorder is not None:
+                self._recorder.record(TX, job.cmd.encode("utf-8"))
+        except (serial.SerialException, OSError) as err:
+            self._finish(job)
+            if self._available:
+                self._connection_lost(err)
+            return self._next_write
+        job.write = time.monotonic() - start
+        self._written += 1
+        job.seq = self._written
+        if self._settle.begin(job.cmd):
+            self._settle_timer = self._loop.call_later(
+                PROBE_INTERVAL, self._probe_settled
+            )
+
+        if job.collector is None:
+            # Small delay to let the receiver process the command
+            self._next_write = time.monotonic() + COMMAND_DELAY
+            self.metrics.record(job.cmd, job.wait, job.write)
+            self._finish(job)
+            return self._next_write
+
+        # Reading starts right away, so the processing delay is part
+        # of the budget for the first line
+        job.collector.start(self._timeout + COMMAND_DELAY)
+        self._in_flight.append(job)
+        self._next_write = time.monotonic() + MIN_COMMAND_INTERVAL
+        self._expire_in_flight()
+        return self._next_write
+
+    def _probe_settled(self) -> None:
+        """Ask a starting receiver whether it listens yet."""
+        self._settle_timer = None
+        if not self._settle.settling:
+            return
+        if self._settle.expired(time.monotonic()):
+            self._wake()
+            return
+        try:
+            self._write(f"{PROBE}\r".encode("utf-8"))
+            if self._recorder is not None:
+                self._recorder.record(TX, PROBE.encode("utf-8"))
+        except (serial.SerialException, OSError) as err:
+            self._connection_lost(err)
+            return
+        self._settle_timer = self._loop.call_later(PROBE_INTERVAL, self._probe_settled)
+
+    def _stop_settling(self) -> None:
+        """Send what was held now that the receiver listens again."""
+        if self._settle_timer is not None:
+            self._settle_timer.cancel()
+            self._settle_timer = None
+        self._wake()
+
+    def queue_delay_stats(self) -> dict[str, dict[str, float]]:
+        """Return how long commands of each class waited for the wire."""
+        return {
+            PRIORITY_NAMES[priority]: samples.as_dict()
+            for priority, samples in self._queue_delay.items()
+        }
+
+    def queue_delay_percentile(self, priority: int, pct: float) -> float:
+        """Return a percentile of the wait for the wire of a class, in seconds."""
+        return self._queue_delay[priority].percentile(pct)
+
+    async def serial_command(
+        self,
+        cmd: str,
+        response: bool = False,
+        all_lines: bool = False,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> str | list[str] | None:
+        """Send a command to the receiver and optionally read response.
+
+        Commands without a response may be merged with newer commands of
+        the same kind while they wait for the wire.
+        """
+        if not self._available:
+            _LOGGER.debug("Command %s skipped - receiver not available", cmd)
+            if response:
+                return [] if all_lines else ""
+            return None
+
+        future = self._loop.create_future()
+        if response:
+            job = _Job(cmd, future, ResponseCollector(cmd), exclusive=True)
+            await self._enqueue(job, priority)
+            lines = await future
+            if all_lines:
+                return lines
+            return lines[0] if lines else ""
+
+        await self._enqueue(_Job(cmd, future), priority)
+        await future
+        return None
+
+    async def cached_state(
+        self, zone: str, field: str, max_age: float | None = None
+    ) -> CachedValue | None:
+        """Return a field of the receiver state, querying it only if stale.
+
+        Returns None if the receiver did not report the field.
+        """
+        if (cached := self.state.get(zone, field, max_age)) is not None:
+            return cached
+        if (query := REFRESH_QUERIES.get((zone, field))) is None:
+            return None
+        # Every reply line updates the state on its way in
+        await self.serial_command(query, response=True, all_lines=True)
+        return self.state.get(zone, field, max_age)
+
+    async def batch_query(
+        self,
+        commands: list[str],
+        pipelined: bool = False,
+        priority: int = PRIORITY_BACKGROUND,
+    ) -> dict[str, str | list[str]]:
+        """Execute multiple query commands as one batch.
+
+        Interactive commands may still be written between its queries.
+
+        Args:
+            commands: List of command strings (without response suffix)
+            pipelined: Overlap the queries instead of sending them one at a
+                time. Only used when every command has a known reply.
+            priority: Scheduling class of the queries
+
+        Returns:
+            Dictionary mapping command to response(s)
+        """
+        if not self._available:
+            _LOGGER.debug("Batch query skipped - receiver not available")
+            return {cmd: "" for cmd in commands}
+
+        exclusive = not (pipelined and all(cmd in RESPONSE_SPECS for cmd in commands))
+        futures = {}
+        for cmd in commands:
+            futures[cmd] = self._loop.create_future()
+            job = _Job(cmd, futures[cmd], ResponseCollector(cmd), exclusive)
+            await self._enqueue(job, priority)
+        return {cmd: await future for cmd, future in futures.items()}
+
+    async def transaction(
+        self, commands: list[str], priority: int = PRIORITY_INTERACTIVE
+    ) -> list[TransactionStep]:
+        """Send commands in order, back to back, and confirm each one.
+
+        Settings are answered with their new value, so every command is
+        written without waiting for the previous reply and its reply is
+        matched as it arrives. Commands without a known reply have the
+        wire to themselves until the line goes idle. Other commands wait
+        while the transaction's are in flight, so an echo of theirs is
+        never taken for a reply to the transaction.
+        """
+        if not self._available:
+            _LOGGER.debug("Transaction skipped - receiver not available")
+            return [TransactionStep(cmd, [], False, 0.0, 0.0) for cmd in commands]
+
+        start = time.monotonic()
+        group = object()
+        jobs = []
+        for cmd in commands:
+            spec = echo_spec(cmd)
+            job = _Job(
+                cmd,
+                self._loop.create_future(),
+                ResponseCollector(cmd, spec),
+                exclusive=spec is None,
+                group=group,
+            )
+            await self._enqueue(job, priority)
+            jobs.append(job)
+        await asyncio.gather(*(job.futures[0] for job in jobs))
+
+        steps = []
+        for job in jobs:
+            collector = job.collector
+            if (expected := parse_line(job.cmd)) is None:
+                confirmed = bool(collector.lines)
+            else:
+                confirmed = any(parse_line(line) == expected for line in collector.lines)
+            if collector.started_at:
+                sent, elapsed = collector.started_at - start, collector.elapsed()
+            else:
+                # The port went away before it was written
+                sent = elapsed = 0.0
+            steps.append(
+                TransactionStep(job.cmd, collector.lines, confirmed, sent, elapsed)
+            )
+        return steps
+
+    async def ramp_volume(
+        self,
+        zone: str,
+        target: float,
+        duration: float,
+        curve: str = DEFAULT_CURVE,
+    ) -> bool:
+        """Move the volume of zone to target over duration seconds.
+
+        A ramp of the same zone still in progress is stopped, and the new
+        one carries on from the level it reached. Returns True once target
+        was written, False if the ramp was stopped or could not start.
+        """
+        if zone not in LEVEL_PREFIX:
+            raise ValueError(f"No volume ramps for zone {zone}")
+        if (previous := self._ramps.get(zone)) is not None:
+            start = previous.level
+        elif (cached := await self.cached_state(zone, FIELD_VOLUME)) is not None:
+            start = cached.value
+        else:
+            _LOGGER.debug("Volume of %s unknown, not ramping", zone)
+            return False
+        if (previous := self._ramps.pop(zone, None)) is not None:
+            # Possibly one that started while the volume was queried
+            previous.cancel()
+            start = previous.level
+        if not self._available:
+            return False
+
+        ramp = self._ramps[zone] = VolumeRamp(zone, start)
+        ramp.task = self._loop.create_task(
+            ramp.run(target, duration, curve, self.serial_command)
+        )
+        try:
+            # A newer ramp cancels the task, not whoever waits for it
+            await asyncio.wait([ramp.task])
+        except asyncio.CancelledError:
+            ramp.cancel()
+            raise
+        finally:
+            if self._ramps.get(zone) is ramp:
+                del self._ramps[zone]
+        if ramp.task.cancelled():
+            return False
+        ramp.task.result()
+        return True
+
+    def close(self) -> None:
+        """Close the serial connection, must be called from the event loop."""
+        self._available = False
+        self._closed = True
+        for ramp in self._ramps.values():
+            ramp.cancel()
+        self._ramps.clear()
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._scheduler_task is not None:
+            self._scheduler_task.cancel()
+            self._scheduler_task = None
+        if self._hub is not None:
+            self._hub.remove(self)
+        if self._expiry is not None:
+            self._expiry.cancel()
+            self._expiry = None
+        self._fail_pending()
+        self.state.clear()
+        self.stop_recording()
+        if self._port is not None:
+            self._release_port()
+            _LOGGER.debug("Serial connection closed for %s", self._serial_port)
@@ -0,0 +1,166 @@
+"""
+What the connected receiver model supports.
+
+The query and source tables in const.py describe the AVR-2310. Other
+models leave some of those queries unanswered, and every unanswered query
+costs a full reply timeout in each poll. A one-time probe asks the
+receiver every poll query and, where the model supports it, which inputs
+are in use; the result is kept in Home Assistant's storage per config
+entry so later restarts skip the probe.
+
+The probe needs the receiver on: in standby it only answers power
+queries, which would make everything else look unsupported.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .async_receiver import PRIORITY_BACKGROUND, AsyncDenon232Receiver
+from .const import DOMAIN, NORMAL_INPUTS, POLL_QUERIES, ZONE2_INPUTS
+from .parser import ZONE_2, ZONE_MAIN
+
+STORAGE_VERSION = 1
+
+# A query counts as unsupported after going unanswered this many times in
+# a row, so a single lost reply does not remove it for good
+PROBE_ATTEMPTS = 2
+# Newer models list their inputs as SSSOD<source> USE or DEL, ending with
+# SSSOD END; the AVR-2310 does not answer it
+SOURCE_QUERY = "SSSOD ?"
+SOURCE_PREFIX = "SSSOD"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _default_sources() -> dict[str, dict[str, str]]:
+    return {ZONE_MAIN: dict(NORMAL_INPUTS), ZONE_2: dict(ZONE2_INPUTS)}
+
+
+@dataclass
+class Capabilities:
+    """Queries and sources of one receiver model.
+
+    Until the receiver was probed everything in const.py is assumed.
+    """
+
+    probed: bool = False
+    # Queries the receiver left unanswered
+    unanswered: set[str] = field(default_factory=set)
+    # Friendly name -> source command, by zone
+    sources: dict[str, dict[str, str]] = field(default_factory=_default_sources)
+
+    @property
+    def zone2(self) -> bool:
+        """Return True if the receiver has a Zone 2."""
+        return "Z2?" not in self.unanswered
+
+    def supports(self, query: str) -> bool:
+        """Return True if the receiver answers query, or may."""
+        return query not in self.unanswered
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the capabilities as stored."""
+        return {
+            "unanswered": sorted(self.unanswered),
+            "sources": self.sources,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Capabilities:
+        """Return capabilities stored by as_dict()."""
+        return cls(
+            probed=True,
+            unanswered=set(data["unanswered"]),
+            sources=data["sources"],
+        )
+
+
+def parse_source_usage(lines: list[str]) -> dict[str, bool]:
+    """Return which sources an SSSOD reply marks as in use."""
+    usage = {}
+    for line in lines:
+        if not line.startswith(SOURCE_PREFIX):
+            continue
+        source, _, status = line[len(SOURCE_PREFIX) :].rpartition(" ")
+        if source and status in ("USE", "DEL"):
+            usage[source] = status == "USE"
+    return usage
+
+
+async def async_probe(
+    receiver: AsyncDenon232Receiver, priority: int = PRIORITY_BACKGROUND
+) -> Capabilities | None:
+    """Find what the receiver answers, None if it cannot be probed now.
+
+    Sent at background priority by default, so user commands go first.
+    """
+    if await receiver.serial_command("PW?", response=True, priority=priority) != "PWON":
+        return None
+
+    unanswered = set()
+    for query in POLL_QUERIES:
+        for _ in range(PROBE_ATTEMPTS):
+            if await receiver.serial_command(
+                query, response=True, all_lines=True, priority=priority
+            ):
+                break
+        else:
+            unanswered.add(query)
+    if not receiver.available:
+        # Lost the connection halfway, the silence says nothing
+        return None
+
+    sources = _default_sources()
+    lines = await receiver.serial_command(
+        SOURCE_QUERY, response=True, all_lines=True, priority=priority
+    )
+    if usage := parse_source_usage(lines):
+        for table in sources.values():
+            for name, command in list(table.items()):
+                if not usage.get(command, True):
+                    del table[name]
+        known = set(NORMAL_INPUTS.values())
+        for source, used in usage.items():
+            if used and source not in known:
+                sources[ZONE_MAIN][source] = source
+    if "Z2?" in unanswered:
+        sources[ZONE_2] = {}
+
+    capabilities = Capabilities(probed=True, unanswered=unanswered, sources=sources)
+    _LOGGER.info(
+        "Receiver at %s leaves %s unanswered, Zone 2 %s",
+        receiver.serial_port,
+        sorted(unanswered) or "nothing",
+        "present" if capabilities.zone2 else "absent",
+    )
+    return capabilities
+
+
+class CapabilityStore:
+    """The probed capabilities of one config entry, kept across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store of entry_id."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.capabilities"
+        )
+
+    async def async_load(self) -> Capabilities | None:
+        """Return the stored capabilities, None if never probed."""
+        if (data := await self._store.async_load()) is None:
+            return None
+        return Capabilities.from_dict(data)
+
+    async def async_save(self, capabilities: Capabilities) -> None:
+        """Store probed capabilities."""
+        await self._store.async_save(capabilities.as_dict())
+
+    async def async_remove(self) -> None:
+        """Forget the capabilities, e.g. when the entry is removed."""
+        await self._store.async_remove()
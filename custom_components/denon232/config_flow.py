@@ -13,6 +13,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
 
 from .const import CONF_NAME, CONF_SERIAL_PORT, DEFAULT_NAME, DOMAIN
+from .transport import is_url, open_port
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,14 +21,16 @@ CONF_SKIP_TEST = "skip_test"
 
 
 def validate_serial_port(port: str) -> bool:
-    """Validate that the serial port exists and can be opened."""
+    """Validate that the serial port exists and can be opened.
+
+    socket:// and rfc2217:// URLs are checked by connecting to the bridge.
+    """
     try:
         # Check if port exists
-        if not os.path.exists(port):
+        if not is_url(port) and not os.path.exists(port):
             return False
         # Try to open the port briefly
-        ser = serial.Serial(port, baudrate=9600, timeout=1)
-        ser.close()
+        open_port(port).close()
         return True
     except (serial.SerialException, OSError):
         return False
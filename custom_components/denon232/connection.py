@@ -0,0 +1,117 @@
+"""
+Connection recovery for the Denon RS-232 receivers.
+
+USB-serial adapters drop off the bus now and then. When they come back
+the kernel may hand out a different device node (/dev/ttyUSB0 becomes
+/dev/ttyUSB1), while the udev link under /dev/serial/by-id keeps its name.
+The helpers here decide when to try the port again and which path to open.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import time
+
+# Reconnect attempts start quickly and back off to a ceiling, so a short
+# hiccup recovers within a second and a missing adapter costs next to nothing
+BACKOFF_INITIAL = 0.5
+BACKOFF_MAX = 30.0
+BACKOFF_FACTOR = 2.0
+
+# Stable names udev creates for USB-serial adapters
+BY_ID_DIR = "/dev/serial/by-id"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Backoff:
+    """Jittered exponential delays between reconnect attempts."""
+
+    def __init__(
+        self,
+        initial: float = BACKOFF_INITIAL,
+        maximum: float = BACKOFF_MAX,
+        factor: float = BACKOFF_FACTOR,
+    ) -> None:
+        """Initialize the backoff, the first delay is about initial."""
+        self._initial = initial
+        self._maximum = maximum
+        self._factor = factor
+        self.attempts = 0
+        self._next_attempt = 0.0
+
+    def next_delay(self) -> float:
+        """Return how long to wait before the next attempt and count it.
+
+        The delay is drawn from the upper half of the current step, so
+        attempts of several receivers do not line up after a shared outage.
+        """
+        step = min(self._maximum, self._initial * self._factor**self.attempts)
+        self.attempts += 1
+        delay = random.uniform(step / 2, step)
+        self._next_attempt = time.monotonic() + delay
+        return delay
+
+    def ready(self) -> bool:
+        """Return True if the delay of the last attempt has passed."""
+        return time.monotonic() >= self._next_attempt
+
+    def reset(self) -> None:
+        """Start over after a successful connection."""
+        self.attempts = 0
+        self._next_attempt = 0.0
+
+
+def find_by_id_path(port: str) -> str | None:
+    """Return the /dev/serial/by-id link that points at port, if any."""
+    if port.startswith(BY_ID_DIR) or "://" in port:
+        return None
+    try:
+        links = os.listdir(BY_ID_DIR)
+    except OSError:
+        return None
+    device = os.path.realpath(port)
+    for link in links:
+        path = os.path.join(BY_ID_DIR, link)
+        if os.path.realpath(path) == device:
+            return path
+    return None
+
+
+class PortResolver:
+    """Choose the path to open, following the adapter across re-enumeration.
+
+    Once a connection succeeded, the by-id link of that device is
+    remembered and opened from then on, since after re-enumeration the
+    configured node may be gone or belong to another device. Ports without
+    such a link are always opened by their configured path.
+    """
+
+    def __init__(self, port: str) -> None:
+        """Initialize the resolver for the configured port."""
+        self.port = port
+        self._by_id: str | None = None
+        self._device: str | None = None
+
+    def resolve(self) -> str:
+        """Return the path the next connection attempt should open."""
+        if self._by_id is None or not os.path.exists(self._by_id):
+            return self.port
+        device = os.path.realpath(self._by_id)
+        if device != self._device:
+            _LOGGER.info(
+                "Serial adapter of %s moved from %s to %s",
+                self.port,
+                self._device,
+                device,
+            )
+            self._device = device
+        return self._by_id
+
+    def connected(self, path: str) -> None:
+        """Remember the stable name of the device that was just opened."""
+        if self._by_id is None:
+            self._by_id = find_by_id_path(path)
+        self._device = os.path.realpath(path)
@@ -1,13 +1,38 @@
 """Constants for the Denon AVR RS-232 integration."""
+from datetime import timedelta
 
 DOMAIN = "denon232"
 
+# hass.data key of the hub shared by all config entries
+DATA_HUB = f"{DOMAIN}_hub"
+
 # Configuration constants
 CONF_SERIAL_PORT = "serial_port"
 CONF_NAME = "name"
 
 DEFAULT_NAME = "Denon Receiver"
 
+# Volume level shown as 100 % until the receiver reports its MVMAX
+DEFAULT_VOLUME_MAX = 65
+
+# Services
+SERVICE_START_RECORDING = "start_recording"
+SERVICE_STOP_RECORDING = "stop_recording"
+SERVICE_RAMP_VOLUME = "ramp_volume"
+SERVICE_APPLY_SCENE = "apply_scene"
+
+ATTR_DURATION = "duration"
+ATTR_CURVE = "curve"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_POWER = "power"
+ATTR_SOURCE = "source"
+ATTR_VOLUME_LEVEL = "volume_level"
+ATTR_MUTE = "mute"
+# Scene settings of Zone 2 carry this prefix
+ZONE2_PREFIX = "zone2_"
+# Longest volume ramp the service accepts, in seconds
+MAX_RAMP_DURATION = 600
+
 # Input source mappings: friendly name -> protocol command
 NORMAL_INPUTS = {
     "Phono": "PHONO",
@@ -38,3 +63,18 @@ ZONE2_INPUTS = {
     "iPod": "IPOD",
 }
 
+
+# Status queries sent as one batch per poll cycle. Which of them are sent
+# depends on the power state of each zone.
+MAIN_ZONE_QUERIES = ["PW?", "MV?", "MU?", "SI?"]
+ZONE2_QUERIES = ["Z2?", "Z2MU?"]
+POLL_QUERIES = MAIN_ZONE_QUERIES + ZONE2_QUERIES
+# In standby the receiver only answers power queries
+STANDBY_QUERIES = ["PW?"]
+# Z2? also reports whether Zone 2 was switched on
+ZONE2_OFF_QUERIES = ["Z2?"]
+
+# How often the coordinator polls as a fallback to pushed status lines
+SCAN_INTERVAL = timedelta(seconds=10)
+# Power-only heartbeat while the receiver is in standby
+STANDBY_SCAN_INTERVAL = timedelta(seconds=60)
@@ -0,0 +1,200 @@
+"""Poll coordinator for the Denon AVR RS-232 integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import logging
+import math
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .async_receiver import AsyncDenon232Receiver
+from .capabilities import STORAGE_VERSION, Capabilities, CapabilityStore, async_probe
+from .const import (
+    DOMAIN,
+    MAIN_ZONE_QUERIES,
+    SCAN_INTERVAL,
+    STANDBY_QUERIES,
+    STANDBY_SCAN_INTERVAL,
+    ZONE2_OFF_QUERIES,
+    ZONE2_QUERIES,
+)
+from .parser import ZONE_2, ZONE_MAIN, DenonEvent, PowerEvent, ZonePowerEvent
+from .state import FIELD_POWER, FIELD_ZONE_POWER
+from .stats import StateWrites
+
+# The last poll is written at most this often, and when Home Assistant stops
+SAVE_DELAY = 60
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _last_poll_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, list[str]]]:
+    """Return the store of the last poll results of an entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.last_poll")
+
+
+async def async_remove_storage(hass: HomeAssistant, entry_id: str) -> None:
+    """Forget everything stored for an entry."""
+    await CapabilityStore(hass, entry_id).async_remove()
+    await _last_poll_store(hass, entry_id).async_remove()
+
+
+class Denon232Coordinator(DataUpdateCoordinator[dict[str, list[str]]]):
+    """Query all zones of one receiver in a single cycle.
+
+    Every zone entity gets its state from the same batch, so the port sees
+    one lock acquisition per interval and the zones never disagree about
+    which cycle they were refreshed in.
+
+    What is polled follows the power state: a receiver in standby only
+    gets a slow power heartbeat, and a zone that is off is only asked
+    whether it came on. Queries the model is known not to answer are
+    never sent.
+
+    Nothing is polled until async_start(); before that the entities show
+    the replies of the last poll before Home Assistant was restarted.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        receiver: AsyncDenon232Receiver,
+        entry_id: str,
+        name: str,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} {name}",
+            # Set once started
+            update_interval=None,
+        )
+        self.receiver = receiver
+        self.capabilities = Capabilities()
+        self._entry_id = entry_id
+        # False while only restored state is known
+        self.started = False
+        self._store = CapabilityStore(hass, entry_id)
+        self._last_poll = _last_poll_store(hass, entry_id)
+        self._queries: list[str] = []
+        self._probe_task: asyncio.Task | None = None
+        # State writes of the entities, and those skipped as unchanged
+        self.state_writes = StateWrites()
+        receiver.add_listener(self._async_handle_line)
+        receiver.add_connection_listener(self._async_handle_connection)
+
+    def plan(self) -> tuple[list[str], timedelta]:
+        """Return the queries and interval for the next poll cycle.
+
+        Decided from the last power state the receiver reported; the cache
+        is cleared when the connection drops, so that is never outdated.
+        """
+        state = self.receiver.state
+        power = state.get(ZONE_MAIN, FIELD_POWER, math.inf)
+        if power is not None and not power.value:
+            queries, interval = STANDBY_QUERIES, STANDBY_SCAN_INTERVAL
+        elif (
+            zone2 := state.get(ZONE_2, FIELD_ZONE_POWER, math.inf)
+        ) is not None and not zone2.value:
+            queries, interval = MAIN_ZONE_QUERIES + ZONE2_OFF_QUERIES, SCAN_INTERVAL
+        else:
+            queries, interval = MAIN_ZONE_QUERIES + ZONE2_QUERIES, SCAN_INTERVAL
+        return [q for q in queries if self.capabilities.supports(q)], interval
+
+    async def async_restore(self) -> None:
+        """Load the capabilities and the last poll results from storage."""
+        if (capabilities := await self._store.async_load()) is not None:
+            self.capabilities = capabilities
+        self.data = await self._last_poll.async_load()
+
+    async def async_start(self) -> None:
+        """Connect to the receiver and replace the restored state.
+
+        If the receiver cannot be reached, it is reconnected in the
+        background and polled once it is back. A first probe runs next to
+        the first poll, which asks everything a model may answer.
+        """
+        await self.receiver.connect()
+        self._async_probe_in_background()
+        self.update_interval = self.plan()[1]
+        await self.async_refresh()
+        self.started = True
+        self.async_update_listeners()
+
+    async def async_probe_capabilities(self) -> None:
+        """Probe what the receiver supports, unless that is already known.
+
+        Does nothing while the receiver is off or away; the next poll that
+        finds it on tries again. The entities are set up before the first
+        probe, so the entry is reloaded if it finds Zone 2 missing or there
+        after all.
+        """
+        if self.capabilities.probed or not self.receiver.available:
+            return
+        if (capabilities := await async_probe(self.receiver)) is None:
+            return
+        zone2_changed = capabilities.zone2 != self.capabilities.zone2
+        self.capabilities = capabilities
+        await self._store.async_save(capabilities)
+        if zone2_changed:
+            _LOGGER.debug(
+                "Zone 2 %s, reloading", "found" if capabilities.zone2 else "absent"
+            )
+            self.hass.config_entries.async_schedule_reload(self._entry_id)
+
+    @callback
+    def _async_probe_in_background(self) -> None:
+        """Start probing, unless a probe is running already.
+
+        A probe takes a dozen round trips; as a task of its own it does
+        not hold up the poll cycle that found the receiver on.
+        """
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = self.hass.async_create_background_task(
+                self.async_probe_capabilities(),
+                f"{DOMAIN} {self.receiver.serial_port} probe",
+            )
+
+    async def async_shutdown(self) -> None:
+        """Stop probing along with polling."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+        await super().async_shutdown()
+
+    @callback
+    def _async_handle_line(self, line: str, event: DenonEvent | None) -> None:
+        """Poll right away when a power change calls for other queries."""
+        if not isinstance(event, PowerEvent | ZonePowerEvent):
+            return
+        if self.plan()[0] != self._queries:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _async_handle_connection(self, available: bool) -> None:
+        """Show the zones unavailable at once, and resync after a reconnect."""
+        if available:
+            self.hass.async_create_task(self.async_request_refresh())
+        else:
+            self.async_update_listeners()
+
+    async def _async_update_data(self) -> dict[str, list[str]]:
+        """Run one combined query cycle for every zone."""
+        if not self.receiver.available:
+            raise UpdateFailed("Receiver not available")
+        self._queries = self.plan()[0]
+        results = await self.receiver.batch_query(self._queries, pipelined=True)
+        if not self.capabilities.probed and results.get("PW?") == ["PWON"]:
+            self._async_probe_in_background()
+
+        self._last_poll.async_delay_save(lambda: results, SAVE_DELAY)
+
+        # The replies may have changed the power state
+        queries, interval = self.plan()
+        if interval != self.update_interval:
+            _LOGGER.debug("Polling %s every %s", queries, interval)
+            self.update_interval = interval
+        return results
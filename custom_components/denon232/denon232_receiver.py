@@ -9,15 +9,35 @@ Not all receivers have all functions.
 Functions can be found on in the xls file within this repository
 """
 
+from collections import deque
+from collections.abc import Callable
 import logging
+import queue
 import threading
 import time
 
 import serial
 
+try:
+    from termios import error as TermiosError
+except ImportError:  # Windows
+    TermiosError = OSError
+
+from .connection import Backoff, PortResolver
+from .framing import LineFramer
+from .protocol import RESPONSE_SPECS, ResponseCollector, route_line
+from .recorder import DEFAULT_BACKUP_COUNT, DEFAULT_MAX_BYTES, RX, TX, TrafficRecorder
+from .settle import PROBE, PROBE_INTERVAL, PowerSettle
+from .stats import CommandMetrics
+from .transport import open_serial
+
 DEFAULT_TIMEOUT = 0.15  # Reduced from 1s - responses should arrive within ~100ms
 DEFAULT_WRITE_TIMEOUT = 0.5
 COMMAND_DELAY = 0.05  # Small delay between write and read for receiver to process
+MIN_COMMAND_INTERVAL = 0.02  # Spacing the receiver needs between pipelined commands
+
+# pyserial lets termios errors through when a USB adapter disappears
+SERIAL_ERRORS = (serial.SerialException, OSError, TermiosError)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,21 +58,36 @@ class Denon232Receiver:
         self._available = False
         self.ser = None
         self.lock = threading.Lock()
+
+        # Streaming mode: a background thread owns all reads and hands
+        # lines to listeners and to whichever command is awaiting a reply.
+        self._listeners: list[Callable[[str], None]] = []
+        self._reader_thread: threading.Thread | None = None
+        self._stop_reader = threading.Event()
+        self._responses: queue.Queue[str] = queue.Queue()
+        self._collecting = False
+        self._listen = False
+        self.metrics = CommandMetrics()
+        # Received bytes are framed into lines here; lines framed beyond
+        # the one a read asked for wait in _lines
+        self._framer = LineFramer(on_error=self.metrics.framing_error)
+        self._lines: deque[str] = deque()
+        self._recorder: TrafficRecorder | None = None
+        # Power-on commands keep the lock until the receiver listens again
+        self._settle = PowerSettle()
+        # A command nobody reads the reply of still needs COMMAND_DELAY to
+        # be processed; the next write waits until then
+        self._next_write = 0.0
+
+        # After a failure the port is reopened on the next command, at most
+        # as often as the backoff allows
+        self._resolver = PortResolver(serial_port)
+        self._backoff = Backoff()
         
         # Try to connect, but don't fail if we can't (development mode support)
         try:
-            self.ser = serial.Serial(
-                serial_port,
-                baudrate=9600,
-                bytesize=8,
-                parity="N",
-                stopbits=1,
-                timeout=timeout,
-                write_timeout=write_timeout,
-            )
-            self._available = True
-            _LOGGER.info("Connected to Denon receiver at %s", serial_port)
-        except (serial.SerialException, OSError) as err:
+            self._open()
+        except SERIAL_ERRORS as err:
             _LOGGER.warning(
                 "Could not connect to serial port %s: %s. "
                 "Running in development/offline mode.",
@@ -60,17 +95,261 @@ class Denon232Receiver:
                 err,
             )
             self._available = False
+            self._backoff.next_delay()
+
+    def _open(self) -> None:
+        """Open the serial port."""
+        path = self._resolver.resolve()
+        # A device path, or a socket:// or rfc2217:// URL of a serial bridge
+        self.ser = open_serial(path, self._timeout, self._write_timeout)
+        self._resolver.connected(path)
+        self._backoff.reset()
+        self._framer.clear()
+        self._lines.clear()
+        self._available = True
+        _LOGGER.info("Connected to Denon receiver at %s", path)
+
+    def _reconnect(self) -> bool:
+        """Reopen the port after a failure, return True if it is usable.
+
+        Attempts are spaced by a jittered exponential backoff, so commands
+        sent while the adapter is gone fail fast instead of blocking.
+        """
+        if self._available and self.ser is not None:
+            return True
+        if not self._backoff.ready():
+            return False
+
+        with self.lock:
+            if self._available:
+                # Another thread got there first
+                return True
+            # The reader of the failed port is restarted on the new one
+            listen = self._listen
+            self.stop_listener()
+            self._listen = listen
+            if self.ser is not None:
+                try:
+                    self.ser.close()
+                except SERIAL_ERRORS:
+                    pass
+            try:
+                self._open()
+            except SERIAL_ERRORS as err:
+                delay = self._backoff.next_delay()
+                _LOGGER.debug(
+                    "Reconnect to %s failed: %s, next attempt in %.1f s",
+                    self._serial_port,
+                    err,
+                    delay,
+                )
+                return False
+        if listen:
+            self.start_listener()
+        return True
 
     @property
     def available(self) -> bool:
         """Return True if the receiver connection is available."""
         return self._available
 
+    @property
+    def listening(self) -> bool:
+        """Return True if the background reader is streaming receiver output."""
+        return self._reader_thread is not None and self._reader_thread.is_alive()
+
+    def add_listener(self, callback: Callable[[str], None]) -> Callable[[], None]:
+        """Register a callback for every line received from the receiver.
+
+        Callbacks are invoked from the reader thread (or the thread running
+        the command when not streaming) and must not block.
+
+        Returns a function that removes the callback again.
+        """
+        self._listeners.append(callback)
+
+        def remove_listener() -> None:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+        return remove_listener
+
+    @property
+    def recording(self) -> bool:
+        """Return True if traffic is being captured."""
+        return self._recorder is not None
+
+    def start_recording(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+    ) -> None:
+        """Capture every line sent and received to a rotating file."""
+        self.stop_recording()
+        self._recorder = TrafficRecorder(path, max_bytes, backup_count)
+        _LOGGER.info("Recording serial traffic of %s to %s", self._serial_port, path)
+
+    def stop_recording(self) -> None:
+        """Stop capturing traffic, after writing what was captured."""
+        if self._recorder is None:
+            return
+        recorder, self._recorder = self._recorder, None
+        recorder.close()
+        _LOGGER.info(
+            "Recorded %d lines of %s to %s",
+            recorder.frames,
+            self._serial_port,
+            recorder.path,
+        )
+
+    def start_listener(self) -> None:
+        """Start the background reader that streams receiver output.
+
+        The AVR sends status lines on its own whenever it is operated from
+        the front panel or the IR remote; the reader parses them as they
+        arrive instead of throwing them away before the next command.
+        """
+        self._listen = True
+        if self.listening or not self._available or self.ser is None:
+            return
+
+        self._stop_reader.clear()
+        self._reader_thread = threading.Thread(
+            target=self._reader_loop,
+            name=f"denon232 reader {self._serial_port}",
+            daemon=True,
+        )
+        self._reader_thread.start()
+        _LOGGER.debug("Started listener for %s", self._serial_port)
+
+    def stop_listener(self) -> None:
+        """Stop the background reader and wait for it to exit."""
+        self._listen = False
+        if self._reader_thread is None:
+            return
+        self._stop_reader.set()
+        self._reader_thread.join(self._timeout * 4)
+        self._reader_thread = None
+        _LOGGER.debug("Stopped listener for %s", self._serial_port)
+
+    def _reader_loop(self) -> None:
+        """Continuously read lines and dispatch them until stopped."""
+        while not self._stop_reader.is_set():
+            try:
+                # Times out after self._timeout so the stop flag is checked
+                data = self._read_available()
+            except (*SERIAL_ERRORS, TypeError) as err:
+                # pyserial raises TypeError when the port is closed under it
+                if not self._stop_reader.is_set():
+                    _LOGGER.error("Serial read error in listener: %s", err)
+                    self.metrics.error()
+                    self._available = False
+                break
+
+            for line in self._framer.feed(data, self._record_rx()):
+                _LOGGER.debug("Event: %s", line)
+                self._settle.observe(line)
+                if self._collecting:
+                    self._responses.put(line)
+                self._dispatch(line)
+
+    def _read_available(self) -> bytes:
+        """Wait up to the port timeout for data, then take all there is."""
+        return self.ser.read(max(1, self.ser.in_waiting))
+
+    def _record_rx(self) -> Callable[[bytes], None] | None:
+        """Return what records received lines, None if not recording."""
+        if (recorder := self._recorder) is None:
+            return None
+        return lambda line: recorder.record(RX, line)
+
+    def _dispatch(self, line: str) -> None:
+        """Hand a received line to every registered listener."""
+        for callback in list(self._listeners):
+            try:
+                callback(line)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error in listener for line %s", line)
+
+    def _write_command(self, cmd: str, flush: bool = True) -> float:
+        """Write a single command to the receiver, return how long it took."""
+        if (delay := self._next_write - time.monotonic()) > 0:
+            time.sleep(delay)
+        start = time.monotonic()
+        # Keep the input when replies to commands in flight are still wanted
+        if flush and self.listening:
+            # The reader owns the input side; drop replies nobody claimed
+            while not self._responses.empty():
+                self._responses.get_nowait()
+        elif flush:
+            # Clear any stale data in the buffer
+            self.ser.reset_input_buffer()
+            self._framer.clear()
+            self._lines.clear()
+
+        # Denon uses the suffix \r, so add those to the above cmd.
+        final_command = f"{cmd}\r".encode("utf-8")
+        # Write data to serial port
+        self.ser.write(final_command)
+        self.ser.flush()  # Ensure data is sent immediately
+        if self._recorder is not None:
+            self._recorder.record(TX, final_command[:-1])
+        return time.monotonic() - start
+
+    def _read_line(self, timeout: float) -> str | None:
+        """Read one line, return None if the port stayed quiet for timeout."""
+        if self.listening:
+            try:
+                return self._responses.get(timeout=timeout)
+            except queue.Empty:
+                return None
+
+        # Changing the timeout reconfigures the port, only do it when needed
+        if self.ser.timeout != timeout:
+            self.ser.timeout = timeout
+        while not self._lines:
+            if not (data := self._read_available()):
+                # Quiet for timeout; a partial line stays in the framer
+                return None
+            lines = self._framer.feed(data, self._record_rx())
+            for line in lines:
+                self._settle.observe(line)
+                self._dispatch(line)
+            self._lines.extend(lines)
+        return self._lines.popleft()
+
+    def _read_response(self, cmd: str) -> ResponseCollector:
+        """Read the reply to cmd, returning as soon as it is complete.
+
+        Replies of known query commands end after their last expected line.
+        Anything else is read until the receiver goes quiet.
+        """
+        collector = ResponseCollector(cmd)
+        collector.start(self._timeout + COMMAND_DELAY)
+        if collector.spec is None:
+            # Small delay to let the receiver process the command
+            time.sleep(COMMAND_DELAY)
+            timeout = self._timeout
+        else:
+            # Reading starts right away, so the processing delay is part
+            # of the budget for the first line
+            timeout = self._timeout + COMMAND_DELAY
+
+        while not collector.complete:
+            decoded_line = self._read_line(collector.wait_time(timeout))
+            if decoded_line is None:
+                break
+            if decoded_line:  # Only add non-empty lines
+                collector.feed(decoded_line)
+                _LOGGER.debug("Received: %s", decoded_line)
+        return collector
+
     def serial_command(
         self, cmd: str, response: bool = False, all_lines: bool = False
     ) -> str | list[str] | None:
         """Send a command to the receiver and optionally read response."""
-        if not self._available or self.ser is None:
+        if not self._reconnect():
             _LOGGER.debug("Command %s skipped - receiver not available", cmd)
             if response:
                 return [] if all_lines else ""
@@ -81,55 +360,110 @@ class Denon232Receiver:
         try:
             if not self.ser.is_open:
                 self.ser.open()
-        except (serial.SerialException, OSError) as err:
+        except SERIAL_ERRORS as err:
             _LOGGER.error("Failed to open serial port: %s", err)
             self._available = False
             if response:
                 return [] if all_lines else ""
             return None
 
+        start = time.monotonic()
         try:
             self.lock.acquire()
+            wait = time.monotonic() - start
+            self._collecting = response
+
+            write = self._write_command(cmd)
 
-            # Clear any stale data in the buffer
-            self.ser.reset_input_buffer()
-            
-            # Denon uses the suffix \r, so add those to the above cmd.
-            final_command = f"{cmd}\r".encode("utf-8")
-            # Write data to serial port
-            self.ser.write(final_command)
-            self.ser.flush()  # Ensure data is sent immediately
-            
-            # Small delay to let the receiver process the command
-            time.sleep(COMMAND_DELAY)
-            
             # Read data from serial port
+            lines = None
             if response:
-                lines = []
-                while True:
-                    line = self.ser.read_until(b"\r")
-                    if not line:
-                        break
-                    decoded_line = line.decode().strip()
-                    if decoded_line:  # Only add non-empty lines
-                        lines.append(decoded_line)
-                        _LOGGER.debug("Received: %s", decoded_line)
-                
-                if all_lines:
-                    return lines
-                return lines[0] if lines else ""
-            
-            return None
-        except (serial.SerialException, OSError) as err:
+                read_start = time.monotonic()
+                collector = self._read_response(cmd)
+                self.metrics.record(
+                    cmd, wait, write, collector, time.monotonic() - read_start
+                )
+                lines = collector.lines
+            else:
+                self.metrics.record(cmd, wait, write)
+                self._next_write = time.monotonic() + COMMAND_DELAY
+
+            if self._settle.begin(cmd):
+                # Whoever waits for the lock sends once the receiver listens
+                self._wait_until_ready()
+
+            if not response:
+                return None
+            if all_lines:
+                return lines
+            return lines[0] if lines else ""
+        except SERIAL_ERRORS as err:
             _LOGGER.error("Serial communication error: %s", err)
+            self.metrics.error(cmd)
             self._available = False
             if response:
                 return [] if all_lines else ""
             return None
         finally:
+            self._collecting = False
             self.lock.release()
 
-    def batch_query(self, commands: list[str]) -> dict[str, str | list[str]]:
+    def _wait_until_ready(self) -> None:
+        """Probe a starting receiver until it answers, with the lock held."""
+        self._collecting = True
+        while self._settle.settling and not self._settle.expired(time.monotonic()):
+            if self._read_line(PROBE_INTERVAL) is None:
+                self._write_command(PROBE, flush=False)
+
+    def _pipelined_batch(
+        self, commands: list[str], wait: float
+    ) -> dict[str, list[str]]:
+        """Send every query without waiting for the previous reply.
+
+        Commands go out MIN_COMMAND_INTERVAL apart while replies are read in
+        between and matched back to their query by prefix.
+        """
+        collectors = [ResponseCollector(cmd) for cmd in commands]
+        in_flight: list[ResponseCollector] = []
+
+        def read_until(
+            until: float, waiting: list[ResponseCollector] | None = None
+        ) -> None:
+            """Route reply lines to in-flight queries until the given time.
+
+            Returns early once every query in waiting has its full reply.
+            """
+            while (remaining := until - time.monotonic()) > 0:
+                decoded_line = self._read_line(remaining)
+                if decoded_line is None:
+                    return
+                if decoded_line and route_line(in_flight, decoded_line):
+                    _LOGGER.debug("Batch received: %s", decoded_line)
+                if waiting and all(c.complete for c in waiting):
+                    return
+
+        writes: dict[str, float] = {}
+        next_send = time.monotonic()
+        for collector in collectors:
+            read_until(next_send)
+            _LOGGER.debug("Batch command: %s", collector.cmd)
+            writes[collector.cmd] = self._write_command(
+                collector.cmd, flush=not in_flight
+            )
+            collector.start(self._timeout + COMMAND_DELAY)
+            in_flight.append(collector)
+            next_send = time.monotonic() + MIN_COMMAND_INTERVAL
+
+        while waiting := [c for c in in_flight if not c.done(time.monotonic())]:
+            read_until(min(c.deadline for c in waiting), waiting)
+
+        for collector in collectors:
+            self.metrics.record(collector.cmd, wait, writes[collector.cmd], collector)
+        return {collector.cmd: collector.lines for collector in collectors}
+
+    def batch_query(
+        self, commands: list[str], pipelined: bool = False
+    ) -> dict[str, str | list[str]]:
         """Execute multiple query commands in a single lock acquisition.
         
         More efficient than calling serial_command multiple times as it
@@ -137,69 +471,69 @@ class Denon232Receiver:
         
         Args:
             commands: List of command strings (without response suffix)
+            pipelined: Overlap the queries instead of sending them one at a
+                time. Only used when every command has a known reply.
             
         Returns:
             Dictionary mapping command to response(s)
         """
-        if not self._available or self.ser is None:
+        if not self._reconnect():
             _LOGGER.debug("Batch query skipped - receiver not available")
             return {cmd: "" for cmd in commands}
             
         try:
             if not self.ser.is_open:
                 self.ser.open()
-        except (serial.SerialException, OSError) as err:
+        except SERIAL_ERRORS as err:
             _LOGGER.error("Failed to open serial port: %s", err)
             self._available = False
             return {cmd: "" for cmd in commands}
         
         results = {}
         
+        start = time.monotonic()
         try:
             self.lock.acquire()
+            # Every command of the batch waited this long for the lock
+            wait = time.monotonic() - start
+            self._collecting = True
+
+            if pipelined and all(cmd in RESPONSE_SPECS for cmd in commands):
+                return self._pipelined_batch(commands, wait)
             
             for cmd in commands:
-                # Clear any stale data in the buffer
-                self.ser.reset_input_buffer()
-                
                 _LOGGER.debug("Batch command: %s", cmd)
-                final_command = f"{cmd}\r".encode("utf-8")
-                self.ser.write(final_command)
-                self.ser.flush()
-                
-                # Small delay to let the receiver process
-                time.sleep(COMMAND_DELAY)
+                write = self._write_command(cmd)
                 
                 # Read responses for this command
-                lines = []
-                while True:
-                    line = self.ser.read_until(b"\r")
-                    if not line:
-                        break
-                    decoded_line = line.decode().strip()
-                    if decoded_line:
-                        lines.append(decoded_line)
-                        _LOGGER.debug("Batch received: %s", decoded_line)
-                
-                results[cmd] = lines
+                read_start = time.monotonic()
+                collector = self._read_response(cmd)
+                self.metrics.record(
+                    cmd, wait, write, collector, time.monotonic() - read_start
+                )
+                results[cmd] = collector.lines
                 
-        except (serial.SerialException, OSError) as err:
+        except SERIAL_ERRORS as err:
             _LOGGER.error("Serial communication error in batch: %s", err)
+            self.metrics.error()
             self._available = False
             # Fill remaining commands with empty results
             for cmd in commands:
                 if cmd not in results:
                     results[cmd] = []
         finally:
+            self._collecting = False
             self.lock.release()
         
         return results
 
     def close(self) -> None:
         """Close the serial connection."""
+        self.stop_listener()
+        self.stop_recording()
         try:
             if self.ser and self.ser.is_open:
                 self.ser.close()
                 _LOGGER.debug("Serial connection closed for %s", self._serial_port)
-        except (serial.SerialException, OSError) as err:
+        except SERIAL_ERRORS as err:
             _LOGGER.error("Error closing serial connection: %s", err)
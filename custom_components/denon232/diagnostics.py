@@ -0,0 +1,46 @@
+"""Diagnostics support for the Denon AVR RS-232 integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_SERIAL_PORT, DOMAIN
+from .coordinator import Denon232Coordinator
+
+# Device paths and serial bridge URLs can name hosts on the local network
+TO_REDACT = {CONF_SERIAL_PORT}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Includes per-command timings split into waiting for the wire, writing
+    and reading the reply, and counts of timeouts, empty replies and
+    serial errors, to tell where the time goes when the receiver is slow.
+    """
+    coordinator: Denon232Coordinator = hass.data[DOMAIN][entry.entry_id]
+    receiver = coordinator.receiver
+    queries, interval = coordinator.plan()
+    return {
+        "entry": async_redact_data(entry.data, TO_REDACT),
+        "available": receiver.available,
+        "poll": {
+            "queries": queries,
+            "interval_s": interval.total_seconds(),
+            "started": coordinator.started,
+            "last_update_success": coordinator.last_update_success,
+        },
+        "capabilities": {
+            "probed": coordinator.capabilities.probed,
+            **coordinator.capabilities.as_dict(),
+        },
+        "queue_delay": receiver.queue_delay_stats(),
+        "metrics": receiver.metrics.as_dict(),
+        "state": receiver.state.as_dict(),
+        "state_writes": coordinator.state_writes.as_dict(),
+    }
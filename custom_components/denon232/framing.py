@@ -0,0 +1,139 @@
+"""
+Line framing for the Denon RS-232 protocol.
+
+The receiver ends every line with CR. Received bytes are appended to one
+buffer that lives as long as the connection, and the complete lines in it
+are decoded straight from a memoryview in one go. Consumed bytes are then
+dropped from the front of the buffer, which a bytearray does without
+moving the partial line behind them.
+
+The protocol is printable ASCII. If a read does not decode as ASCII, its
+lines are taken apart one at a time instead; a line with anything but
+printable ASCII in it was hit by line noise and is dropped as a whole. A
+run of bytes too long to be a line is skipped up to the next CR. Either
+way one bad byte costs at most one line, reading picks up again at the
+next, and the loss counts as a framing error.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+# No line of the protocol comes close; the recorder keeps at most this much
+MAX_LINE = 255
+
+
+class LineFramer:
+    """Split received bytes into protocol lines."""
+
+    __slots__ = ("_buffer", "_discarding", "_on_error", "errors", "max_line")
+
+    def __init__(
+        self,
+        max_line: int = MAX_LINE,
+        on_error: Callable[[], None] | None = None,
+    ) -> None:
+        """Initialize an empty framer, on_error is called per framing error."""
+        self.max_line = max_line
+        self.errors = 0
+        self._on_error = on_error
+        self._buffer = bytearray()
+        # Skipping an overlong run until the next CR
+        self._discarding = False
+
+    def __len__(self) -> int:
+        """Return the number of bytes waiting for the end of their line."""
+        return len(self._buffer)
+
+    def clear(self) -> None:
+        """Drop a partial line, e.g. when the input is flushed."""
+        self._buffer.clear()
+        self._discarding = False
+
+    def feed(
+        self, data: bytes, raw: Callable[[bytes], None] | None = None
+    ) -> list[str]:
+        """Add received data and return the complete lines in it.
+
+        Empty and damaged lines are left out. raw, if given, gets the bytes
+        of every framed line as received, damaged ones included.
+        """
+        buffer = self._buffer
+        buffer += data
+        end = buffer.rfind(b"\r")
+        if end < 0:
+            self._check_overrun()
+            return []
+
+        with memoryview(buffer) as view:
+            try:
+                # Usually every complete line is clean, decode them at once
+                parts = str(view[:end], "ascii").split("\r")
+            except UnicodeDecodeError:
+                parts = None
+            if parts is None:
+                lines = self._frame_damaged(view, end, raw)
+            else:
+                lines = self._frame(parts, raw)
+        del buffer[: end + 1]
+        self._check_overrun()
+        return lines
+
+    def _check_overrun(self) -> None:
+        """Give up on a partial line that is too long to be one."""
+        if len(self._buffer) > self.max_line:
+            # No CR where one must have been, drop up to the next one
+            self._error()
+            self._discarding = True
+            self._buffer.clear()
+
+    def _frame(
+        self, parts: list[str], raw: Callable[[bytes], None] | None
+    ) -> list[str]:
+        """Return the lines among parts, which decoded cleanly."""
+        if self._discarding:
+            # The tail of an overlong run
+            self._discarding = False
+            del parts[0]
+        lines = []
+        for part in parts:
+            if raw is not None:
+                raw(part.encode("ascii"))
+            if line := part.strip():
+                if line.isprintable():
+                    lines.append(line)
+                else:
+                    self._error()
+        return lines
+
+    def _frame_damaged(
+        self, view: memoryview, end: int, raw: Callable[[bytes], None] | None
+    ) -> list[str]:
+        """Return the lines in view[:end] that survived, one at a time."""
+        lines = []
+        start = 0
+        buffer = view.obj
+        while start <= end:
+            stop = buffer.find(b"\r", start, end + 1)
+            if self._discarding:
+                self._discarding = False
+            else:
+                if raw is not None:
+                    raw(bytes(view[start:stop]))
+                try:
+                    line = str(view[start:stop], "ascii").strip()
+                except UnicodeDecodeError:
+                    self._error()
+                    line = ""
+                if line:
+                    if line.isprintable():
+                        lines.append(line)
+                    else:
+                        self._error()
+            start = stop + 1
+        return lines
+
+    def _error(self) -> None:
+        self.errors += 1
+        if self._on_error is not None:
+            self._on_error()
@@ -0,0 +1,168 @@
+"""
+One dispatcher for every Denon receiver of an installation.
+
+Each AsyncDenon232Receiver keeps its own command queues, but on its own it
+also runs its own scheduler task and opens its port on the shared default
+executor. With many receivers that adds a task per receiver and lets slow
+opens (a bridge that does not answer holds a thread for the whole connect
+timeout) take executor threads other integrations need.
+
+A hub owns the receivers of all config entries instead:
+
+- one task services every receiver's queues, round robin, writing at most
+  one command per receiver per turn so a busy receiver cannot starve the
+  others;
+- ports are opened on a small executor of the hub's own, so the number of
+  threads stays the same however many receivers there are.
+
+Reads and writes stay on the event loop as before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import itertools
+import logging
+import time
+
+from .async_receiver import AsyncDenon232Receiver
+from .denon232_receiver import DEFAULT_TIMEOUT
+
+# Threads opening ports; a port that takes long to open only delays others
+# while every worker is busy with one
+OPEN_WORKERS = 2
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Denon232Hub:
+    """Services the command queues of many receivers from a single task."""
+
+    def __init__(self) -> None:
+        """Initialize an empty hub, receivers are added with receiver()."""
+        self._receivers: list[AsyncDenon232Receiver] = []
+        # Receivers with something to do now, in turn order
+        self._ready: deque[AsyncDenon232Receiver] = deque()
+        # Receivers waiting for their receiver to accept the next command,
+        # as (due, sequence, receiver); only the entry matching _due counts
+        self._timers: list[tuple[float, int, AsyncDenon232Receiver]] = []
+        self._due: dict[AsyncDenon232Receiver, float] = {}
+        self._sequence = itertools.count()
+        # The receiver taking its turn, and whether it was woken meanwhile
+        self._servicing: AsyncDenon232Receiver | None = None
+        self._woken = False
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.executor = ThreadPoolExecutor(
+            max_workers=OPEN_WORKERS, thread_name_prefix="denon232_open"
+        )
+
+    @property
+    def receivers(self) -> list[AsyncDenon232Receiver]:
+        """Return the receivers of the hub."""
+        return list(self._receivers)
+
+    def receiver(
+        self, serial_port: str, timeout: float = DEFAULT_TIMEOUT
+    ) -> AsyncDenon232Receiver:
+        """Create a receiver serviced by the hub, must be called from the loop.
+
+        Call connect() on it as usual; close() removes it from the hub.
+        """
+        receiver = AsyncDenon232Receiver(serial_port, timeout, hub=self)
+        self._receivers.append(receiver)
+        _LOGGER.debug("Servicing %s, %d receiver(s)", serial_port, len(self._receivers))
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return receiver
+
+    def wake(self, receiver: AsyncDenon232Receiver) -> None:
+        """Give a receiver a turn, it has new work or its wire came free."""
+        if receiver is self._servicing:
+            # Another turn if it goes idle, instead of a second entry
+            self._woken = True
+            return
+        if receiver in self._ready or receiver not in self._receivers:
+            return
+        self._due.pop(receiver, None)
+        self._ready.append(receiver)
+        self._wakeup.set()
+
+    def remove(self, receiver: AsyncDenon232Receiver) -> None:
+        """Stop servicing a receiver that was closed."""
+        if receiver not in self._receivers:
+            return
+        self._receivers.remove(receiver)
+        self._due.pop(receiver, None)
+        if receiver in self._ready:
+            self._ready.remove(receiver)
+
+    def close(self) -> None:
+        """Close every receiver and stop the dispatcher."""
+        for receiver in list(self._receivers):
+            receiver.close()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.executor.shutdown(wait=False)
+
+    def _wait_until(self, receiver: AsyncDenon232Receiver, due: float) -> None:
+        """Give a receiver its next turn once due has passed."""
+        self._due[receiver] = due
+        heapq.heappush(self._timers, (due, next(self._sequence), receiver))
+
+    def _release_timers(self, now: float) -> None:
+        """Move receivers whose wait is over to the ready queue."""
+        while self._timers and self._timers[0][0] <= now:
+            due, _, receiver = heapq.heappop(self._timers)
+            if self._due.get(receiver) == due:
+                del self._due[receiver]
+                self._ready.append(receiver)
+
+    async def _run(self) -> None:
+        """Give each receiver with work a turn, until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = time.monotonic()
+            self._release_timers(now)
+            if self._ready:
+                # One command per receiver, then the next receiver's turn
+                for _ in range(len(self._ready)):
+                    receiver = self._servicing = self._ready.popleft()
+                    self._woken = False
+                    try:
+                        due = receiver.service()
+                    finally:
+                        self._servicing = None
+                    if due is None and self._woken:
+                        due = time.monotonic()
+                    if due is None or receiver not in self._receivers:
+                        # Idle until wake() brings it back
+                        continue
+                    if due <= time.monotonic():
+                        self._ready.append(receiver)
+                    else:
+                        self._wait_until(receiver, due)
+                # Let the replies in before the next round
+                await asyncio.sleep(0)
+                continue
+
+            self._wakeup.clear()
+            timer = None
+            while self._timers:
+                due, _, receiver = self._timers[0]
+                if self._due.get(receiver) == due:
+                    break
+                # Superseded by a wake() meanwhile
+                heapq.heappop(self._timers)
+            if self._timers:
+                delay = max(0.0, self._timers[0][0] - now)
+                timer = loop.call_later(delay, self._wakeup.set)
+            try:
+                await self._wakeup.wait()
+            finally:
+                if timer is not None:
+                    timer.cancel()
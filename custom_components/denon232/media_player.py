@@ -1,24 +1,78 @@
 """Media player platform for Denon AVR RS-232 integration."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from datetime import datetime
 import logging
+import time
 from typing import Any
 
+import voluptuous as vol
+
 from homeassistant.components.media_player import (
+    ATTR_MEDIA_VOLUME_LEVEL,
     MediaPlayerEntity,
     MediaPlayerEntityFeature,
     MediaPlayerState,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import (
+    config_validation as cv,
+    entity_platform,
+    entity_registry as er,
+)
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-
-from .const import CONF_NAME, CONF_SERIAL_PORT, DOMAIN, NORMAL_INPUTS, ZONE2_INPUTS
-from .denon232_receiver import Denon232Receiver
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import (
+    ATTR_CURVE,
+    ATTR_DURATION,
+    CONF_NAME,
+    CONF_SERIAL_PORT,
+    DEFAULT_VOLUME_MAX,
+    DOMAIN,
+    MAX_RAMP_DURATION,
+    SERVICE_RAMP_VOLUME,
+)
+from .coordinator import Denon232Coordinator
+from .parser import (
+    ZONE_2,
+    ZONE_MAIN,
+    DenonEvent,
+    MaxVolumeEvent,
+    MuteEvent,
+    PowerEvent,
+    SourceEvent,
+    VolumeEvent,
+    ZonePowerEvent,
+    parse_line,
+)
+from .ramp import CURVES, DEFAULT_CURVE
+from .snapshot import SourceTable, ZoneSnapshot
+from .state import (
+    FIELD_MUTED,
+    FIELD_POWER,
+    FIELD_SOURCE,
+    FIELD_VOLUME,
+    FIELD_ZONE_POWER,
+    OptimisticState,
+    event_value,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Entity attribute showing each field of the receiver state
+FIELD_ATTRS = {
+    FIELD_POWER: "_is_on",
+    FIELD_ZONE_POWER: "_is_on",
+    FIELD_VOLUME: "_volume",
+    FIELD_MUTED: "_muted",
+    FIELD_SOURCE: "_source",
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -26,50 +80,232 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Denon media player from a config entry."""
-    receiver: Denon232Receiver = hass.data[DOMAIN][entry.entry_id]
+    coordinator: Denon232Coordinator = hass.data[DOMAIN][entry.entry_id]
     name = entry.data[CONF_NAME]
     serial_port = entry.data[CONF_SERIAL_PORT]
 
-    entities = [
-        DenonMainZone(receiver, name, serial_port, entry.entry_id),
-        DenonZone2(receiver, name, serial_port, entry.entry_id),
+    entities: list[DenonBase] = [
+        DenonMainZone(coordinator, name, serial_port, entry.entry_id)
     ]
+    if coordinator.capabilities.zone2:
+        entities.append(DenonZone2(coordinator, name, serial_port, entry.entry_id))
+    else:
+        # Created before the probe found the model has no Zone 2
+        registry = er.async_get(hass)
+        if entity_id := registry.async_get_entity_id(
+            "media_player", DOMAIN, f"{serial_port}_zone2"
+        ):
+            registry.async_remove(entity_id)
+
+    # State comes from the coordinator's first refresh, no update needed
+    async_add_entities(entities)
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_RAMP_VOLUME,
+        {
+            vol.Required(ATTR_MEDIA_VOLUME_LEVEL): cv.small_float,
+            vol.Required(ATTR_DURATION): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=MAX_RAMP_DURATION)
+            ),
+            vol.Optional(ATTR_CURVE, default=DEFAULT_CURVE): vol.In(list(CURVES)),
+        },
+        "async_ramp_volume",
+    )
 
-    async_add_entities(entities, True)
 
+class DenonBase(CoordinatorEntity[Denon232Coordinator], MediaPlayerEntity):
+    """Base class for Denon media player entities.
 
-class DenonBase(MediaPlayerEntity):
-    """Base class for Denon media player entities."""
+    Every line the receiver sends reaches the entity once, as it arrives:
+    replies to the coordinator's poll queries as well as changes made on
+    the receiver itself. Coordinator updates only publish the result and
+    the availability.
+    """
 
     _attr_has_entity_name = True
+    # The field telling whether this zone is on
+    _POWER_FIELD: str
 
     def __init__(
         self,
-        receiver: Denon232Receiver,
+        coordinator: Denon232Coordinator,
         name: str,
         serial_port: str,
         entry_id: str,
         zone: str,
     ) -> None:
         """Initialize the Denon media player."""
-        self._receiver = receiver
+        super().__init__(coordinator)
+        self._receiver = coordinator.receiver
         self._base_name = name
         self._serial_port = serial_port
         self._entry_id = entry_id
         self._zone = zone
         
         # State attributes
-        self._power_state: str | None = None
+        self._is_on: bool | None = None
         self._volume: float = 0
-        self._volume_max: int = 65
+        self._volume_max: float = DEFAULT_VOLUME_MAX
         self._muted: bool = False
         self._source: str | None = None
-        self._source_list = NORMAL_INPUTS.copy()
+        # Changes shown before the receiver answered the command
+        self._optimistic = OptimisticState()
+        self._cancel_expiry: Callable[[], None] | None = None
+        # Source lookups, rebuilt when the capabilities change
+        self._sources: SourceTable | None = None
+        self._sources_indexed: dict[str, str] | None = None
+        # What was last written to Home Assistant
+        self._published: ZoneSnapshot | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the coordinator and to lines pushed by the receiver."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._receiver.add_listener(self._async_handle_push))
+        self.async_on_remove(self._async_stop_expiry)
+        # The last poll before this entity listened, possibly restored
+        # from storage; later replies come in through the listener
+        self._handle_results(self.coordinator.data)
+        # Written by Home Assistant once this returns
+        self._published = self._snapshot()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Publish the state after a poll cycle or a change in availability.
+
+        The replies of the cycle were applied as they arrived; applying
+        them again here would undo anything pushed after them.
+        """
+        self._async_publish()
+
+    def _snapshot(self) -> ZoneSnapshot:
+        """Return what the entity shows now."""
+        return ZoneSnapshot(
+            available=self.available,
+            state=self.state,
+            volume_level=self.volume_level,
+            muted=self.is_volume_muted,
+            source=self.source,
+            source_list=self.source_list,
+        )
+
+    @callback
+    def _async_publish(self) -> None:
+        """Write the state to Home Assistant, unless it did not change."""
+        snapshot = self._snapshot()
+        if snapshot == self._published:
+            self.coordinator.state_writes.suppressed += 1
+            return
+        self._published = snapshot
+        self.coordinator.state_writes.published += 1
+        self.async_write_ha_state()
+
+    def _handle_results(self, results: dict[str, list[str]] | None) -> None:
+        """Update state from the replies of a poll cycle not seen before."""
+        for lines in (results or {}).values():
+            for line in lines:
+                self._handle_line(line)
+
+    @callback
+    def _async_handle_push(self, line: str, event: DenonEvent | None) -> None:
+        """Apply a received line and publish the new state."""
+        if self._apply(event, self._receiver.answering):
+            self._async_publish()
+
+    def _handle_line(self, line: str) -> bool:
+        """Update state from a received line, return True if it applied."""
+        return self._apply(parse_line(line))
+
+    def _apply(self, event: DenonEvent | None, answering: int | None = None) -> bool:
+        """Update state from a parsed line, return True if it applied.
+
+        answering is the number of the write the line answers, if any.
+        """
+        if getattr(event, "zone", self._zone) != self._zone:
+            return False
+        if self._optimistic and (reported := event_value(event)) is not None:
+            _, field, value = reported
+            if self._optimistic.stale(field, answering):
+                _LOGGER.debug("%s %s %s predates the change", self._zone, field, value)
+                return False
+            match self._optimistic.resolve(field, value):
+                case True:
+                    _LOGGER.debug("%s %s confirmed: %s", self._zone, field, value)
+                case False:
+                    _LOGGER.debug("%s %s corrected to %s", self._zone, field, value)
+        return self._handle_event(event)
+
+    def _handle_event(self, event: DenonEvent | None) -> bool:
+        """Update state from an event of this zone, return True if it applied."""
+        raise NotImplementedError
+
+    def _expect(self, field: str, value: Any) -> None:
+        """Show value for field until the receiver answers, once it was sent.
+
+        The answer confirms or corrects it; without one the value shown
+        before comes back.
+        """
+        attr = FIELD_ATTRS[field]
+        # Counted once the command is out: a query written in between is
+        # taken as older, which only waits for the next report
+        self._optimistic.expect(
+            field, value, getattr(self, attr), self._receiver.written
+        )
+        setattr(self, attr, value)
+        self._schedule_expiry()
+
+    def _schedule_expiry(self) -> None:
+        """Check back when the next optimistic change runs out."""
+        if self._cancel_expiry is not None:
+            return
+        if (deadline := self._optimistic.next_deadline()) is None:
+            return
+        self._cancel_expiry = async_call_later(
+            self.hass, max(0.0, deadline - time.monotonic()), self._async_expire
+        )
+
+    @callback
+    def _async_expire(self, _now: datetime) -> None:
+        """Roll back optimistic changes the receiver never answered."""
+        self._cancel_expiry = None
+        if expired := self._optimistic.expire():
+            for field, previous in expired.items():
+                _LOGGER.debug(
+                    "%s %s not answered, back to %s", self._zone, field, previous
+                )
+                setattr(self, FIELD_ATTRS[field], previous)
+            self._async_publish()
+        self._schedule_expiry()
+
+    @callback
+    def _async_stop_expiry(self) -> None:
+        """Stop checking on optimistic changes."""
+        if self._cancel_expiry is not None:
+            self._cancel_expiry()
+            self._cancel_expiry = None
+
+    @property
+    def _source_list(self) -> dict[str, str]:
+        """Return the sources of this zone, friendly name -> command."""
+        return self.coordinator.capabilities.sources[self._zone]
+
+    @property
+    def _source_table(self) -> SourceTable:
+        """Return the sources of this zone, indexed both ways."""
+        sources = self._source_list
+        if self._sources_indexed is not sources:
+            # New capabilities were probed
+            self._sources = SourceTable.from_sources(sources)
+            self._sources_indexed = sources
+        return self._sources
 
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._receiver.available
+        if not self.coordinator.started:
+            # Showing the state stored at the last shutdown, if there is one
+            return self.coordinator.data is not None
+        return self._receiver.available and super().available
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -81,15 +317,26 @@ class DenonBase(MediaPlayerEntity):
             model="AVR RS-232",
         )
 
+    async def async_ramp_volume(
+        self, volume_level: float, duration: float, curve: str = DEFAULT_CURVE
+    ) -> None:
+        """Move the volume to volume_level (0..1) over duration seconds."""
+        # Every level written is echoed and pushed to the entity on the way
+        await self._receiver.ramp_volume(
+            self._zone, volume_level * self._volume_max, duration, curve
+        )
+
     @property
     def source_list(self) -> list[str]:
         """Return the list of available input sources."""
-        return sorted(list(self._source_list.keys()))
+        return self._source_table.names
 
 
 class DenonMainZone(DenonBase):
     """Representation of the Denon Main Zone."""
 
+    _POWER_FIELD = FIELD_POWER
+
     _attr_supported_features = (
         MediaPlayerEntityFeature.VOLUME_SET
         | MediaPlayerEntityFeature.VOLUME_STEP
@@ -101,66 +348,40 @@ class DenonMainZone(DenonBase):
 
     def __init__(
         self,
-        receiver: Denon232Receiver,
+        coordinator: Denon232Coordinator,
         name: str,
         serial_port: str,
         entry_id: str,
     ) -> None:
         """Initialize the Main Zone."""
-        super().__init__(receiver, name, serial_port, entry_id, "main")
+        super().__init__(coordinator, name, serial_port, entry_id, ZONE_MAIN)
         self._attr_unique_id = f"{serial_port}_main"
         self._attr_name = "Main Zone"
 
-    async def async_update(self) -> None:
-        """Get the latest details from the device."""
-        # Use batch query for efficiency - single lock acquisition for all queries
-        results = await self.hass.async_add_executor_job(
-            self._receiver.batch_query, ["PW?", "MV?", "MU?", "SI?"]
-        )
-        
-        # Parse power state
-        pw_responses = results.get("PW?", [])
-        if pw_responses:
-            self._power_state = pw_responses[0] if pw_responses else None
-        
-        # Parse volume and max volume
-        volume_lines = results.get("MV?", [])
-        for line in volume_lines:
-            if line.startswith("MVMAX "):
-                # Only grab two digit max
-                self._volume_max = int(line[6:8])
+    def _handle_event(self, event: DenonEvent | None) -> bool:
+        """Update main zone state from an event."""
+        match event:
+            case PowerEvent(on=on):
+                self._is_on = on
+            case MaxVolumeEvent(volume=volume_max):
+                self._volume_max = volume_max
                 _LOGGER.debug("MVMAX Value: %s", self._volume_max)
-            elif line.startswith("MV"):
-                # Volume can be 2 or 3 chars (e.g., MV50 or MV505 for half-dB)
-                vol_str = line[2:]
-                if len(vol_str) == 3:
-                    # Half-dB value like "505" means 50.5
-                    self._volume = int(vol_str[:2]) + 0.5
-                else:
-                    self._volume = int(vol_str[:2])
-                if self._volume == 99:
-                    self._volume = 0
+            case VolumeEvent(volume=volume):
+                self._volume = volume
                 _LOGGER.debug("MV Value: %s", self._volume)
-        
-        # Parse mute state
-        mute_responses = results.get("MU?", [])
-        for mute_line in mute_responses:
-            if mute_line.startswith("MU"):
-                self._muted = mute_line == "MUON"
-                _LOGGER.debug("Mute state: %s (from %s)", self._muted, mute_line)
-                break
-        
-        # Parse source
-        source_responses = results.get("SI?", [])
-        if source_responses:
-            source_response = source_responses[0]
-            if source_response.startswith("SI"):
-                self._source = source_response[2:]
+            case MuteEvent(muted=muted):
+                self._muted = muted
+                _LOGGER.debug("Mute state: %s", self._muted)
+            case SourceEvent(source=source):
+                self._source = source
+            case _:
+                return False
+        return True
 
     @property
     def state(self) -> MediaPlayerState:
         """Return the state of the device."""
-        if self._power_state == "PWSTANDBY":
+        if self._is_on is False:
             return MediaPlayerState.OFF
         return MediaPlayerState.ON
 
@@ -177,91 +398,58 @@ class DenonMainZone(DenonBase):
     @property
     def source(self) -> str | None:
         """Return the current input source."""
-        for pretty_name, name in self._source_list.items():
-            if self._source == name:
-                return pretty_name
-        return self._source
+        return self._source_table.name(self._source)
 
     async def async_turn_on(self) -> None:
         """Turn the media player on."""
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, "PWON"
-        )
-        # Optimistic update for immediate UI feedback
-        self._power_state = "PWON"
-        self.async_write_ha_state()
+        await self._receiver.serial_command("PWON")
+        self._expect(self._POWER_FIELD, True)
+        self._async_publish()
 
     async def async_turn_off(self) -> None:
         """Turn off media player."""
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, "PWSTANDBY"
-        )
-        # Optimistic update for immediate UI feedback
-        self._power_state = "PWSTANDBY"
-        self.async_write_ha_state()
+        await self._receiver.serial_command("PWSTANDBY")
+        self._expect(self._POWER_FIELD, False)
+        self._async_publish()
 
     async def async_volume_up(self) -> None:
         """Volume up media player."""
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, "MVUP"
-        )
-        # Optimistic update - volume step is typically 1
-        self._volume = min(self._volume + 1, self._volume_max)
-        self.async_write_ha_state()
+        await self._receiver.serial_command("MVUP")
+        self._expect(FIELD_VOLUME, min(self._volume + 1, self._volume_max))
+        self._async_publish()
 
     async def async_volume_down(self) -> None:
         """Volume down media player."""
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, "MVDOWN"
-        )
-        # Optimistic update
-        self._volume = max(self._volume - 1, 0)
-        self.async_write_ha_state()
+        await self._receiver.serial_command("MVDOWN")
+        self._expect(FIELD_VOLUME, max(self._volume - 1, 0))
+        self._async_publish()
 
     async def async_set_volume_level(self, volume: float) -> None:
         """Set volume level, range 0..1."""
         volume_int = round(volume * self._volume_max)
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, f"MV{volume_int:02d}"
-        )
-        # Optimistic update for immediate UI feedback
-        self._volume = volume_int
-        self.async_write_ha_state()
+        await self._receiver.serial_command(f"MV{volume_int:02d}")
+        self._expect(FIELD_VOLUME, volume_int)
+        self._async_publish()
 
     async def async_mute_volume(self, mute: bool) -> None:
-        """Toggle mute on the media player."""
-        # Query actual mute state from receiver and toggle it
-        current_mute = await self.hass.async_add_executor_job(
-            self._receiver.serial_command, "MU?", True
-        )
-        
-        # Toggle based on actual receiver state
-        if current_mute == "MUON":
-            mute_cmd = "MUOFF"
-            self._muted = False
-        else:
-            mute_cmd = "MUON"
-            self._muted = True
-        
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, mute_cmd
-        )
-        self.async_write_ha_state()
+        """Mute or unmute the media player."""
+        await self._receiver.serial_command(f"MU{'ON' if mute else 'OFF'}")
+        self._expect(FIELD_MUTED, mute)
+        self._async_publish()
 
     async def async_select_source(self, source: str) -> None:
         """Select input source."""
         source_cmd = self._source_list.get(source, source)
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, f"SI{source_cmd}"
-        )
-        # Optimistic update for immediate UI feedback
-        self._source = source_cmd
-        self.async_write_ha_state()
+        await self._receiver.serial_command(f"SI{source_cmd}")
+        self._expect(FIELD_SOURCE, source_cmd)
+        self._async_publish()
 
 
 class DenonZone2(DenonBase):
     """Representation of the Denon Zone 2."""
 
+    _POWER_FIELD = FIELD_ZONE_POWER
+
     _attr_supported_features = (
         MediaPlayerEntityFeature.VOLUME_SET
         | MediaPlayerEntityFeature.VOLUME_STEP
@@ -273,61 +461,38 @@ class DenonZone2(DenonBase):
 
     def __init__(
         self,
-        receiver: Denon232Receiver,
+        coordinator: Denon232Coordinator,
         name: str,
         serial_port: str,
         entry_id: str,
     ) -> None:
         """Initialize Zone 2."""
-        super().__init__(receiver, name, serial_port, entry_id, "zone2")
+        super().__init__(coordinator, name, serial_port, entry_id, ZONE_2)
         self._attr_unique_id = f"{serial_port}_zone2"
         self._attr_name = "Zone 2"
-        # Zone 2 has limited source options (no TV, HDP per protocol)
-        self._source_list = ZONE2_INPUTS.copy()
-
-    async def async_update(self) -> None:
-        """Get the latest details from the device."""
-        # Use batch query for efficiency - single lock acquisition for all queries
-        results = await self.hass.async_add_executor_job(
-            self._receiver.batch_query, ["Z2?", "Z2MU?"]
-        )
-        
-        # Parse Zone 2 status (returns Z2ON, Z2OFF, or Z2<SOURCE>)
-        z2_response = results.get("Z2?", [])
-        for line in z2_response:
-            if line == "Z2ON":
-                self._power_state = "Z2ON"
-            elif line == "Z2OFF":
-                self._power_state = "Z2OFF"
-            elif line.startswith("Z2") and len(line) > 2:
-                # Check if it's a volume response (2 digits) or source
-                suffix = line[2:]
-                if suffix.isdigit() and len(suffix) <= 3:
-                    # Volume value
-                    if len(suffix) == 3:
-                        self._volume = int(suffix[:2]) + 0.5
-                    else:
-                        self._volume = int(suffix)
-                    if self._volume == 99:
-                        self._volume = 0
-                    _LOGGER.debug("Z2 Volume: %s", self._volume)
-                elif suffix not in ("ON", "OFF"):
-                    # Source value
-                    self._source = suffix
-                    _LOGGER.debug("Z2 Source: %s", self._source)
-
-        # Parse Zone 2 mute state
-        mute_responses = results.get("Z2MU?", [])
-        for mute_line in mute_responses:
-            if mute_line.startswith("Z2MU"):
-                self._muted = mute_line == "Z2MUON"
-                _LOGGER.debug("Zone 2 mute state: %s (from %s)", self._muted, mute_line)
-                break
+
+    def _handle_event(self, event: DenonEvent | None) -> bool:
+        """Update Zone 2 state from an event."""
+        match event:
+            case ZonePowerEvent(on=on):
+                self._is_on = on
+            case VolumeEvent(volume=volume):
+                self._volume = volume
+                _LOGGER.debug("Z2 Volume: %s", self._volume)
+            case MuteEvent(muted=muted):
+                self._muted = muted
+                _LOGGER.debug("Zone 2 mute state: %s", self._muted)
+            case SourceEvent(source=source):
+                self._source = source
+                _LOGGER.debug("Z2 Source: %s", self._source)
+            case _:
+                return False
+        return True
 
     @property
     def state(self) -> MediaPlayerState:
         """Return the state of the device."""
-        if self._power_state == "Z2ON":
+        if self._is_on:
             return MediaPlayerState.ON
         return MediaPlayerState.OFF
 
@@ -344,83 +509,48 @@ class DenonZone2(DenonBase):
     @property
     def source(self) -> str | None:
         """Return the current input source for Zone 2."""
-        for pretty_name, name in self._source_list.items():
-            if self._source == name:
-                return pretty_name
-        return self._source
+        return self._source_table.name(self._source)
 
     async def async_turn_on(self) -> None:
         """Turn Zone 2 on."""
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, "Z2ON"
-        )
-        # Optimistic update for immediate UI feedback
-        self._power_state = "Z2ON"
-        self.async_write_ha_state()
+        await self._receiver.serial_command("Z2ON")
+        self._expect(self._POWER_FIELD, True)
+        self._async_publish()
 
     async def async_turn_off(self) -> None:
         """Turn Zone 2 off."""
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, "Z2OFF"
-        )
-        # Optimistic update for immediate UI feedback
-        self._power_state = "Z2OFF"
-        self.async_write_ha_state()
+        await self._receiver.serial_command("Z2OFF")
+        self._expect(self._POWER_FIELD, False)
+        self._async_publish()
 
     async def async_volume_up(self) -> None:
         """Volume up Zone 2."""
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, "Z2UP"
-        )
-        # Optimistic update
-        self._volume = min(self._volume + 1, self._volume_max)
-        self.async_write_ha_state()
+        await self._receiver.serial_command("Z2UP")
+        self._expect(FIELD_VOLUME, min(self._volume + 1, self._volume_max))
+        self._async_publish()
 
     async def async_volume_down(self) -> None:
         """Volume down Zone 2."""
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, "Z2DOWN"
-        )
-        # Optimistic update
-        self._volume = max(self._volume - 1, 0)
-        self.async_write_ha_state()
+        await self._receiver.serial_command("Z2DOWN")
+        self._expect(FIELD_VOLUME, max(self._volume - 1, 0))
+        self._async_publish()
 
     async def async_set_volume_level(self, volume: float) -> None:
         """Set Zone 2 volume level, range 0..1."""
         volume_int = round(volume * self._volume_max)
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, f"Z2{volume_int:02d}"
-        )
-        # Optimistic update for immediate UI feedback
-        self._volume = volume_int
-        self.async_write_ha_state()
+        await self._receiver.serial_command(f"Z2{volume_int:02d}")
+        self._expect(FIELD_VOLUME, volume_int)
+        self._async_publish()
 
     async def async_mute_volume(self, mute: bool) -> None:
-        """Toggle mute on Zone 2."""
-        # Query actual mute state from receiver and toggle it
-        current_mute = await self.hass.async_add_executor_job(
-            self._receiver.serial_command, "Z2MU?", True
-        )
-        
-        # Toggle based on actual receiver state
-        if current_mute == "Z2MUON":
-            mute_cmd = "Z2MUOFF"
-            self._muted = False
-        else:
-            mute_cmd = "Z2MUON"
-            self._muted = True
-        
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, mute_cmd
-        )
-        self.async_write_ha_state()
+        """Mute or unmute Zone 2."""
+        await self._receiver.serial_command(f"Z2MU{'ON' if mute else 'OFF'}")
+        self._expect(FIELD_MUTED, mute)
+        self._async_publish()
 
     async def async_select_source(self, source: str) -> None:
         """Select input source for Zone 2."""
         source_cmd = self._source_list.get(source, source)
-        await self.hass.async_add_executor_job(
-            self._receiver.serial_command, f"Z2{source_cmd}"
-        )
-        # Optimistic update for immediate UI feedback
-        self._source = source_cmd
-        self.async_write_ha_state()
+        await self._receiver.serial_command(f"Z2{source_cmd}")
+        self._expect(FIELD_SOURCE, source_cmd)
+        self._async_publish()
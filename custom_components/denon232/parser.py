@@ -0,0 +1,230 @@
+"""
+Parser for Denon RS-232 status lines.
+
+Turns RESPONSE and EVENT lines from the AVR-2310 protocol into typed
+events. Both share one format, so polled replies and lines pushed by the
+receiver go through the same code.
+
+Lines are dispatched on their first two characters to a short list of
+prefix handlers, ordered longest prefix first (MVMAX before MV, Z2MU
+before Z2), which keeps parsing to a dict lookup and a startswith or two.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+ZONE_MAIN = "main"
+ZONE_2 = "zone2"
+
+# Volume parameter for the minimum ("---") setting
+VOLUME_MIN = 99
+
+
+@dataclass(frozen=True, slots=True)
+class PowerEvent:
+    """System power changed (PW)."""
+
+    on: bool
+
+
+@dataclass(frozen=True, slots=True)
+class ZonePowerEvent:
+    """A zone was switched on or off (ZM, Z2)."""
+
+    zone: str
+    on: bool
+
+
+@dataclass(frozen=True, slots=True)
+class VolumeEvent:
+    """Volume of a zone, on the 0-98 protocol scale in 0.5 steps."""
+
+    zone: str
+    volume: float
+
+
+@dataclass(frozen=True, slots=True)
+class MaxVolumeEvent:
+    """Highest volume the receiver currently allows (MVMAX)."""
+
+    zone: str
+    volume: float
+
+
+@dataclass(frozen=True, slots=True)
+class MuteEvent:
+    """Mute state of a zone (MU, Z2MU)."""
+
+    zone: str
+    muted: bool
+
+
+@dataclass(frozen=True, slots=True)
+class SourceEvent:
+    """Selected input source of a zone, as the protocol names it."""
+
+    zone: str
+    source: str
+
+
+@dataclass(frozen=True, slots=True)
+class SurroundModeEvent:
+    """Surround mode of the main zone (MS)."""
+
+    mode: str
+
+
+@dataclass(frozen=True, slots=True)
+class ChannelVolumeEvent:
+    """Channel level, 50 is 0 dB, None means the channel is off."""
+
+    zone: str
+    channel: str
+    level: float | None
+
+
+DenonEvent = (
+    PowerEvent
+    | ZonePowerEvent
+    | VolumeEvent
+    | MaxVolumeEvent
+    | MuteEvent
+    | SourceEvent
+    | SurroundModeEvent
+    | ChannelVolumeEvent
+)
+
+
+def parse_level(param: str) -> float | None:
+    """Parse a two or three digit level, the third digit being a half step.
+
+    "50" is 50, "505" is 50.5. Returns None if param is not a level.
+    """
+    if not param.isdigit():
+        return None
+    if len(param) == 2:
+        return int(param)
+    if len(param) == 3 and param[2] == "5":
+        return int(param[:2]) + 0.5
+    return None
+
+
+def _volume(zone: str) -> Callable[[str], DenonEvent | None]:
+    def handle(param: str) -> DenonEvent | None:
+        level = parse_level(param)
+        if level is None:
+            return None
+        # The minimum setting is sent as 99 (or 995 below -80 dB)
+        return VolumeEvent(zone, 0 if level >= VOLUME_MIN else level)
+
+    return handle
+
+
+def _max_volume(param: str) -> DenonEvent | None:
+    level = parse_level(param.strip())
+    return None if level is None else MaxVolumeEvent(ZONE_MAIN, level)
+
+
+def _switch(
+    event: Callable[[str, bool], DenonEvent], zone: str, on: str = "ON", off: str = "OFF"
+) -> Callable[[str], DenonEvent | None]:
+    def handle(param: str) -> DenonEvent | None:
+        if param == on:
+            return event(zone, True)
+        if param == off:
+            return event(zone, False)
+        return None
+
+    return handle
+
+
+def _power(param: str) -> DenonEvent | None:
+    if param == "ON":
+        return PowerEvent(True)
+    if param == "STANDBY":
+        return PowerEvent(False)
+    return None
+
+
+def _source(zone: str) -> Callable[[str], DenonEvent | None]:
+    def handle(param: str) -> DenonEvent | None:
+        return SourceEvent(zone, param) if param else None
+
+    return handle
+
+
+def _surround_mode(param: str) -> DenonEvent | None:
+    return SurroundModeEvent(param) if param else None
+
+
+def _channel_volume(zone: str) -> Callable[[str], DenonEvent | None]:
+    def handle(param: str) -> DenonEvent | None:
+        channel, _, value = param.partition(" ")
+        if not channel or not value:
+            return None
+        if value == "00":
+            # Only the subwoofer reports 00, meaning off
+            return ChannelVolumeEvent(zone, channel, None)
+        level = parse_level(value)
+        return None if level is None else ChannelVolumeEvent(zone, channel, level)
+
+    return handle
+
+
+def _zone2(param: str) -> DenonEvent | None:
+    """Zone 2 reports power, volume and source with the same prefix."""
+    if param == "ON":
+        return ZonePowerEvent(ZONE_2, True)
+    if param == "OFF":
+        return ZonePowerEvent(ZONE_2, False)
+    if param.isdigit():
+        return _zone2_volume(param)
+    if not param or param.startswith("QUICK"):
+        return None
+    return SourceEvent(ZONE_2, param)
+
+
+_zone2_volume = _volume(ZONE_2)
+
+_HANDLERS: dict[str, Callable[[str], DenonEvent | None]] = {
+    "PW": _power,
+    "ZM": _switch(ZonePowerEvent, ZONE_MAIN),
+    "MVMAX": _max_volume,
+    "MV": _volume(ZONE_MAIN),
+    "MU": _switch(MuteEvent, ZONE_MAIN),
+    "SI": _source(ZONE_MAIN),
+    "MS": _surround_mode,
+    "CV": _channel_volume(ZONE_MAIN),
+    "Z2MU": _switch(MuteEvent, ZONE_2),
+    "Z2CV": _channel_volume(ZONE_2),
+    "Z2": _zone2,
+}
+
+
+def _compile(
+    handlers: dict[str, Callable[[str], DenonEvent | None]],
+) -> dict[str, tuple[tuple[str, Callable[[str], DenonEvent | None]], ...]]:
+    """Group handlers by two-character command, longest prefix first."""
+    table: dict[str, list[tuple[str, Callable[[str], DenonEvent | None]]]] = {}
+    for prefix, handler in handlers.items():
+        table.setdefault(prefix[:2], []).append((prefix, handler))
+    return {
+        command: tuple(sorted(entries, key=lambda entry: -len(entry[0])))
+        for command, entries in table.items()
+    }
+
+
+_DISPATCH = _compile(_HANDLERS)
+
+
+def parse_line(line: str) -> DenonEvent | None:
+    """Parse one status line, return None if it is not a known event."""
+    entries = _DISPATCH.get(line[:2])
+    if entries is None:
+        return None
+    for prefix, handler in entries:
+        if line.startswith(prefix):
+            return handler(line[len(prefix) :])
+    return None
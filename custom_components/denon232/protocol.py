@@ -0,0 +1,218 @@
+"""
+Reply matching for the Denon RS-232 protocol.
+
+A request command (COMMAND + "?") is answered with one or more RESPONSE
+lines that use the same prefix as the command. Knowing which lines make
+up the reply lets a reader stop as soon as it is complete instead of
+waiting for the line to go idle.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import NamedTuple
+
+from .const import ZONE2_INPUTS
+
+# How long to wait for optional trailing lines once the required ones arrived.
+# The receiver sends them back to back, so this only has to cover a few bytes.
+OPTIONAL_GRACE = 0.03
+
+# Zone 2 settings that select its source; SOURCE follows the main zone
+ZONE2_SOURCE_SETTINGS = frozenset(ZONE2_INPUTS.values()) | {"SOURCE"}
+
+
+class ResponseSpec(NamedTuple):
+    """Describe the reply to a query command."""
+
+    # Every line of the reply starts with this prefix
+    prefix: str
+    # Number of prefixed lines that complete the reply
+    count: int = 1
+    # Prefixes of lines that may trail the reply
+    optional: tuple[str, ...] = ()
+    # Prefixes that start with prefix but belong to other commands
+    exclude: tuple[str, ...] = ()
+
+    def matches(self, line: str) -> bool:
+        """Return True if line is part of this reply."""
+        return line.startswith(self.prefix) and not line.startswith(self.exclude)
+
+
+RESPONSE_SPECS: dict[str, ResponseSpec] = {
+    "PW?": ResponseSpec("PW"),
+    "MV?": ResponseSpec("MV", optional=("MVMAX",)),
+    "MU?": ResponseSpec("MU"),
+    "SI?": ResponseSpec("SI"),
+    "ZM?": ResponseSpec("ZM"),
+    "MS?": ResponseSpec("MS"),
+    "SD?": ResponseSpec("SD"),
+    "DC?": ResponseSpec("DC"),
+    "SV?": ResponseSpec("SV"),
+    "SLP?": ResponseSpec("SLP"),
+    # Zone 2 answers with its source, its power state and its volume
+    "Z2?": ResponseSpec("Z2", count=3, exclude=("Z2MU", "Z2CV")),
+    "Z2MU?": ResponseSpec("Z2MU"),
+}
+
+
+class ResponseCollector:
+    """Collect the reply lines of one command and tell when it is complete.
+
+    Commands without a known reply accept every line and never complete on
+    their own; the caller ends them when the line goes idle.
+    """
+
+    def __init__(self, cmd: str, spec: ResponseSpec | None = None) -> None:
+        """Start collecting the reply to cmd, spec defaults to the known one."""
+        self.cmd = cmd
+        self.spec = spec if spec is not None else RESPONSE_SPECS.get(cmd)
+        self.lines: list[str] = []
+        self.deadline = float("inf")
+        self.started_at = 0.0
+        self.completed_at: float | None = None
+        self._timeout = 0.0
+        self._matched = 0
+        self._optional_seen: set[str] = set()
+
+    def match_length(self, line: str) -> int:
+        """Return the length of the prefix that ties line to this reply.
+
+        Zero means the line is not part of the reply.
+        """
+        spec = self.spec
+        if spec is None:
+            return 1
+        for optional in spec.optional:
+            if line.startswith(optional):
+                return 0 if optional in self._optional_seen else len(optional)
+        if spec.matches(line) and self._matched < spec.count:
+            return len(spec.prefix)
+        return 0
+
+    def feed(self, line: str) -> bool:
+        """Record line if it belongs to the reply, return True if it did."""
+        if not self.match_length(line):
+            return False
+        spec = self.spec
+        if spec is None:
+            # Unknown replies last until the line has been idle for timeout
+            self.deadline = time.monotonic() + self._timeout
+        else:
+            for optional in spec.optional:
+                if line.startswith(optional):
+                    self._optional_seen.add(optional)
+                    break
+            else:
+                self._matched += 1
+                if self.satisfied and not self.complete:
+                    # Only the optional trailing lines can still come
+                    self.deadline = min(
+                        self.deadline, time.monotonic() + OPTIONAL_GRACE
+                    )
+        self.lines.append(line)
+        if self.complete:
+            self.completed_at = time.monotonic()
+        return True
+
+    def start(self, timeout: float) -> None:
+        """Mark the command as sent, its reply is due within timeout."""
+        self._timeout = timeout
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + timeout
+
+    def elapsed(self) -> float:
+        """Return how long the reply took, or was waited for if incomplete."""
+        end = self.completed_at
+        if end is None:
+            end = min(time.monotonic(), self.deadline)
+        return end - self.started_at
+
+    def done(self, now: float) -> bool:
+        """Return True if the reply is complete or no longer expected."""
+        return self.complete or now >= self.deadline
+
+    @property
+    def satisfied(self) -> bool:
+        """Return True once every required line arrived."""
+        return self.spec is not None and self._matched >= self.spec.count
+
+    @property
+    def complete(self) -> bool:
+        """Return True once the reply cannot grow any further."""
+        return self.satisfied and len(self._optional_seen) == len(self.spec.optional)
+
+    def wait_time(self, timeout: float) -> float:
+        """Return how long to wait for the next line of the reply."""
+        return OPTIONAL_GRACE if self.satisfied else timeout
+
+
+def route_line(
+    collectors: list[ResponseCollector], line: str
+) -> ResponseCollector | None:
+    """Hand line to the pending reply it belongs to, return who claimed it.
+
+    Several queries can be in flight at once, so a line goes to the reply
+    with the most specific matching prefix (Z2MU? before Z2?), and to the
+    oldest of those when prefixes tie.
+    """
+    best: ResponseCollector | None = None
+    best_length = 0
+    for collector in collectors:
+        if collector.complete:
+            continue
+        length = collector.match_length(line)
+        if length > best_length:
+            best, best_length = collector, length
+    if best is None or not best.feed(line):
+        return None
+    return best
+
+
+def echo_spec(cmd: str) -> ResponseSpec | None:
+    """Return the reply confirming a setting command, None if not known.
+
+    The receiver answers a setting with one line in the format its query
+    reply uses (MV50 with MV50, Z2CD with Z2CD).
+    """
+    if cmd.endswith("?"):
+        return None
+    if (spec := RESPONSE_SPECS.get(f"{command_key(cmd)}?")) is None:
+        return None
+    # Trailing lines of the query reply (MVMAX) are no confirmation
+    return ResponseSpec(spec.prefix, exclude=spec.exclude + spec.optional)
+
+
+def command_key(cmd: str) -> str:
+    """Return the command a statistic about cmd is kept under.
+
+    Settings of a parameter share a key ("MV50" and "MVUP" are "MV"),
+    its query has its own ("MV?").
+    """
+    prefix = cmd[:4] if cmd.startswith(("Z2MU", "Z2CV")) else cmd[:2]
+    if cmd.startswith("SLP"):
+        prefix = "SLP"
+    return f"{prefix}?" if cmd.endswith("?") else prefix
+
+
+def coalesce_key(cmd: str) -> str | None:
+    """Return what cmd sets if a later command of the same kind replaces it.
+
+    Direct volume and source selections only matter for their final value,
+    so a queued one can be dropped when a newer one arrives. Returns None
+    for commands that must all reach the receiver (queries, steps, power).
+    """
+    if cmd.endswith("?"):
+        return None
+    if cmd.startswith("MV") and cmd[2:].isdigit():
+        return "MV"
+    if cmd.startswith("SI"):
+        return "SI"
+    if cmd.startswith("Z2"):
+        setting = cmd[2:]
+        if setting.isdigit():
+            return "Z2 volume"
+        # Z2 shares its prefix with every other Zone 2 setting
+        if setting in ZONE2_SOURCE_SETTINGS:
+            return "Z2 source"
+    return None
@@ -0,0 +1,138 @@
+"""
+Volume ramps: moving a zone's volume to a level over a given time.
+
+The receiver only knows absolute levels (MV50, MV505 for 50.5, Z245), so a
+ramp is a series of level commands. The main zone moves in half steps,
+Zone 2 in whole ones. Each level of the way is written at the moment the
+curve reaches it, measured from the start of the ramp on the loop clock so
+late writes do not add up.
+
+The receiver takes a command about every COMMAND_DELAY and each level
+command also needs its bytes on the wire. A ramp that would go faster
+leaves out levels in between rather than fall behind; it always ends with
+the target level at the requested time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+import math
+
+from .denon232_receiver import COMMAND_DELAY
+from .parser import VOLUME_MIN, ZONE_2, ZONE_MAIN
+from .transport import BAUDRATE
+
+# 8N1 sends ten bits per byte
+LINE_RATE = BAUDRATE / 10
+# The longest level command, MV505 and its CR
+LEVEL_COMMAND_BYTES = 6
+# Closest two level writes may follow each other
+MIN_STEP_INTERVAL = COMMAND_DELAY + LEVEL_COMMAND_BYTES / LINE_RATE
+
+# Volume command prefix and smallest step, by zone
+LEVEL_PREFIX = {ZONE_MAIN: "MV", ZONE_2: "Z2"}
+LEVEL_STEP = {ZONE_MAIN: 0.5, ZONE_2: 1.0}
+
+# For each curve, the fraction of the ramp's time at which a fraction of
+# the way is reached
+CURVES: dict[str, Callable[[float], float]] = {
+    "linear": lambda way: way,
+    # Slow start, for fading in
+    "ease_in": math.sqrt,
+    # Slow end, for fading out
+    "ease_out": lambda way: 1 - math.sqrt(1 - way),
+}
+DEFAULT_CURVE = "linear"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def format_level(level: float) -> str:
+    """Return a level as a command parameter: 50, 505 for 50.5, 99 for 0."""
+    if level <= 0:
+        return str(VOLUME_MIN)
+    whole = int(level)
+    if level - whole:
+        return f"{whole:02d}5"
+    return f"{whole:02d}"
+
+
+def level_command(zone: str, level: float) -> str:
+    """Return the command setting zone to level."""
+    return f"{LEVEL_PREFIX[zone]}{format_level(level)}"
+
+
+def plan_ramp(
+    start: float,
+    target: float,
+    duration: float,
+    curve: str = DEFAULT_CURVE,
+    step: float = LEVEL_STEP[ZONE_MAIN],
+    min_interval: float = MIN_STEP_INTERVAL,
+) -> list[tuple[float, float]]:
+    """Return (seconds from start, level) of every write of a ramp.
+
+    Levels lie on the step grid, target is rounded onto it. Writes are at
+    least min_interval apart; levels that would come sooner are left out.
+    """
+    target = round(target / step) * step
+    count = round(abs(target - start) / step)
+    if count == 0:
+        return []
+    if duration <= 0:
+        return [(0.0, target)]
+
+    time_at = CURVES[curve]
+    direction = math.copysign(step, target - start)
+    # Walk back from the target, which keeps its time, so the levels left
+    # out are never the last one
+    plan: list[tuple[float, float]] = [(duration, target)]
+    for index in range(count - 1, 0, -1):
+        offset = duration * time_at(index / count)
+        if plan[-1][0] - offset >= min_interval:
+            plan.append((offset, start + direction * index))
+    plan.reverse()
+    return plan
+
+
+class VolumeRamp:
+    """One ramp of one zone, running as a task until done or cancelled."""
+
+    def __init__(self, zone: str, start: float) -> None:
+        """Initialize a ramp of zone starting at level start."""
+        self.zone = zone
+        # The level last written, where a retarget picks up from
+        self.level = start
+        self.task: asyncio.Task | None = None
+
+    async def run(
+        self,
+        target: float,
+        duration: float,
+        curve: str,
+        send: Callable[[str], Awaitable[None]],
+    ) -> None:
+        """Write the levels of the ramp on time through send."""
+        loop = asyncio.get_running_loop()
+        plan = plan_ramp(self.level, target, duration, curve, LEVEL_STEP[self.zone])
+        _LOGGER.debug(
+            "Ramping %s from %s to %s in %.1f s, %d writes",
+            self.zone,
+            self.level,
+            target,
+            duration,
+            len(plan),
+        )
+        begin = loop.time()
+        for offset, level in plan:
+            if (delay := begin + offset - loop.time()) > 0:
+                await asyncio.sleep(delay)
+            await send(level_command(self.zone, level))
+            self.level = level
+
+    def cancel(self) -> None:
+        """Stop the ramp where it is."""
+        if self.task is not None:
+            self.task.cancel()
@@ -0,0 +1,237 @@
+"""
+Serial traffic capture for the Denon RS-232 receivers.
+
+Every line written to or read from the receiver can be appended to a
+compact binary capture, to reproduce problems seen in the field offline.
+
+A capture file starts with a header:
+
+    8 bytes   magic b"D232CAP2"
+    8 bytes   wall clock time the file was started (float64, seconds)
+    1 byte    1 if the file continues the recording in the one before it
+
+followed by one record per line:
+
+    4 bytes   microseconds since the previous record (uint32)
+    1 byte    direction, 0 for sent and 1 for received
+    1 byte    length of the line
+    n bytes   the line, without its CR
+
+Recording happens on a background thread. The receiver only puts the line
+on a queue, so capturing adds no latency to the serial traffic. Files
+rotate like log files (capture.cap, capture.cap.1, ...) once they reach
+their size limit, and when a new recording starts. Only files rotated
+during a recording share its timeline; capture_sessions() tells them
+apart from older recordings.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from typing import BinaryIO, NamedTuple
+
+MAGIC = b"D232CAP2"
+# Captures from before recordings were told apart, read as one each
+MAGIC_V1 = b"D232CAP1"
+FILE_HEADER = struct.Struct("<8sdB")
+FILE_HEADER_V1 = struct.Struct("<8sd")
+RECORD_HEADER = struct.Struct("<IBB")
+MAX_DELTA_US = 2**32 - 1
+MAX_LINE = 255
+
+TX = 0
+RX = 1
+
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Frame(NamedTuple):
+    """One captured line."""
+
+    # Seconds since the start of the capture
+    time: float
+    direction: int
+    data: bytes
+
+
+class TrafficRecorder:
+    """Append sent and received lines to a rotating capture file."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+    ) -> None:
+        """Start recording to path."""
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.frames = 0
+        self._queue: queue.SimpleQueue[tuple[float, int, bytes] | None] = (
+            queue.SimpleQueue()
+        )
+        self._thread = threading.Thread(
+            target=self._run, name=f"denon232 recorder {path}", daemon=True
+        )
+        self._thread.start()
+
+    def record(self, direction: int, data: bytes) -> None:
+        """Queue a line for the capture, never blocks."""
+        self._queue.put((time.monotonic(), direction, data))
+
+    def close(self, wait: bool = True) -> None:
+        """Stop recording once what is queued has been written.
+
+        With wait False this returns right away and the file is finished
+        in the background.
+        """
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+    def _run(self) -> None:
+        """Write queued lines until closed."""
+        capture = None
+        last = 0.0
+        try:
+            while (item := self._queue.get()) is not None:
+                if capture is None:
+                    capture = self._open(continues=False)
+                    last = item[0]
+                elif capture.tell() >= self.max_bytes:
+                    # The next file continues the timeline of this one
+                    capture.close()
+                    capture = self._open(continues=True)
+                capture.write(self._encode(item, last))
+                last = item[0]
+                self.frames += 1
+                if self._queue.empty():
+                    # Nothing else pending, make it visible to readers
+                    capture.flush()
+        except OSError as err:
+            _LOGGER.error("Stopped recording to %s: %s", self.path, err)
+        finally:
+            if capture is not None:
+                capture.close()
+
+    def _open(self, continues: bool) -> BinaryIO:
+        """Start a new capture file, moving an existing one out of the way."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path):
+            self._rotate()
+        capture = open(self.path, "wb")  # noqa: SIM115
+        capture.write(FILE_HEADER.pack(MAGIC, time.time(), continues))
+        return capture
+
+    def _rotate(self) -> None:
+        """Shift capture.cap to capture.cap.1 and so on, dropping the oldest."""
+        for index in range(self.backup_count, 0, -1):
+            source = self.path if index == 1 else f"{self.path}.{index - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index}")
+        if not self.backup_count and os.path.exists(self.path):
+            os.remove(self.path)
+
+    @staticmethod
+    def _encode(item: tuple[float, int, bytes], last: float) -> bytes:
+        """Encode one record."""
+        timestamp, direction, data = item
+        delta = min(MAX_DELTA_US, max(0, round((timestamp - last) * 1_000_000)))
+        data = data[:MAX_LINE]
+        return RECORD_HEADER.pack(delta, direction, len(data)) + data
+
+
+def _read_header(capture: BinaryIO, path: str) -> bool:
+    """Read the header of a capture, return True if it continues the last."""
+    header = capture.read(FILE_HEADER.size)
+    if header[:8] == MAGIC and len(header) == FILE_HEADER.size:
+        return bool(FILE_HEADER.unpack(header)[2])
+    if header[:8] == MAGIC_V1 and len(header) >= FILE_HEADER_V1.size:
+        # One byte shorter, the first record starts right after it
+        capture.seek(FILE_HEADER_V1.size)
+        return False
+    raise ValueError(f"{path} is not a denon232 capture")
+
+
+def read_capture(path: str) -> Iterator[Frame]:
+    """Read the frames of one capture file.
+
+    A record cut short at the end, as left by a crash, ends the capture.
+    """
+    with open(path, "rb") as capture:
+        _read_header(capture, path)
+        elapsed = 0
+        while len(record := capture.read(RECORD_HEADER.size)) == RECORD_HEADER.size:
+            delta, direction, length = RECORD_HEADER.unpack(record)
+            data = capture.read(length)
+            if len(data) < length:
+                return
+            elapsed += delta
+            yield Frame(elapsed / 1_000_000, direction, data)
+
+
+def capture_files(path: str) -> list[str]:
+    """Return path and its rotated files, oldest first."""
+    files = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        files.append(f"{path}.{index}")
+        index += 1
+    files.reverse()
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def capture_sessions(paths: Iterable[str]) -> list[list[str]]:
+    """Group capture files, oldest first, by the recording they belong to."""
+    sessions: list[list[str]] = []
+    for path in paths:
+        with open(path, "rb") as capture:
+            continues = _read_header(capture, path)
+        if continues and sessions:
+            sessions[-1].append(path)
+        else:
+            sessions.append([path])
+    return sessions
+
+
+def read_captures(paths: Iterable[str]) -> Iterator[Frame]:
+    """Read the files of one recording as one timeline, in the given order."""
+    offset = 0.0
+    for path in paths:
+        last = 0.0
+        for frame in read_capture(path):
+            last = frame.time
+            yield frame._replace(time=offset + frame.time)
+        offset += last
+
+
+def replay(
+    frames: Iterable[Frame],
+    callback: Callable[[Frame], None],
+    speed: float = 1.0,
+) -> None:
+    """Hand frames to callback with their original spacing.
+
+    speed 2 replays twice as fast, 0 as fast as possible.
+    """
+    start = time.monotonic()
+    for frame in frames:
+        if speed:
+            delay = start + frame.time / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        callback(frame)
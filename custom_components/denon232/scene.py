@@ -0,0 +1,61 @@
+"""
+Scenes: settings of both zones applied to the receiver in one go.
+
+A scene lists what each zone should end up with. It is sent as one
+transaction, so the commands go out back to back and the receiver's
+answers confirm each of them.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .parser import ZONE_2, ZONE_MAIN
+from .ramp import LEVEL_STEP, level_command
+
+# Power on, power off and mute prefix of each zone. The main zone is
+# switched with the receiver's power, like its media player does.
+POWER_COMMANDS = {ZONE_MAIN: ("PWON", "PWSTANDBY"), ZONE_2: ("Z2ON", "Z2OFF")}
+SOURCE_PREFIX = {ZONE_MAIN: "SI", ZONE_2: "Z2"}
+MUTE_PREFIX = {ZONE_MAIN: "MU", ZONE_2: "Z2MU"}
+
+
+@dataclass(frozen=True, slots=True)
+class ZoneScene:
+    """What one zone should be set to, None leaves a setting as it is."""
+
+    power: bool | None = None
+    # Source command, e.g. DVD
+    source: str | None = None
+    # Volume level, rounded to the zone's steps
+    volume: float | None = None
+    mute: bool | None = None
+
+    def commands(self, zone: str) -> list[str]:
+        """Return the commands that set zone, power first."""
+        power_on, power_off = POWER_COMMANDS[zone]
+        if self.power is False:
+            # Nothing else is taken in standby
+            return [power_off]
+        commands = [power_on] if self.power else []
+        if self.source is not None:
+            commands.append(f"{SOURCE_PREFIX[zone]}{self.source}")
+        if self.volume is not None:
+            step = LEVEL_STEP[zone]
+            commands.append(level_command(zone, round(self.volume / step) * step))
+        if self.mute is not None:
+            commands.append(f"{MUTE_PREFIX[zone]}{'ON' if self.mute else 'OFF'}")
+        return commands
+
+
+def scene_commands(main: ZoneScene, zone2: ZoneScene) -> list[str]:
+    """Return the commands of a scene in the order they are sent.
+
+    Switching the main zone off puts the whole receiver in standby, so it
+    comes last; switching it on comes first, so both zones can follow.
+    """
+    main_commands = main.commands(ZONE_MAIN)
+    zone2_commands = zone2.commands(ZONE_2)
+    if main.power is False:
+        return zone2_commands + main_commands
+    return main_commands + zone2_commands
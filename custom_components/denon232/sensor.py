@@ -0,0 +1,127 @@
+"""Diagnostic sensors for the Denon AVR RS-232 integration."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .async_receiver import PRIORITY_INTERACTIVE
+from .const import CONF_SERIAL_PORT, DOMAIN
+from .coordinator import Denon232Coordinator
+
+
+@dataclass(frozen=True, kw_only=True)
+class Denon232SensorEntityDescription(SensorEntityDescription):
+    """Describe a statistic of the receiver or its entities as a sensor."""
+
+    value_fn: Callable[[Denon232Coordinator], float | int]
+
+
+SENSORS: tuple[Denon232SensorEntityDescription, ...] = (
+    Denon232SensorEntityDescription(
+        key="command_latency",
+        name="Command latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        # 95th percentile of the recent round trips, waiting included
+        value_fn=lambda coordinator: round(
+            coordinator.receiver.metrics.total.percentile(95) * 1000, 1
+        ),
+    ),
+    Denon232SensorEntityDescription(
+        key="queue_delay",
+        name="Command queue delay",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: round(
+            coordinator.receiver.queue_delay_percentile(PRIORITY_INTERACTIVE, 95) * 1000, 1
+        ),
+    ),
+    Denon232SensorEntityDescription(
+        key="reply_timeouts",
+        name="Reply timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.receiver.metrics.timeouts,
+    ),
+    Denon232SensorEntityDescription(
+        key="empty_replies",
+        name="Empty replies",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.receiver.metrics.empty_replies,
+    ),
+    Denon232SensorEntityDescription(
+        key="serial_errors",
+        name="Serial errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.receiver.metrics.serial_errors,
+    ),
+    Denon232SensorEntityDescription(
+        key="framing_errors",
+        name="Framing errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        # Received lines dropped because line noise damaged them
+        value_fn=lambda coordinator: coordinator.receiver.metrics.framing_errors,
+    ),
+    Denon232SensorEntityDescription(
+        key="suppressed_state_writes",
+        name="Suppressed state writes",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        # Media player updates skipped because nothing they show changed
+        value_fn=lambda coordinator: coordinator.state_writes.suppressed,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the diagnostic sensors from a config entry."""
+    coordinator: Denon232Coordinator = hass.data[DOMAIN][entry.entry_id]
+    serial_port = entry.data[CONF_SERIAL_PORT]
+    async_add_entities(
+        Denon232Sensor(coordinator, serial_port, description) for description in SENSORS
+    )
+
+
+class Denon232Sensor(CoordinatorEntity[Denon232Coordinator], SensorEntity):
+    """A statistic of the receiver's serial link, refreshed every poll."""
+
+    entity_description: Denon232SensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: Denon232Coordinator,
+        serial_port: str,
+        description: Denon232SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{serial_port}_{description.key}"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, serial_port)})
+
+    @property
+    def available(self) -> bool:
+        """Return True, the statistics are kept while the receiver is away."""
+        return True
+
+    @property
+    def native_value(self) -> float | int:
+        """Return the current value of the statistic."""
+        return self.entity_description.value_fn(self.coordinator)
@@ -0,0 +1,99 @@
+"""
+Holding commands while the receiver powers up.
+
+Switched on from standby, the receiver echoes the power command right
+away but then ignores everything else for about a second while it starts
+up. Commands sent in that time are lost without an answer.
+
+Instead of sleeping for a fixed time, the receiver is asked for its input
+source every PROBE_INTERVAL once a power-on command went out. An answer
+to the probe shows it is listening again; other lines prove nothing, as
+the receiver reports the zones it switched on (ZMON after PWON) while it
+is still starting up. Commands queued meanwhile go out right after; a
+receiver that never answers is given up on after SETTLE_TIMEOUT and
+commands flow as before.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+# Commands that start the receiver up when it is in standby
+POWER_ON_COMMANDS = frozenset({"PWON", "ZMON", "Z2ON"})
+# Cheap to answer and answered by every model, but only once started
+PROBE = "SI?"
+PROBE_REPLY_PREFIX = "SI"
+PROBE_INTERVAL = 0.1
+# The AVR-2310 needs about a second, leave room for slower models
+SETTLE_TIMEOUT = 5.0
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PowerSettle:
+    """Track the receiver's power and whether it is still starting up."""
+
+    __slots__ = ("command", "power", "started_at", "until")
+
+    def __init__(self) -> None:
+        """Initialize with the power state unknown."""
+        # Last reported system power, None until the receiver told
+        self.power: bool | None = None
+        # The power-on command being waited for, and since when
+        self.command: str | None = None
+        self.started_at = 0.0
+        self.until = 0.0
+
+    @property
+    def settling(self) -> bool:
+        """Return True while commands have to be held."""
+        return self.command is not None
+
+    def begin(self, cmd: str) -> bool:
+        """Note a command that was written, return True if it starts settling.
+
+        Only a power-on command sent while the receiver is not known to be
+        on does.
+        """
+        if cmd not in POWER_ON_COMMANDS or self.power or self.settling:
+            return False
+        self.command = cmd
+        self.started_at = time.monotonic()
+        self.until = self.started_at + SETTLE_TIMEOUT
+        _LOGGER.debug("Holding commands until the receiver answers after %s", cmd)
+        return True
+
+    def observe(self, line: str) -> bool:
+        """Note a received line, return True if it ended settling."""
+        if line.startswith("PW"):
+            self.power = line == "PWON"
+            return False
+        if self.command is None or not line.startswith(PROBE_REPLY_PREFIX):
+            # Echoes of the power command and what it switched on come
+            # before the start-up
+            return False
+        _LOGGER.debug(
+            "Receiver ready %.2f s after %s",
+            time.monotonic() - self.started_at,
+            self.command,
+        )
+        self.command = None
+        return True
+
+    def expired(self, now: float) -> bool:
+        """Return True, and stop settling, once the wait is over."""
+        if self.command is None or now < self.until:
+            return False
+        _LOGGER.warning(
+            "Receiver did not answer within %.0f s after %s, sending anyway",
+            SETTLE_TIMEOUT,
+            self.command,
+        )
+        self.command = None
+        return True
+
+    def reset(self) -> None:
+        """Forget everything, e.g. after the connection was lost."""
+        self.power = None
+        self.command = None
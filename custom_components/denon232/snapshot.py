@@ -0,0 +1,47 @@
+"""
+What a zone entity last published to Home Assistant.
+
+The coordinator hands every poll to every entity and the receiver pushes
+lines that often repeat what is already shown (a poll reply, the echo of
+a confirmed command). Home Assistant takes each state write as an update,
+so an entity compares what it would publish with what it published last
+and skips the write when nothing changed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class SourceTable:
+    """The sources of a zone, looked up both ways without scanning."""
+
+    # Friendly names, sorted as the source list shows them
+    names: list[str]
+    # Source command -> friendly name
+    by_command: dict[str, str]
+
+    @classmethod
+    def from_sources(cls, sources: dict[str, str]) -> SourceTable:
+        """Return the table of sources given as friendly name -> command."""
+        return cls(
+            names=sorted(sources),
+            by_command={command: name for name, command in sources.items()},
+        )
+
+    def name(self, command: str | None) -> str | None:
+        """Return the friendly name of a source command, or the command."""
+        return self.by_command.get(command, command)
+
+
+@dataclass(frozen=True, slots=True)
+class ZoneSnapshot:
+    """Everything a zone entity publishes, compared to skip unchanged writes."""
+
+    available: bool
+    state: str
+    volume_level: float
+    muted: bool
+    source: str | None
+    source_list: list[str]
@@ -0,0 +1,224 @@
+"""
+Cached receiver state for the Denon AVR RS-232 integration.
+
+Every status line the receiver sends, whether it answers a query or is
+pushed on its own, confirms part of the receiver's state. Recording when
+each value was last confirmed lets a command use what is already known
+instead of asking the receiver again, as long as it is recent enough.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, NamedTuple
+
+from .parser import (
+    ZONE_2,
+    ZONE_MAIN,
+    ChannelVolumeEvent,
+    DenonEvent,
+    MaxVolumeEvent,
+    MuteEvent,
+    PowerEvent,
+    SourceEvent,
+    SurroundModeEvent,
+    VolumeEvent,
+    ZonePowerEvent,
+)
+
+FIELD_POWER = "power"
+FIELD_ZONE_POWER = "zone_power"
+FIELD_VOLUME = "volume"
+FIELD_MAX_VOLUME = "max_volume"
+FIELD_MUTED = "muted"
+FIELD_SOURCE = "source"
+FIELD_SURROUND_MODE = "surround_mode"
+
+# How long a value is trusted without being confirmed again. The receiver
+# pushes every change and the coordinator re-reads everything each poll,
+# so this only has to outlast a poll interval with some room to spare.
+DEFAULT_MAX_AGE = 30.0
+
+# How long after its command was written an optimistic value waits for
+# the receiver to answer. Replies take well under 200 ms; a command the
+# receiver ignored gets no answer at all.
+OPTIMISTIC_TIMEOUT = 1.0
+
+# Query that refreshes each field of each zone
+REFRESH_QUERIES: dict[tuple[str, str], str] = {
+    (ZONE_MAIN, FIELD_POWER): "PW?",
+    (ZONE_MAIN, FIELD_ZONE_POWER): "ZM?",
+    (ZONE_MAIN, FIELD_VOLUME): "MV?",
+    (ZONE_MAIN, FIELD_MAX_VOLUME): "MV?",
+    (ZONE_MAIN, FIELD_MUTED): "MU?",
+    (ZONE_MAIN, FIELD_SOURCE): "SI?",
+    (ZONE_MAIN, FIELD_SURROUND_MODE): "MS?",
+    (ZONE_2, FIELD_ZONE_POWER): "Z2?",
+    (ZONE_2, FIELD_VOLUME): "Z2?",
+    (ZONE_2, FIELD_SOURCE): "Z2?",
+    (ZONE_2, FIELD_MUTED): "Z2MU?",
+}
+
+
+def event_value(event: DenonEvent | None) -> tuple[str, str, Any] | None:
+    """Return the zone, field and value an event reports, None if none."""
+    match event:
+        case PowerEvent(on=on):
+            return ZONE_MAIN, FIELD_POWER, on
+        case ZonePowerEvent(zone=zone, on=on):
+            return zone, FIELD_ZONE_POWER, on
+        case MaxVolumeEvent(zone=zone, volume=volume):
+            return zone, FIELD_MAX_VOLUME, volume
+        case VolumeEvent(zone=zone, volume=volume):
+            return zone, FIELD_VOLUME, volume
+        case MuteEvent(zone=zone, muted=muted):
+            return zone, FIELD_MUTED, muted
+        case SourceEvent(zone=zone, source=source):
+            return zone, FIELD_SOURCE, source
+        case SurroundModeEvent(mode=mode):
+            return ZONE_MAIN, FIELD_SURROUND_MODE, mode
+        case ChannelVolumeEvent(zone=zone, channel=channel, level=level):
+            return zone, f"channel {channel}", level
+    return None
+
+
+class CachedValue(NamedTuple):
+    """A state value and when the receiver last confirmed it."""
+
+    value: Any
+    confirmed_at: float
+
+
+class ReceiverState:
+    """Last known value of every field the receiver reported."""
+
+    def __init__(self, max_age: float = DEFAULT_MAX_AGE) -> None:
+        """Initialize an empty state."""
+        self.max_age = max_age
+        self._values: dict[tuple[str, str], CachedValue] = {}
+
+    def apply(self, event: DenonEvent | None) -> bool:
+        """Record the value an event reports, return True if it had one."""
+        if (reported := event_value(event)) is None:
+            return False
+        self.set(*reported)
+        return True
+
+    def set(self, zone: str, field: str, value: Any) -> None:
+        """Record a value the receiver just confirmed."""
+        self._values[zone, field] = CachedValue(value, time.monotonic())
+
+    def get(
+        self, zone: str, field: str, max_age: float | None = None
+    ) -> CachedValue | None:
+        """Return the cached value if it was confirmed within max_age."""
+        cached = self._values.get((zone, field))
+        if cached is None:
+            return None
+        if max_age is None:
+            max_age = self.max_age
+        if time.monotonic() - cached.confirmed_at > max_age:
+            return None
+        return cached
+
+    def clear(self) -> None:
+        """Forget everything, e.g. after the connection was lost."""
+        self._values.clear()
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return every known value and its age in seconds, by zone."""
+        now = time.monotonic()
+        result: dict[str, dict[str, Any]] = {}
+        for (zone, field), cached in sorted(self._values.items()):
+            result.setdefault(zone, {})[field] = {
+                "value": cached.value,
+                "age_s": round(now - cached.confirmed_at, 1),
+            }
+        return result
+
+
+class PendingChange(NamedTuple):
+    """A value shown before the receiver confirmed it."""
+
+    value: Any
+    # What was shown before, and is shown again if no answer comes
+    previous: Any
+    deadline: float
+    # Writes to the receiver up to and including the command
+    after: int = 0
+
+
+class OptimisticState:
+    """Values a zone shows ahead of the receiver's answer, by field.
+
+    Every command that changes a setting is answered with the setting's
+    new value. That answer confirms the value shown, or replaces it when
+    the receiver clamped or rounded it. Without one by the deadline, the
+    receiver ignored the command and the previous value is shown again.
+
+    A reply to a query written before the command may still be on its
+    way when the command goes out; it reports the old value and is
+    neither a confirmation nor a correction.
+    """
+
+    def __init__(self, timeout: float = OPTIMISTIC_TIMEOUT) -> None:
+        """Initialize with nothing pending."""
+        self.timeout = timeout
+        self._pending: dict[str, PendingChange] = {}
+
+    def __contains__(self, field: str) -> bool:
+        """Return True if a change of field waits for an answer."""
+        return field in self._pending
+
+    def __len__(self) -> int:
+        """Return the number of changes waiting for an answer."""
+        return len(self._pending)
+
+    def expect(self, field: str, value: Any, previous: Any, after: int = 0) -> None:
+        """Note a command was written that sets field to value.
+
+        after is the number of writes to the receiver once it was sent.
+        """
+        if (pending := self._pending.get(field)) is not None:
+            # Stepped again before the answer, the last answer still counts
+            previous = pending.previous
+        self._pending[field] = PendingChange(
+            value, previous, time.monotonic() + self.timeout, after
+        )
+
+    def stale(self, field: str, answering: int | None) -> bool:
+        """Return True if a report of field predates its pending change.
+
+        answering is the number of the write the report answers, None if
+        it answers no query.
+        """
+        if answering is None or (pending := self._pending.get(field)) is None:
+            return False
+        return answering <= pending.after
+
+    def resolve(self, field: str, value: Any) -> bool | None:
+        """Note the receiver reported field.
+
+        Returns True if that confirms the pending value, False if it
+        differs and None if no change of field was pending.
+        """
+        if (pending := self._pending.pop(field, None)) is None:
+            return None
+        return pending.value == value
+
+    def expire(self, now: float | None = None) -> dict[str, Any]:
+        """Drop changes past their deadline, return their previous values."""
+        if now is None:
+            now = time.monotonic()
+        expired = {
+            field: pending.previous
+            for field, pending in self._pending.items()
+            if pending.deadline <= now
+        }
+        for field in expired:
+            del self._pending[field]
+        return expired
+
+    def next_deadline(self) -> float | None:
+        """Return when the next pending change runs out, None if none."""
+        return min((p.deadline for p in self._pending.values()), default=None)
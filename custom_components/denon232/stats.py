@@ -0,0 +1,170 @@
+"""Latency statistics for the Denon AVR RS-232 integration."""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+from .protocol import ResponseCollector, command_key
+
+# Recent samples kept per statistic; enough for a stable p99
+DEFAULT_WINDOW = 512
+
+
+class LatencySamples:
+    """Keep the most recent samples of a latency and report percentiles."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        """Initialize an empty sample window."""
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Record one latency sample."""
+        self._samples.append(seconds)
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct: float) -> float:
+        """Return the given percentile of the recent samples, in seconds."""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+        return ordered[index]
+
+    def as_dict(self) -> dict[str, float]:
+        """Summarize the samples in milliseconds."""
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class StateWrites:
+    """How often entities wrote their state, and skipped an unchanged one.
+
+    Every received line an entity applies and every coordinator update is
+    one attempt; a poll cycle of a receiver that did not change is skipped
+    once per reply line of the zone and once per zone for the update.
+    """
+
+    __slots__ = ("published", "suppressed")
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.published = 0
+        self.suppressed = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters."""
+        return {"published": self.published, "suppressed": self.suppressed}
+
+
+class CommandStats:
+    """Timings and failures of one kind of command.
+
+    wait is the time spent before the command got the wire (lock or
+    scheduler queue), write the time to hand it to the port and read the
+    time from then until its reply was complete or given up on.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.wait = LatencySamples()
+        self.write = LatencySamples()
+        self.read = LatencySamples()
+        self.count = 0
+        self.timeouts = 0
+        self.empty_replies = 0
+        self.errors = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Summarize the statistics."""
+        return {
+            "count": self.count,
+            "timeouts": self.timeouts,
+            "empty_replies": self.empty_replies,
+            "errors": self.errors,
+            "wait": self.wait.as_dict(),
+            "write": self.write.as_dict(),
+            "read": self.read.as_dict(),
+        }
+
+
+class CommandMetrics:
+    """Per-command statistics of one receiver connection."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.commands: dict[str, CommandStats] = {}
+        # Round trip of every command, for an overall figure
+        self.total = LatencySamples()
+        self.timeouts = 0
+        self.empty_replies = 0
+        self.serial_errors = 0
+        self.framing_errors = 0
+
+    def _stats(self, cmd: str) -> CommandStats:
+        key = command_key(cmd)
+        if (stats := self.commands.get(key)) is None:
+            stats = self.commands[key] = CommandStats()
+        return stats
+
+    def record(
+        self,
+        cmd: str,
+        wait: float,
+        write: float,
+        reply: ResponseCollector | None = None,
+        read: float | None = None,
+    ) -> None:
+        """Record a command that went out, and its reply if one was read.
+
+        The read time is taken from reply unless given.
+        """
+        stats = self._stats(cmd)
+        stats.count += 1
+        stats.wait.add(wait)
+        stats.write.add(write)
+        total = wait + write
+        if reply is not None:
+            if read is None:
+                read = reply.elapsed()
+            stats.read.add(read)
+            total += read
+            if not reply.lines:
+                stats.empty_replies += 1
+                self.empty_replies += 1
+            if reply.spec is not None and not reply.satisfied:
+                # Replies without a spec always end by going quiet
+                stats.timeouts += 1
+                self.timeouts += 1
+        self.total.add(total)
+
+    def error(self, cmd: str | None = None) -> None:
+        """Count a serial error, against cmd if it happened during one."""
+        self.serial_errors += 1
+        if cmd is not None:
+            self._stats(cmd).errors += 1
+
+    def framing_error(self) -> None:
+        """Count a received line that was dropped as damaged."""
+        self.framing_errors += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Summarize the metrics."""
+        return {
+            "total": self.total.as_dict(),
+            "timeouts": self.timeouts,
+            "empty_replies": self.empty_replies,
+            "serial_errors": self.serial_errors,
+            "framing_errors": self.framing_errors,
+            "commands": {
+                key: stats.as_dict() for key, stats in sorted(self.commands.items())
+            },
+        }
@@ -0,0 +1,296 @@
+"""
+Transports for the Denon RS-232 receivers.
+
+A receiver is usually on a local serial port, but it can also sit behind
+an RS-232-to-Ethernet bridge such as ser2net. The port is then given as
+a URL instead of a device path:
+
+    socket://host:port    raw TCP, the bridge passes bytes through
+    rfc2217://host:port   serial over telnet (RFC 2217)
+
+TCP connections are kept open, send every command right away
+(TCP_NODELAY) and use keepalives, so a bridge that disappears without
+closing the connection is noticed and the receiver can reconnect.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import struct
+from urllib.parse import urlsplit
+
+import serial
+
+BAUDRATE = 9600
+
+CONNECT_TIMEOUT = 5.0
+# A silent link is probed after KEEPALIVE_IDLE seconds and given up after
+# KEEPALIVE_COUNT unanswered probes, about 25 s in total
+KEEPALIVE_IDLE = 10
+KEEPALIVE_INTERVAL = 5
+KEEPALIVE_COUNT = 3
+# Written data left unacknowledged this long fails the connection (Linux)
+USER_TIMEOUT_MS = 20000
+
+# Telnet commands and the options RFC 2217 uses
+IAC = 255
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250
+SE = 240
+BINARY = 0
+SGA = 3
+COM_PORT_OPTION = 44
+SET_BAUDRATE = 1
+SET_DATASIZE = 2
+SET_PARITY = 3
+SET_STOPSIZE = 4
+PARITY_NONE = 1
+STOPSIZE_1 = 1
+
+
+def is_url(port: str) -> bool:
+    """Return True if port is a URL rather than a local device path."""
+    return "://" in port
+
+
+def configure_socket(sock: socket.socket) -> None:
+    """Send without delay and detect dead links with keepalives."""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # Not every platform lets the keepalive timing be tuned
+    for option, value in (
+        ("TCP_KEEPIDLE", KEEPALIVE_IDLE),
+        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+        ("TCP_KEEPCNT", KEEPALIVE_COUNT),
+        ("TCP_USER_TIMEOUT", USER_TIMEOUT_MS),
+    ):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+
+def open_serial(port: str, timeout: float, write_timeout: float) -> serial.Serial:
+    """Open port for blocking reads and writes.
+
+    pyserial handles the URLs itself; its sockets only get the options.
+    """
+    if urlsplit(port).scheme == "rfc2217":
+        # Not supported by pyserial's RFC 2217 client, the socket's user
+        # timeout bounds writes instead
+        write_timeout = None
+    ser = serial.serial_for_url(
+        port,
+        baudrate=BAUDRATE,
+        bytesize=8,
+        parity="N",
+        stopbits=1,
+        timeout=timeout,
+        write_timeout=write_timeout,
+    )
+    # pyserial keeps the connection of URL ports in _socket
+    if (sock := getattr(ser, "_socket", None)) is not None:
+        configure_socket(sock)
+    return ser
+
+
+class LocalPort:
+    """A local serial port used without blocking."""
+
+    def __init__(self, path: str) -> None:
+        """Open the port."""
+        self.ser = serial.Serial(
+            path, baudrate=BAUDRATE, bytesize=8, parity="N", stopbits=1, timeout=0
+        )
+        self._fd = self.ser.fileno()
+        os.set_blocking(self._fd, False)
+
+    def fileno(self) -> int:
+        """Return the file descriptor to wait on."""
+        return self._fd
+
+    def read(self) -> bytes:
+        """Return what is available, raise BlockingIOError if nothing is."""
+        data = os.read(self._fd, 1024)
+        if not data:
+            raise ConnectionResetError("port closed")
+        return data
+
+    def write(self, data: bytes) -> int:
+        """Write what the port takes right away, return how much that was."""
+        return os.write(self._fd, data)
+
+    def close(self) -> None:
+        """Close the port."""
+        self.ser.close()
+
+
+class TcpPort:
+    """A raw TCP connection to a serial bridge, used without blocking."""
+
+    def __init__(self, host: str, port: int) -> None:
+        """Connect to the bridge."""
+        self.sock = socket.create_connection((host, port), CONNECT_TIMEOUT)
+        configure_socket(self.sock)
+        self.sock.setblocking(False)
+
+    def fileno(self) -> int:
+        """Return the file descriptor to wait on."""
+        return self.sock.fileno()
+
+    def read(self) -> bytes:
+        """Return what is available, raise BlockingIOError if nothing is."""
+        data = self.sock.recv(1024)
+        if not data:
+            raise ConnectionResetError("connection closed by the bridge")
+        return data
+
+    def write(self, data: bytes) -> int:
+        """Send what the socket takes right away, return how much that was."""
+        return self.sock.send(data)
+
+    def close(self) -> None:
+        """Close the connection."""
+        self.sock.close()
+
+
+class TelnetFilter:
+    """Separate serial data from telnet negotiation.
+
+    Only what RFC 2217 needs: binary mode and suppress-go-ahead are
+    accepted, every other option is refused, and subnegotiations (the
+    bridge confirming the port settings) are skipped.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the filter."""
+        self._state = "data"
+        self._verb = 0
+        # Answers already sent, telnet forbids repeating them
+        self._sent: set[tuple[int, int]] = set()
+
+    def negotiate(self) -> bytes:
+        """Return what the client sends first: its options and port settings."""
+        data = bytearray()
+        for verb, option in (
+            (WILL, BINARY),
+            (DO, BINARY),
+            (WILL, SGA),
+            (DO, SGA),
+            (WILL, COM_PORT_OPTION),
+        ):
+            self._sent.add((verb, option))
+            data += bytes((IAC, verb, option))
+        for command, value in (
+            (SET_BAUDRATE, struct.pack(">I", BAUDRATE)),
+            (SET_DATASIZE, b"\x08"),
+            (SET_PARITY, bytes((PARITY_NONE,))),
+            (SET_STOPSIZE, bytes((STOPSIZE_1,))),
+        ):
+            payload = value.replace(b"\xff", b"\xff\xff")
+            data += bytes((IAC, SB, COM_PORT_OPTION, command)) + payload
+            data += bytes((IAC, SE))
+        return bytes(data)
+
+    def feed(self, data: bytes) -> tuple[bytes, bytes]:
+        """Return the serial data in data and the answers to send back."""
+        payload = bytearray()
+        answers = bytearray()
+        for byte in data:
+            state = self._state
+            if state == "data":
+                if byte == IAC:
+                    self._state = "iac"
+                else:
+                    payload.append(byte)
+            elif state == "iac":
+                if byte == IAC:
+                    payload.append(IAC)
+                    self._state = "data"
+                elif byte in (DO, DONT, WILL, WONT):
+                    self._verb = byte
+                    self._state = "option"
+                elif byte == SB:
+                    self._state = "sb"
+                else:
+                    self._state = "data"
+            elif state == "option":
+                answers += self._answer(self._verb, byte)
+                self._state = "data"
+            elif state == "sb":
+                if byte == IAC:
+                    self._state = "sb_iac"
+            else:
+                # IAC inside a subnegotiation: SE ends it, IAC IAC is data
+                self._state = "data" if byte == SE else "sb"
+        return bytes(payload), bytes(answers)
+
+    def _answer(self, verb: int, option: int) -> bytes:
+        """Return the answer to a negotiation, or nothing if already given."""
+        if verb == DO:
+            answer = WILL if option in (BINARY, SGA, COM_PORT_OPTION) else WONT
+        elif verb == WILL:
+            answer = DO if option in (BINARY, SGA) else DONT
+        elif verb == DONT:
+            answer = WONT
+        else:
+            answer = DONT
+        if (answer, option) in self._sent:
+            return b""
+        self._sent.add((answer, option))
+        return bytes((IAC, answer, option))
+
+
+class Rfc2217Port(TcpPort):
+    """A serial bridge speaking RFC 2217, used without blocking."""
+
+    def __init__(self, host: str, port: int) -> None:
+        """Connect to the bridge and set the port to 9600 8N1."""
+        super().__init__(host, port)
+        self._telnet = TelnetFilter()
+        self.sock.sendall(self._telnet.negotiate())
+
+    def read(self) -> bytes:
+        """Return the serial data that is available, answering negotiations.
+
+        May return nothing if only negotiation arrived.
+        """
+        data, answers = self._telnet.feed(super().read())
+        if answers:
+            # A few bytes, the socket buffer always has room for them
+            self.sock.send(answers)
+        return data
+
+    def write(self, data: bytes) -> int:
+        """Send data, escaping the telnet command byte."""
+        escaped = data.replace(b"\xff", b"\xff\xff")
+        sent = super().write(escaped)
+        if sent < len(escaped):
+            # Callers count in unescaped bytes; commands are ASCII, so this
+            # only matters in theory
+            return sent - escaped[:sent].count(b"\xff\xff")
+        return len(data)
+
+
+def open_port(port: str) -> LocalPort | TcpPort:
+    """Open a device path or a socket:// or rfc2217:// URL without blocking.
+
+    The open itself blocks, run it in an executor.
+    """
+    if not is_url(port):
+        return LocalPort(port)
+    try:
+        url = urlsplit(port)
+        host, number = url.hostname, url.port
+    except ValueError as err:
+        # A port that is not a number, or a broken IPv6 address
+        raise serial.SerialException(f"Malformed port URL {port}: {err}") from err
+    if not host or not number:
+        raise serial.SerialException(f"{port} needs a host and a port")
+    if url.scheme == "socket":
+        return TcpPort(host, number)
+    if url.scheme == "rfc2217":
+        return Rfc2217Port(host, number)
+    raise serial.SerialException(f"Unsupported port URL {port}")
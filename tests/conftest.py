@@ -0,0 +1,20 @@
+"""Shared fixtures for the Denon AVR RS-232 tests."""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from avr_simulator import SimulatedAVR  # noqa: E402  pylint: disable=wrong-import-position
+
+
+@pytest.fixture
+def avr():
+    """Return a simulated receiver on a pseudo-terminal."""
+    with SimulatedAVR(latency=0.01) as simulated:
+        yield simulated
@@ -0,0 +1,210 @@
+"""Tests for the asyncio receiver's scheduler."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from custom_components.denon232 import async_receiver
+from custom_components.denon232.async_receiver import (
+    MAX_QUEUED_COMMANDS,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    AsyncDenon232Receiver,
+)
+from custom_components.denon232.settle import SETTLE_TIMEOUT
+
+
+def _idle_receiver() -> AsyncDenon232Receiver:
+    """Return a receiver that takes commands but never writes them."""
+    receiver = AsyncDenon232Receiver("/dev/null")
+    receiver._loop = asyncio.get_running_loop()
+    receiver._available = True
+    return receiver
+
+
+def test_queue_bound_applies_to_every_job():
+    """Queries, batches and transactions wait for room like commands do."""
+
+    async def run() -> None:
+        receiver = _idle_receiver()
+        queues = receiver._queues
+        batch = asyncio.create_task(
+            receiver.batch_query([f"Q{i}?" for i in range(MAX_QUEUED_COMMANDS + 4)])
+        )
+        await asyncio.sleep(0)
+        assert len(queues[PRIORITY_BACKGROUND]) == MAX_QUEUED_COMMANDS
+
+        transaction = asyncio.create_task(
+            receiver.transaction([f"MV{i:02d}" for i in range(MAX_QUEUED_COMMANDS)])
+        )
+        query = asyncio.create_task(receiver.serial_command("PW?", response=True))
+        await asyncio.sleep(0)
+        assert len(queues[PRIORITY_INTERACTIVE]) == MAX_QUEUED_COMMANDS
+        assert not query.done()
+
+        # Each job the scheduler takes lets one more in
+        receiver._next_job()
+        await asyncio.sleep(0)
+        assert len(queues[PRIORITY_INTERACTIVE]) == MAX_QUEUED_COMMANDS
+        assert queues[PRIORITY_INTERACTIVE][-1].cmd == "PW?"
+        # Once the interactive jobs are through, the batch moves on
+        while queues[PRIORITY_INTERACTIVE]:
+            receiver._next_job()
+        assert receiver._next_job().cmd == "Q0?"
+        await asyncio.sleep(0)
+        assert len(queues[PRIORITY_BACKGROUND]) == MAX_QUEUED_COMMANDS
+        assert queues[PRIORITY_BACKGROUND][-1].cmd == f"Q{MAX_QUEUED_COMMANDS}?"
+
+        for task in (batch, transaction, query):
+            task.cancel()
+
+    asyncio.run(run())
+
+
+class _FakePort:
+    """A port that takes every write and returns what the test queued."""
+
+    def __init__(self) -> None:
+        self.written: list[bytes] = []
+        self.incoming = bytearray()
+
+    def read(self) -> bytes:
+        data, self.incoming[:] = bytes(self.incoming), b""
+        return data
+
+    def write(self, data: bytes) -> int:
+        self.written.append(data)
+        return len(data)
+
+
+def test_answering_names_the_query_a_line_answers():
+    """Replies carry the number of their query's write, echoes none."""
+
+    async def run() -> None:
+        receiver = _idle_receiver()
+        port = receiver._port = _FakePort()
+        receiver._fd = -1
+        seen: list[tuple[str, int | None]] = []
+        receiver.add_listener(
+            lambda line, event: seen.append((line, receiver.answering))
+        )
+
+        poll = asyncio.create_task(receiver.batch_query(["MV?"], pipelined=True))
+        await asyncio.sleep(0)
+        receiver.service()
+        assert receiver.written == 1
+        # The user's command goes out while the poll is still unanswered
+        command = asyncio.create_task(receiver.serial_command("MV45"))
+        await asyncio.sleep(0)
+        receiver._next_write = 0
+        receiver.service()
+        assert port.written == [b"MV?\r", b"MV45\r"]
+        assert receiver.written == 2
+
+        port.incoming += b"MV40\rMV45\r"
+        receiver._on_readable()
+        assert seen == [("MV40", 1), ("MV45", None)]
+        assert receiver.answering is None
+        assert (await poll) == {"MV?": ["MV40"]}
+        await command
+
+    asyncio.run(run())
+
+
+def test_transaction_keeps_other_commands_off_the_wire():
+    """A command sent during a transaction cannot have its echo claimed."""
+
+    async def run() -> None:
+        receiver = _idle_receiver()
+        port = receiver._port = _FakePort()
+        receiver._fd = -1
+
+        transaction = asyncio.create_task(receiver.transaction(["MV45", "MUON"]))
+        await asyncio.sleep(0)
+        command = asyncio.create_task(receiver.serial_command("MV50"))
+        await asyncio.sleep(0)
+        for _ in range(3):
+            receiver._next_write = 0
+            receiver.service()
+        # The transaction's commands go back to back, the other one waits
+        assert port.written == [b"MV45\r", b"MUON\r"]
+
+        port.incoming += b"MV45\rMUON\r"
+        receiver._on_readable()
+        steps = await transaction
+        assert [(step.reply, step.confirmed) for step in steps] == [
+            (["MV45"], True),
+            (["MUON"], True),
+        ]
+        receiver._next_write = 0
+        receiver.service()
+        assert port.written[-1] == b"MV50\r"
+        await command
+
+    asyncio.run(run())
+
+
+def test_commands_held_while_settling():
+    """After PWON only probes go out, until one is answered."""
+
+    async def run() -> None:
+        receiver = _idle_receiver()
+        port = receiver._port = _FakePort()
+        receiver._fd = -1
+
+        power = asyncio.create_task(receiver.serial_command("PWON"))
+        source = asyncio.create_task(receiver.serial_command("SICD"))
+        await asyncio.sleep(0)
+        receiver.service()
+        await power
+        assert receiver._settle.settling
+        receiver._next_write = 0
+        assert receiver.service() is None
+        assert port.written == [b"PWON\r"]
+
+        # The echo does not count, the probe's answer does
+        receiver._probe_settled()
+        port.incoming += b"PWON\rZMON\r"
+        receiver._on_readable()
+        assert receiver._settle.settling
+        assert port.written == [b"PWON\r", b"SI?\r"]
+        port.incoming += b"SIDVD\r"
+        receiver._on_readable()
+        assert not receiver._settle.settling
+        receiver.service()
+        await source
+        assert port.written[-1] == b"SICD\r"
+
+    asyncio.run(run())
+
+
+def test_commands_released_after_settle_timeout(monkeypatch):
+    """A receiver that never answers the probe gets the commands anyway."""
+
+    async def run() -> None:
+        receiver = _idle_receiver()
+        port = receiver._port = _FakePort()
+        receiver._fd = -1
+
+        power = asyncio.create_task(receiver.serial_command("PWON"))
+        source = asyncio.create_task(receiver.serial_command("SICD"))
+        await asyncio.sleep(0)
+        receiver.service()
+        await power
+        started_at = receiver._settle.started_at
+
+        clock = SimpleNamespace(monotonic=lambda: started_at + SETTLE_TIMEOUT / 2)
+        monkeypatch.setattr(async_receiver, "time", clock)
+        receiver._probe_settled()
+        assert receiver._settle.settling
+        clock.monotonic = lambda: started_at + SETTLE_TIMEOUT
+        receiver._probe_settled()
+        assert not receiver._settle.settling
+        # Probes went out meanwhile, none after giving up
+        assert port.written == [b"PWON\r", b"SI?\r"]
+        receiver._next_write = 0
+        receiver.service()
+        await source
+        assert port.written[-1] == b"SICD\r"
+
+    asyncio.run(run())
@@ -0,0 +1,81 @@
+"""Tests for probing what the receiver supports."""
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.denon232.async_receiver import AsyncDenon232Receiver
+from custom_components.denon232.capabilities import (
+    Capabilities,
+    async_probe,
+    parse_source_usage,
+)
+from custom_components.denon232.const import POLL_QUERIES
+from custom_components.denon232.parser import ZONE_2, ZONE_MAIN
+
+
+def _probe(path: str) -> Capabilities | None:
+    async def run() -> Capabilities | None:
+        receiver = AsyncDenon232Receiver(path)
+        await receiver.connect()
+        try:
+            return await async_probe(receiver)
+        finally:
+            receiver.close()
+
+    return asyncio.run(run())
+
+
+def test_supports_everything_until_probed():
+    """Unprobed capabilities assume the AVR-2310."""
+    capabilities = Capabilities()
+    assert not capabilities.probed
+    assert capabilities.zone2
+    assert all(capabilities.supports(query) for query in POLL_QUERIES)
+
+
+def test_supports_leaves_out_unanswered():
+    """Only unanswered queries are unsupported."""
+    capabilities = Capabilities(probed=True, unanswered={"Z2?", "Z2MU?"})
+    assert not capabilities.zone2
+    assert not capabilities.supports("Z2?")
+    assert capabilities.supports("MV?")
+
+
+def test_stored_round_trip():
+    """Capabilities come back from storage as probed."""
+    capabilities = Capabilities(probed=True, unanswered={"Z2MU?"})
+    restored = Capabilities.from_dict(capabilities.as_dict())
+    assert restored == capabilities
+
+
+def test_parse_source_usage():
+    """SSSOD lines tell which sources are in use."""
+    lines = ["SSSODCD USE", "SSSODTV DEL", "SSSODNET USE", "SSSODEND", "MVMAX 98"]
+    assert parse_source_usage(lines) == {"CD": True, "TV": False, "NET": True}
+
+
+def test_probe_full_model(avr):
+    """An AVR-2310 answers every poll query and has a Zone 2."""
+    capabilities = _probe(avr.path)
+    assert capabilities.probed
+    assert capabilities.unanswered == set()
+    assert capabilities.zone2
+    assert capabilities.sources[ZONE_2]
+
+
+def test_probe_without_zone2(avr):
+    """A model without Zone 2 leaves its queries unanswered."""
+    avr._zone2 = lambda param: []
+    avr._zone2_mute = lambda param: []
+    capabilities = _probe(avr.path)
+    assert capabilities.unanswered == {"Z2?", "Z2MU?"}
+    assert not capabilities.zone2
+    assert not capabilities.supports("Z2?")
+    assert capabilities.sources[ZONE_2] == {}
+    assert capabilities.sources[ZONE_MAIN]
+
+
+def test_probe_in_standby(avr):
+    """A receiver in standby cannot be probed."""
+    avr.power = False
+    assert _probe(avr.path) is None
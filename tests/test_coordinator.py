@@ -0,0 +1,63 @@
+"""Tests for what the coordinator polls."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.denon232.capabilities import Capabilities
+from custom_components.denon232.const import (
+    MAIN_ZONE_QUERIES,
+    SCAN_INTERVAL,
+    STANDBY_QUERIES,
+    STANDBY_SCAN_INTERVAL,
+    ZONE2_OFF_QUERIES,
+    ZONE2_QUERIES,
+)
+from custom_components.denon232.coordinator import Denon232Coordinator
+from custom_components.denon232.parser import parse_line
+from custom_components.denon232.state import ReceiverState
+
+
+def _plan(lines: list[str], unanswered: set[str] | None = None):
+    """Return the plan for a receiver that last reported lines."""
+    state = ReceiverState()
+    for line in lines:
+        state.apply(parse_line(line))
+    coordinator = SimpleNamespace(
+        receiver=SimpleNamespace(state=state),
+        capabilities=Capabilities(probed=True, unanswered=unanswered or set()),
+    )
+    return Denon232Coordinator.plan(coordinator)
+
+
+@pytest.mark.parametrize("zone2", [[], ["Z2ON"], ["Z2OFF"]])
+def test_main_standby(zone2):
+    """A receiver in standby only gets the slow power heartbeat."""
+    assert _plan(["PWSTANDBY", *zone2]) == (STANDBY_QUERIES, STANDBY_SCAN_INTERVAL)
+
+
+def test_zone2_off():
+    """A zone that is off is only asked whether it came on."""
+    assert _plan(["PWON", "Z2OFF"]) == (
+        MAIN_ZONE_QUERIES + ZONE2_OFF_QUERIES,
+        SCAN_INTERVAL,
+    )
+
+
+@pytest.mark.parametrize("lines", [["PWON", "Z2ON"], ["PWON"], []])
+def test_both_on_or_unknown(lines):
+    """Everything is polled while on, or before the power is known."""
+    assert _plan(lines) == (MAIN_ZONE_QUERIES + ZONE2_QUERIES, SCAN_INTERVAL)
+
+
+def test_unsupported_queries_filtered():
+    """Queries the model never answered are left out."""
+    queries, interval = _plan(["PWON", "Z2ON"], unanswered={"Z2?", "Z2MU?"})
+    assert queries == MAIN_ZONE_QUERIES
+    assert interval == SCAN_INTERVAL
+    queries, _ = _plan(["PWON", "Z2OFF"], unanswered={"Z2MU?"})
+    assert queries == MAIN_ZONE_QUERIES + ZONE2_OFF_QUERIES
+    queries, _ = _plan(["PWON"], unanswered={"MU?"})
+    assert "MU?" not in queries
+    assert "MV?" in queries
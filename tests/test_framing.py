@@ -0,0 +1,74 @@
+"""Tests for line framing."""
+from __future__ import annotations
+
+from custom_components.denon232.framing import LineFramer
+
+
+def test_lines_split_across_reads():
+    """A line completes when its CR arrives, however it was split."""
+    framer = LineFramer()
+    assert framer.feed(b"PWO") == []
+    assert len(framer) == 3
+    assert framer.feed(b"N\rMV5") == ["PWON"]
+    assert framer.feed(b"0\rMVMAX 98\r") == ["MV50", "MVMAX 98"]
+    assert len(framer) == 0
+    assert framer.errors == 0
+
+
+def test_empty_lines_skipped():
+    """Empty lines and stray whitespace are not lines."""
+    framer = LineFramer()
+    assert framer.feed(b"\r\r MUOFF \r\n\r") == ["MUOFF"]
+    assert framer.errors == 0
+
+
+def test_noise_drops_only_its_line():
+    """A line hit by noise is dropped, the lines around it are kept."""
+    errors = []
+    framer = LineFramer(on_error=lambda: errors.append(1))
+    assert framer.feed(b"PWON\rMV\xf550\rSIDVD\r") == ["PWON", "SIDVD"]
+    assert framer.errors == 1
+    assert len(errors) == 1
+
+
+def test_unprintable_ascii_dropped():
+    """Control characters inside a line count as noise too."""
+    framer = LineFramer()
+    assert framer.feed(b"MU\x01OFF\rMUON\r") == ["MUON"]
+    assert framer.errors == 1
+
+
+def test_raw_gets_every_line():
+    """raw sees the bytes of damaged lines as well."""
+    raw = []
+    framer = LineFramer()
+    framer.feed(b"PWON\rMV\xf550\r", raw.append)
+    assert raw == [b"PWON", b"MV\xf550"]
+
+
+def test_overrun_skips_to_next_line():
+    """A run too long to be a line is dropped up to the next CR."""
+    framer = LineFramer(max_line=8)
+    assert framer.feed(b"XXXXXXXXXXXX") == []
+    assert framer.errors == 1
+    assert len(framer) == 0
+    assert framer.feed(b"XXXX\rPWON\r") == ["PWON"]
+    assert framer.errors == 1
+
+
+def test_overrun_with_noise():
+    """The tail of an overrun is skipped in damaged reads as well."""
+    framer = LineFramer(max_line=8)
+    framer.feed(b"XXXXXXXXXXXX")
+    assert framer.feed(b"X\xf5X\rMUON\r") == ["MUON"]
+    assert framer.errors == 1
+
+
+def test_clear_drops_partial_line():
+    """Clearing forgets a partial line and a skipped run."""
+    framer = LineFramer(max_line=8)
+    framer.feed(b"XXXXXXXXXXXX")
+    framer.clear()
+    assert framer.feed(b"MV") == []
+    framer.clear()
+    assert framer.feed(b"PWON\r") == ["PWON"]
@@ -0,0 +1,131 @@
+"""Tests for servicing many receivers from one task."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from custom_components.denon232.hub import Denon232Hub
+
+
+class _FakeReceiver:
+    """Stands in for a receiver, writing one queued command per turn."""
+
+    def __init__(self, hub: Denon232Hub, name: str, log: list[str]) -> None:
+        self.hub = hub
+        self.name = name
+        self.log = log
+        self.commands: list[str] = []
+        # Set to run inside the next service() call that finds no work
+        self.during_service = None
+        hub._receivers.append(self)
+
+    def submit(self, *commands: str) -> None:
+        self.commands.extend(commands)
+        self.hub.wake(self)
+
+    def service(self) -> float | None:
+        if not self.commands:
+            # Found idle, then woken before the turn is over
+            if (during := self.during_service) is not None:
+                self.during_service = None
+                during()
+            return None
+        self.log.append(f"{self.name} {self.commands.pop(0)}")
+        return time.monotonic()
+
+    def close(self) -> None:
+        self.hub.remove(self)
+
+
+async def _start(hub: Denon232Hub) -> None:
+    hub._task = asyncio.get_running_loop().create_task(hub._run())
+    await asyncio.sleep(0)
+
+
+async def _settle() -> None:
+    """Let the hub run until it has nothing left to do."""
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def test_round_robin():
+    """A busy receiver gets one command per turn, like every other one."""
+
+    async def run() -> None:
+        hub = Denon232Hub()
+        log: list[str] = []
+        busy = _FakeReceiver(hub, "busy", log)
+        quiet = _FakeReceiver(hub, "quiet", log)
+        try:
+            await _start(hub)
+            busy.submit(*(f"MV{i}" for i in range(10)))
+            quiet.submit("SICD", "MUON")
+            await _settle()
+        finally:
+            hub.close()
+        assert log[:5] == [
+            "busy MV0",
+            "quiet SICD",
+            "busy MV1",
+            "quiet MUON",
+            "busy MV2",
+        ]
+        assert len(log) == 12
+
+    asyncio.run(run())
+
+
+def test_wake_during_service_not_lost():
+    """Work that arrives while a receiver takes its turn gets another turn."""
+
+    async def run() -> None:
+        hub = Denon232Hub()
+        log: list[str] = []
+        receiver = _FakeReceiver(hub, "avr", log)
+        try:
+            await _start(hub)
+            # Nothing to write yet, but work arrives during the turn
+            receiver.during_service = lambda: receiver.submit("PWON")
+            hub.wake(receiver)
+            await _settle()
+        finally:
+            hub.close()
+        assert log == ["avr PWON"]
+
+    asyncio.run(run())
+
+
+def test_stale_timer_entries():
+    """A wake supersedes a pending timer, which then gives no extra turn."""
+
+    async def run() -> None:
+        hub = Denon232Hub()
+        log: list[str] = []
+        receiver = _FakeReceiver(hub, "avr", log)
+        turns = 0
+        service = receiver.service
+
+        def counting_service() -> float | None:
+            nonlocal turns
+            turns += 1
+            return service()
+
+        receiver.service = counting_service
+        try:
+            due = time.monotonic() + 0.05
+            hub._wait_until(receiver, due)
+            await _start(hub)
+            receiver.submit("PWON")
+            await _settle()
+            assert log == ["avr PWON"]
+            assert turns == 2
+            # The superseded entry is dropped rather than waited on
+            assert hub._timers == []
+            hub._release_timers(due + 1)
+            assert not hub._ready
+            await asyncio.sleep(0.1)
+            assert turns == 2
+        finally:
+            hub.close()
+
+    asyncio.run(run())
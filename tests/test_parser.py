@@ -0,0 +1,71 @@
+"""Tests for the status line parser."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.denon232.parser import (
+    ZONE_2,
+    ZONE_MAIN,
+    ChannelVolumeEvent,
+    MaxVolumeEvent,
+    MuteEvent,
+    PowerEvent,
+    SourceEvent,
+    SurroundModeEvent,
+    VolumeEvent,
+    ZonePowerEvent,
+    parse_level,
+    parse_line,
+)
+
+
+@pytest.mark.parametrize(
+    ("line", "event"),
+    [
+        ("PWON", PowerEvent(True)),
+        ("PWSTANDBY", PowerEvent(False)),
+        ("ZMON", ZonePowerEvent(ZONE_MAIN, True)),
+        ("ZMOFF", ZonePowerEvent(ZONE_MAIN, False)),
+        ("MV50", VolumeEvent(ZONE_MAIN, 50)),
+        ("MV505", VolumeEvent(ZONE_MAIN, 50.5)),
+        ("MV99", VolumeEvent(ZONE_MAIN, 0)),
+        ("MVMAX 98", MaxVolumeEvent(ZONE_MAIN, 98)),
+        ("MVMAX 805", MaxVolumeEvent(ZONE_MAIN, 80.5)),
+        ("MUON", MuteEvent(ZONE_MAIN, True)),
+        ("MUOFF", MuteEvent(ZONE_MAIN, False)),
+        ("SIDVD", SourceEvent(ZONE_MAIN, "DVD")),
+        ("SISAT/CBL", SourceEvent(ZONE_MAIN, "SAT/CBL")),
+        ("MSSTEREO", SurroundModeEvent("STEREO")),
+        ("CVFL 50", ChannelVolumeEvent(ZONE_MAIN, "FL", 50)),
+        ("CVSW 00", ChannelVolumeEvent(ZONE_MAIN, "SW", None)),
+        ("Z2ON", ZonePowerEvent(ZONE_2, True)),
+        ("Z2OFF", ZonePowerEvent(ZONE_2, False)),
+        ("Z240", VolumeEvent(ZONE_2, 40)),
+        ("Z2CD", SourceEvent(ZONE_2, "CD")),
+        ("Z2MUON", MuteEvent(ZONE_2, True)),
+        ("Z2CVFL 50", ChannelVolumeEvent(ZONE_2, "FL", 50)),
+    ],
+)
+def test_parse_line(line, event):
+    """Every known line parses to its event."""
+    assert parse_line(line) == event
+
+
+@pytest.mark.parametrize(
+    "line",
+    ["", "P", "XX50", "PWMAYBE", "MV", "MVUP", "MV5", "MV5050", "MUMAYBE", "SI",
+     "Z2", "Z2QUICK1", "CVFL", "CVFL XX"],
+)
+def test_parse_line_unknown(line):
+    """Unknown or malformed lines parse to None."""
+    assert parse_line(line) is None
+
+
+@pytest.mark.parametrize(
+    ("param", "level"),
+    [("00", 0), ("50", 50), ("505", 50.5), ("99", 99), ("5", None), ("504", None),
+     ("5a", None), ("5050", None)],
+)
+def test_parse_level(param, level):
+    """Levels have two digits and an optional half step."""
+    assert parse_level(param) == level
@@ -0,0 +1,72 @@
+"""Replay of a poll cycle against the simulated receiver."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from custom_components.denon232.async_receiver import AsyncDenon232Receiver
+from custom_components.denon232.const import POLL_QUERIES
+from custom_components.denon232.parser import ZONE_MAIN, parse_line
+from custom_components.denon232.recorder import RX, TX, read_capture
+from custom_components.denon232.state import ReceiverState
+
+
+async def _poll(path: str, capture: str):
+    """Run one pipelined poll cycle while recording, return what was seen."""
+    receiver = AsyncDenon232Receiver(path)
+    received = []
+    receiver.add_listener(lambda line, event: received.append((line, event)))
+    await receiver.connect()
+    receiver.start_recording(capture)
+    try:
+        results = await receiver.batch_query(POLL_QUERIES, pipelined=True)
+        # Closing forgets the state
+        state = _values(receiver.state)
+    finally:
+        receiver.stop_recording()
+        receiver.close()
+    return results, received, state
+
+
+def _values(state: ReceiverState) -> dict:
+    """Return the values of a state without their age."""
+    return {
+        zone: {field: value["value"] for field, value in fields.items()}
+        for zone, fields in state.as_dict().items()
+    }
+
+
+def _read_frames(capture: str, count: int) -> list:
+    """Return the frames of a capture once the recorder wrote them all."""
+    deadline = time.monotonic() + 2
+    while True:
+        frames = list(read_capture(capture))
+        if len(frames) >= count or time.monotonic() > deadline:
+            return frames
+        time.sleep(0.01)
+
+
+def test_poll_cycle(avr, tmp_path):
+    """Each query gets its reply, and every line is parsed once."""
+    expected = {query: avr.handle(query) for query in POLL_QUERIES}
+    capture = str(tmp_path / "poll.cap")
+
+    results, received, state = asyncio.run(_poll(avr.path, capture))
+
+    assert results == expected
+    lines = [line for reply in expected.values() for line in reply]
+    assert sorted(line for line, _ in received) == sorted(lines)
+    assert all(event == parse_line(line) for line, event in received)
+
+    # The capture replays to the same traffic and the same state
+    frames = _read_frames(capture, len(POLL_QUERIES) + len(lines))
+    sent = [frame.data.decode() for frame in frames if frame.direction == TX]
+    replies = [frame.data.decode() for frame in frames if frame.direction == RX]
+    assert sent == POLL_QUERIES
+    assert sorted(replies) == sorted(lines)
+
+    replayed = ReceiverState()
+    for line in replies:
+        replayed.apply(parse_line(line))
+    assert _values(replayed) == state
+    assert state[ZONE_MAIN]["volume"] == avr.volume
@@ -0,0 +1,200 @@
+"""Tests for reply matching."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from custom_components.denon232.protocol import (
+    OPTIONAL_GRACE,
+    ResponseCollector,
+    ResponseSpec,
+    coalesce_key,
+    echo_spec,
+    route_line,
+)
+
+
+def test_collector_single_line():
+    """A one line reply completes with its line and ignores others."""
+    collector = ResponseCollector("MU?")
+    collector.start(0.2)
+    assert not collector.feed("SIDVD")
+    assert not collector.complete
+    assert collector.feed("MUOFF")
+    assert collector.complete
+    assert collector.lines == ["MUOFF"]
+    # Only one line belongs to the reply
+    assert not collector.feed("MUON")
+
+
+def test_collector_optional_trailing_line():
+    """MV? is satisfied by MV50 and complete once MVMAX followed."""
+    collector = ResponseCollector("MV?")
+    collector.start(0.2)
+    collector.feed("MV50")
+    assert collector.satisfied
+    assert not collector.complete
+    # Only a short grace period is left for MVMAX
+    assert collector.deadline <= time.monotonic() + OPTIONAL_GRACE
+    assert collector.wait_time(0.2) == OPTIONAL_GRACE
+    collector.feed("MVMAX 98")
+    assert collector.complete
+    assert collector.lines == ["MV50", "MVMAX 98"]
+
+
+def test_collector_optional_line_missing():
+    """Without MVMAX the reply is done once the grace period ran out."""
+    collector = ResponseCollector("MV?")
+    collector.start(0.2)
+    collector.feed("MV50")
+    assert not collector.done(time.monotonic())
+    assert collector.done(time.monotonic() + OPTIONAL_GRACE)
+
+
+def test_collector_zone2_reply():
+    """Z2? takes three Z2 lines and leaves Z2MU and Z2CV to others."""
+    collector = ResponseCollector("Z2?")
+    collector.start(0.2)
+    assert not collector.feed("Z2MUOFF")
+    assert not collector.feed("Z2CVFL 50")
+    for line in ("Z2CD", "Z2ON"):
+        assert collector.feed(line)
+        assert not collector.complete
+    assert collector.feed("Z240")
+    assert collector.complete
+    assert collector.lines == ["Z2CD", "Z2ON", "Z240"]
+
+
+def test_collector_unknown_command():
+    """An unknown reply takes every line and never completes by itself."""
+    collector = ResponseCollector("SSSOD ?")
+    assert collector.spec is None
+    collector.start(0.2)
+    assert collector.feed("SSSODCD USE")
+    assert collector.feed("SSSODDVD DEL")
+    assert not collector.complete
+    # Each line moves the deadline on by the idle timeout
+    assert collector.deadline > time.monotonic() + 0.1
+    assert not collector.done(time.monotonic())
+    assert collector.done(collector.deadline)
+
+
+def test_collector_timeout():
+    """A reply that never comes is done at its deadline."""
+    collector = ResponseCollector("PW?")
+    collector.start(0.2)
+    assert not collector.done(collector.started_at)
+    assert collector.done(collector.started_at + 0.2)
+    assert collector.lines == []
+    assert collector.elapsed() <= 0.2
+
+
+
+def _in_flight(*commands: str) -> list[ResponseCollector]:
+    collectors = [ResponseCollector(cmd) for cmd in commands]
+    for collector in collectors:
+        collector.start(0.2)
+    return collectors
+
+
+def test_route_line_by_prefix():
+    """Pipelined replies go to the query they answer."""
+    pw, mv, mu, si = collectors = _in_flight("PW?", "MV?", "MU?", "SI?")
+    for line in ("PWON", "MV50", "MVMAX 98", "MUOFF", "SIDVD"):
+        assert route_line(collectors, line)
+    assert pw.lines == ["PWON"]
+    assert mv.lines == ["MV50", "MVMAX 98"]
+    assert mu.lines == ["MUOFF"]
+    assert si.lines == ["SIDVD"]
+    assert all(collector.complete for collector in collectors)
+
+
+def test_route_line_most_specific_prefix():
+    """Z2MU lines go to Z2MU? even though Z2? was sent first."""
+    zone2, mute = collectors = _in_flight("Z2?", "Z2MU?")
+    for line in ("Z2CD", "Z2MUOFF", "Z2ON", "Z240"):
+        assert route_line(collectors, line)
+    assert zone2.lines == ["Z2CD", "Z2ON", "Z240"]
+    assert mute.lines == ["Z2MUOFF"]
+
+
+def test_route_line_oldest_first():
+    """Of two queries for the same reply, the older one gets it first."""
+    first, second = collectors = _in_flight("MU?", "MU?")
+    assert route_line(collectors, "MUOFF")
+    assert route_line(collectors, "MUON")
+    assert first.lines == ["MUOFF"]
+    assert second.lines == ["MUON"]
+
+
+def test_route_line_unclaimed():
+    """Lines no pending query waits for are left alone."""
+    collectors = _in_flight("PW?")
+    assert not route_line(collectors, "SIDVD")
+    assert route_line(collectors, "PWON")
+    # The reply is complete, a pushed power change is not part of it
+    assert not route_line(collectors, "PWSTANDBY")
+    assert collectors[0].lines == ["PWON"]
+
+
+@pytest.mark.parametrize(
+    ("cmd", "key"),
+    [
+        ("MV50", "MV"),
+        ("MV505", "MV"),
+        ("SIDVD", "SI"),
+        ("Z240", "Z2 volume"),
+        ("Z2CD", "Z2 source"),
+        # Steps, switches and queries all have to reach the receiver
+        ("MVUP", None),
+        ("MV?", None),
+        ("MUON", None),
+        ("PWON", None),
+        ("Z2ON", None),
+        ("Z2UP", None),
+        ("Z2MUON", None),
+        ("Z2CVFL 50", None),
+        ("Z2QUICK1", None),
+        ("Z2SOURCE", "Z2 source"),
+        ("Z2SAT/CBL", "Z2 source"),
+        # Other Zone 2 settings share the prefix but are no source
+        ("Z2SLP60", None),
+        ("Z2SLPOFF", None),
+        ("Z2CSST", None),
+        ("Z2HPFON", None),
+        ("Z2PSBAS 50", None),
+        ("Z2?", None),
+    ],
+)
+def test_coalesce_key(cmd, key):
+    """Only direct volume and source settings replace each other."""
+    assert coalesce_key(cmd) == key
+
+
+@pytest.mark.parametrize(
+    ("cmd", "spec"),
+    [
+        ("MV50", ResponseSpec("MV", exclude=("MVMAX",))),
+        ("MVUP", ResponseSpec("MV", exclude=("MVMAX",))),
+        ("SITUNER", ResponseSpec("SI")),
+        ("PWON", ResponseSpec("PW")),
+        ("Z2CD", ResponseSpec("Z2", exclude=("Z2MU", "Z2CV"))),
+        ("Z2MUON", ResponseSpec("Z2MU")),
+        # Queries have their own replies, unknown settings none
+        ("MV?", None),
+        ("PSBAS 50", None),
+    ],
+)
+def test_echo_spec(cmd, spec):
+    """A setting is confirmed by one line of its query's reply format."""
+    assert echo_spec(cmd) == spec
+
+
+def test_echo_confirms_setting():
+    """The echo of a setting completes its collector, MVMAX does not."""
+    collector = ResponseCollector("MV50", echo_spec("MV50"))
+    collector.start(0.2)
+    assert not collector.feed("MVMAX 98")
+    assert collector.feed("MV50")
+    assert collector.complete
@@ -0,0 +1,83 @@
+"""Tests for volume ramp planning."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.denon232.parser import ZONE_2, ZONE_MAIN
+from custom_components.denon232.ramp import (
+    MIN_STEP_INTERVAL,
+    format_level,
+    level_command,
+    plan_ramp,
+)
+
+
+@pytest.mark.parametrize(
+    ("level", "param"),
+    [(50, "50"), (50.5, "505"), (5, "05"), (0.5, "005"), (0, "99"), (-1, "99")],
+)
+def test_format_level(level, param):
+    """Levels have two digits, a trailing 5 for a half step, 99 for none."""
+    assert format_level(level) == param
+
+
+def test_level_command():
+    """Each zone has its own prefix."""
+    assert level_command(ZONE_MAIN, 40.5) == "MV405"
+    assert level_command(ZONE_2, 40) == "Z240"
+
+
+def test_plan_every_step():
+    """A slow ramp writes every half step, evenly spaced, ending on time."""
+    plan = plan_ramp(40, 45, 10)
+    assert [level for _, level in plan] == [40.5 + i * 0.5 for i in range(10)]
+    assert plan[-1] == (10, 45)
+    offsets = [offset for offset, _ in plan]
+    assert offsets == sorted(offsets)
+    assert offsets[0] == pytest.approx(1.0)
+
+
+def test_plan_down():
+    """Ramps down step the other way."""
+    plan = plan_ramp(45, 43, 4, step=1.0)
+    assert plan == [(2.0, 44), (4, 43)]
+
+
+def test_plan_leaves_out_levels_when_fast():
+    """Writes keep min_interval apart and the target stays at the end."""
+    plan = plan_ramp(20, 60, 1)
+    offsets = [offset for offset, _ in plan]
+    assert plan[-1] == (1, 60)
+    assert len(plan) < 80
+    assert all(b - a >= MIN_STEP_INTERVAL for a, b in zip(offsets, offsets[1:]))
+
+
+def test_plan_rounds_target():
+    """Targets are rounded onto the zone's steps."""
+    assert plan_ramp(40, 40.7, 1)[-1][1] == 40.5
+    assert plan_ramp(40, 41.4, 1, step=1.0)[-1][1] == 41
+
+
+def test_plan_nothing_to_do():
+    """A ramp to the current level writes nothing."""
+    assert plan_ramp(40, 40.2, 5) == []
+
+
+def test_plan_no_duration():
+    """Without time the target is written at once."""
+    assert plan_ramp(40, 50, 0) == [(0.0, 50)]
+
+
+@pytest.mark.parametrize("curve", ["ease_in", "ease_out"])
+def test_plan_curves(curve):
+    """Curves change when levels are written, not which ones or the end."""
+    linear = plan_ramp(40, 45, 10)
+    curved = plan_ramp(40, 45, 10, curve)
+    assert [level for _, level in curved] == [level for _, level in linear]
+    assert curved[-1] == linear[-1]
+    halfway = curved[len(curved) // 2 - 1][0]
+    if curve == "ease_in":
+        # Slow start, the first half of the way takes longer
+        assert halfway > linear[len(linear) // 2 - 1][0]
+    else:
+        assert halfway < linear[len(linear) // 2 - 1][0]
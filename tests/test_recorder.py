@@ -0,0 +1,67 @@
+"""Tests for the traffic capture."""
+from __future__ import annotations
+
+import struct
+
+from custom_components.denon232.recorder import (
+    RX,
+    TX,
+    TrafficRecorder,
+    capture_files,
+    capture_sessions,
+    read_capture,
+    read_captures,
+)
+
+
+def _record(path: str, lines: list[bytes], max_bytes: int) -> None:
+    """Record lines in one recording, as sent and received in turn."""
+    recorder = TrafficRecorder(path, max_bytes=max_bytes, backup_count=5)
+    for index, line in enumerate(lines):
+        recorder.record(TX if index % 2 == 0 else RX, line)
+    recorder.close()
+
+
+def test_rotated_files_of_one_recording(tmp_path):
+    """Files rotated while recording form one session and one timeline."""
+    path = str(tmp_path / "avr.cap")
+    lines = [f"MV{i:02d}".encode() for i in range(20)]
+    _record(path, lines, max_bytes=64)
+
+    files = capture_files(path)
+    assert len(files) > 1
+    assert capture_sessions(files) == [files]
+    frames = list(read_captures(files))
+    assert [frame.data for frame in frames] == lines
+    assert [frame.time for frame in frames] == sorted(frame.time for frame in frames)
+
+
+def test_separate_recordings(tmp_path):
+    """A new recording rotates the old one away and starts a session."""
+    path = str(tmp_path / "avr.cap")
+    _record(path, [b"PW?", b"PWON", b"MV?", b"MV50"], max_bytes=32)
+    _record(path, [b"PWSTANDBY", b"PWSTANDBY"], max_bytes=1024)
+
+    files = capture_files(path)
+    sessions = capture_sessions(files)
+    assert len(sessions) == 2
+    assert sessions[-1] == [path]
+    assert [f.data for f in read_captures(sessions[0])] == [
+        b"PW?",
+        b"PWON",
+        b"MV?",
+        b"MV50",
+    ]
+    assert next(read_capture(path)).time == 0
+
+
+def test_first_format_version(tmp_path):
+    """Captures from before sessions were recorded still read."""
+    path = tmp_path / "old.cap"
+    path.write_bytes(
+        struct.pack("<8sd", b"D232CAP1", 0.0)
+        + struct.pack("<IBB", 0, RX, 4)
+        + b"PWON"
+    )
+    assert [f.data for f in read_capture(str(path))] == [b"PWON"]
+    assert capture_sessions([str(path), str(path)]) == [[str(path)], [str(path)]]
@@ -0,0 +1,46 @@
+"""Tests for scene commands."""
+from __future__ import annotations
+
+from custom_components.denon232.parser import ZONE_2, ZONE_MAIN
+from custom_components.denon232.scene import ZoneScene, scene_commands
+
+
+def test_zone_commands_power_first():
+    """Power comes first, then source, volume and mute."""
+    scene = ZoneScene(power=True, source="DVD", volume=45.5, mute=False)
+    assert scene.commands(ZONE_MAIN) == ["PWON", "SIDVD", "MV455", "MUOFF"]
+    scene = ZoneScene(power=True, source="CD", volume=30, mute=True)
+    assert scene.commands(ZONE_2) == ["Z2ON", "Z2CD", "Z230", "Z2MUON"]
+
+
+def test_zone_commands_leave_unset_alone():
+    """Settings left at None send nothing."""
+    assert ZoneScene(volume=30).commands(ZONE_MAIN) == ["MV30"]
+    assert ZoneScene().commands(ZONE_2) == []
+
+
+def test_zone_commands_round_volume():
+    """Volumes are rounded onto the zone's steps."""
+    assert ZoneScene(volume=30.3).commands(ZONE_MAIN) == ["MV305"]
+    assert ZoneScene(volume=30.3).commands(ZONE_2) == ["Z230"]
+
+
+def test_zone_off_sends_only_off():
+    """A zone switched off takes nothing else."""
+    scene = ZoneScene(power=False, source="CD", volume=20, mute=True)
+    assert scene.commands(ZONE_MAIN) == ["PWSTANDBY"]
+    assert scene.commands(ZONE_2) == ["Z2OFF"]
+
+
+def test_scene_main_on_first():
+    """Switching the receiver on comes before Zone 2."""
+    commands = scene_commands(
+        ZoneScene(power=True, source="TUNER"), ZoneScene(power=True, volume=40)
+    )
+    assert commands == ["PWON", "SITUNER", "Z2ON", "Z240"]
+
+
+def test_scene_main_off_last():
+    """Standby comes after Zone 2, which it would switch off too."""
+    commands = scene_commands(ZoneScene(power=False), ZoneScene(source="CD", mute=True))
+    assert commands == ["Z2CD", "Z2MUON", "PWSTANDBY"]
@@ -0,0 +1,64 @@
+"""Tests for holding commands while the receiver powers up."""
+from __future__ import annotations
+
+from custom_components.denon232.settle import SETTLE_TIMEOUT, PowerSettle
+
+
+def _settling(cmd: str = "PWON") -> PowerSettle:
+    """Return a tracker waiting after cmd was sent to a receiver in standby."""
+    settle = PowerSettle()
+    settle.observe("PWSTANDBY")
+    assert settle.begin(cmd)
+    assert settle.settling
+    return settle
+
+
+def test_release_on_probe_reply():
+    """Only an answer to the probe shows the receiver listens again."""
+    settle = _settling()
+    # The echo and the zones it switched on come before the start-up
+    for line in ("PWON", "ZMON", "MVMAX 98"):
+        assert not settle.observe(line)
+        assert settle.settling
+    assert settle.power is True
+    assert settle.observe("SIDVD")
+    assert not settle.settling
+
+
+def test_release_on_timeout():
+    """A receiver that never answers is given up on."""
+    settle = _settling("Z2ON")
+    assert not settle.expired(settle.started_at + SETTLE_TIMEOUT - 0.01)
+    assert settle.settling
+    assert settle.expired(settle.started_at + SETTLE_TIMEOUT)
+    assert not settle.settling
+    # Only once
+    assert not settle.expired(settle.started_at + 2 * SETTLE_TIMEOUT)
+
+
+def test_no_settling_when_on():
+    """Power commands to a receiver known to be on go through."""
+    settle = PowerSettle()
+    settle.observe("PWON")
+    assert not settle.begin("PWON")
+    assert not settle.begin("ZMON")
+    assert not settle.settling
+
+
+def test_only_power_on_commands():
+    """Other commands and a second power command do not start a wait."""
+    settle = PowerSettle()
+    assert not settle.begin("SICD")
+    assert settle.begin("PWON")
+    started_at = settle.started_at
+    assert not settle.begin("ZMON")
+    assert settle.started_at == started_at
+
+
+def test_reset():
+    """A lost connection forgets the power state and stops waiting."""
+    settle = _settling()
+    settle.reset()
+    assert not settle.settling
+    assert settle.power is None
+    assert not settle.observe("SICD")
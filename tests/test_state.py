@@ -0,0 +1,83 @@
+"""Tests for optimistic state."""
+from __future__ import annotations
+
+import time
+
+from custom_components.denon232.state import FIELD_MUTED, FIELD_VOLUME, OptimisticState
+
+
+def test_confirm():
+    """An answer with the expected value confirms it."""
+    state = OptimisticState()
+    state.expect(FIELD_VOLUME, 45, 40)
+    assert FIELD_VOLUME in state
+    assert state.resolve(FIELD_VOLUME, 45) is True
+    assert FIELD_VOLUME not in state
+    assert len(state) == 0
+
+
+def test_correct():
+    """An answer with another value, e.g. clamped, replaces it."""
+    state = OptimisticState()
+    state.expect(FIELD_VOLUME, 90, 40)
+    assert state.resolve(FIELD_VOLUME, 60) is False
+    assert FIELD_VOLUME not in state
+
+
+def test_resolve_nothing_pending():
+    """Answers for fields without a pending change are left to the caller."""
+    state = OptimisticState()
+    state.expect(FIELD_VOLUME, 45, 40)
+    assert state.resolve(FIELD_MUTED, True) is None
+    assert len(state) == 1
+
+
+def test_expire():
+    """Without an answer the value shown before comes back."""
+    state = OptimisticState(timeout=1.0)
+    state.expect(FIELD_VOLUME, 45, 40)
+    deadline = state.next_deadline()
+    assert deadline is not None
+    assert state.expire(deadline - 0.01) == {}
+    assert state.expire(deadline) == {FIELD_VOLUME: 40}
+    assert len(state) == 0
+    assert state.next_deadline() is None
+
+
+def test_expect_again_keeps_first_previous():
+    """Stepping twice before an answer rolls back to before the first step."""
+    state = OptimisticState()
+    state.expect(FIELD_VOLUME, 41, 40)
+    state.expect(FIELD_VOLUME, 42, 41)
+    assert state.expire(time.monotonic() + 2) == {FIELD_VOLUME: 40}
+
+
+def test_next_deadline_earliest():
+    """The earliest of several deadlines is next."""
+    state = OptimisticState(timeout=1.0)
+    state.expect(FIELD_VOLUME, 45, 40)
+    first = state.next_deadline()
+    time.sleep(0.01)
+    state.expect(FIELD_MUTED, True, False)
+    assert state.next_deadline() == first
+    assert state.expire(first) == {FIELD_VOLUME: 40}
+    assert FIELD_MUTED in state
+
+
+def test_stale_reply_ignored():
+    """A reply to a query written before the command reports the old value."""
+    state = OptimisticState()
+    state.expect(FIELD_VOLUME, 45, 40, after=2)
+    assert state.stale(FIELD_VOLUME, 1)
+    assert state.stale(FIELD_VOLUME, 2)
+    assert FIELD_VOLUME in state
+
+
+def test_later_reply_or_echo_resolves():
+    """Replies to later queries and echoes are answers to the command."""
+    state = OptimisticState()
+    state.expect(FIELD_VOLUME, 45, 40, after=2)
+    assert not state.stale(FIELD_VOLUME, 3)
+    assert not state.stale(FIELD_VOLUME, None)
+    assert not state.stale(FIELD_MUTED, 1)
+    assert state.resolve(FIELD_VOLUME, 45) is True
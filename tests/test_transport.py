@@ -0,0 +1,77 @@
+"""Tests for opening ports and serial bridge URLs."""
+from __future__ import annotations
+
+import socket
+
+import pytest
+import serial
+
+from custom_components.denon232.transport import (
+    LocalPort,
+    Rfc2217Port,
+    TcpPort,
+    is_url,
+    open_port,
+)
+
+
+@pytest.fixture
+def bridge():
+    """Return the port of a TCP listener standing in for a serial bridge."""
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        yield server.getsockname()[1]
+
+
+def test_is_url():
+    """Device paths are not URLs."""
+    assert is_url("socket://bridge:4001")
+    assert not is_url("/dev/ttyUSB0")
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "socket://host:abc",
+        "socket://host:99999",
+        "socket://host",
+        "socket://:4001",
+        "rfc2217://[::1:4001",
+        "telnet://host:23",
+    ],
+)
+def test_open_port_bad_url(url):
+    """Malformed and unsupported URLs fail like a port that cannot open."""
+    with pytest.raises(serial.SerialException):
+        open_port(url)
+
+
+@pytest.mark.parametrize(
+    ("scheme", "kind"), [("socket", TcpPort), ("rfc2217", Rfc2217Port)]
+)
+def test_open_port_url(bridge, scheme, kind):
+    """socket:// and rfc2217:// connect to the bridge without blocking."""
+    port = open_port(f"{scheme}://127.0.0.1:{bridge}")
+    try:
+        assert type(port) is kind
+        with pytest.raises(BlockingIOError):
+            port.read()
+    finally:
+        port.close()
+
+
+def test_open_port_refused():
+    """A bridge that is not there fails with an OSError."""
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        number = server.getsockname()[1]
+    with pytest.raises(OSError):
+        open_port(f"socket://127.0.0.1:{number}")
+
+
+def test_open_port_device(avr):
+    """A device path opens the local serial port."""
+    port = open_port(avr.path)
+    try:
+        assert isinstance(port, LocalPort)
+        assert port.write(b"PW?\r") == 4
+    finally:
+        port.close()
@@ -0,0 +1,655 @@
+"""
+Simulated Denon AVR-2310 on a Linux pseudo-terminal or a TCP port.
+
+Speaks the RS-232 protocol from avr2310_rs232.pdf well enough to run the
+integration and the benchmarks without a receiver attached:
+
+    python tools/avr_simulator.py --link /tmp/denon
+    # then use /tmp/denon as the serial port
+
+Replies arrive after a configurable latency and are paced at the line's
+baud rate. The simulator can push events on its own, as the receiver does
+when it is operated from the front panel, ignore commands while it settles
+after power on, and drop or garble bytes to exercise error handling.
+
+With --tcp PORT it listens on 127.0.0.1 instead, like an RS-232 to
+Ethernet bridge, and prints the socket:// URL to use; --rfc2217 makes it
+speak RFC 2217 (serial over telnet) and print an rfc2217:// URL. One
+client is served at a time, a new connection replaces the previous one.
+
+It can also be used from Python:
+
+    with SimulatedAVR(latency=0.03) as avr:
+        receiver = Denon232Receiver(avr.path)
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import itertools
+import os
+import pty
+import random
+import select
+import signal
+import socket
+import threading
+import time
+import tty
+
+# The receiver answers within 200 ms, usually well before that
+DEFAULT_LATENCY = 0.03
+# After PWON the receiver ignores commands for about a second
+DEFAULT_SETTLE = 1.0
+DEFAULT_BAUDRATE = 9600
+
+MAIN_SOURCES = [
+    "PHONO", "CD", "TUNER", "DVD", "HDP", "TV", "SAT/CBL",
+    "VCR", "DVR", "V.AUX", "SIRIUS", "IPOD",
+]
+ZONE2_SOURCES = [s for s in MAIN_SOURCES if s not in ("HDP", "TV")]
+SURROUND_MODES = ["DIRECT", "PURE DIRECT", "STEREO", "DOLBY DIGITAL", "DTS SURROUND"]
+CHANNELS = ["FL", "FR", "C", "SW", "SL", "SR"]
+
+# Telnet commands and the options of RFC 2217
+IAC = 255
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250
+SE = 240
+BINARY = 0
+SGA = 3
+COM_PORT_OPTION = 44
+# The server confirms a port setting with the client's command plus this
+SERVER_OFFSET = 100
+
+
+def format_level(level: float) -> str:
+    """Format a level as the protocol sends it: 50, or 505 for 50.5."""
+    whole = int(level)
+    if level - whole:
+        return f"{whole:02d}5"
+    return f"{whole:02d}"
+
+
+def parse_level(param: str) -> float | None:
+    """Parse a two or three digit level, None if param is not one."""
+    if not param.isdigit() or len(param) not in (2, 3):
+        return None
+    if len(param) == 3:
+        return int(param[:2]) + 0.5 if param[2] == "5" else None
+    return int(param)
+
+
+class TelnetServer:
+    """The bridge side of RFC 2217, as much of it as a client needs.
+
+    Binary mode and suppress-go-ahead are accepted, every port setting
+    is confirmed as requested and everything else is refused.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the negotiation state."""
+        self._state = "data"
+        self._verb = 0
+        self._subnegotiation = bytearray()
+        # Answers already sent, telnet forbids repeating them
+        self._sent: set[tuple[int, int]] = set()
+
+    def greeting(self) -> bytes:
+        """Return the options the bridge asks for when a client connects."""
+        data = bytearray()
+        for verb, option in (
+            (DO, BINARY),
+            (WILL, BINARY),
+            (WILL, SGA),
+            (DO, COM_PORT_OPTION),
+        ):
+            self._sent.add((verb, option))
+            data += bytes((IAC, verb, option))
+        return bytes(data)
+
+    def feed(self, data: bytes) -> tuple[bytes, bytes]:
+        """Return the serial data in data and the answers to send back."""
+        payload = bytearray()
+        answers = bytearray()
+        for byte in data:
+            state = self._state
+            if state == "data":
+                if byte == IAC:
+                    self._state = "iac"
+                else:
+                    payload.append(byte)
+            elif state == "iac":
+                self._state = "data"
+                if byte == IAC:
+                    payload.append(IAC)
+                elif byte in (DO, DONT, WILL, WONT):
+                    self._verb = byte
+                    self._state = "option"
+                elif byte == SB:
+                    self._subnegotiation.clear()
+                    self._state = "sb"
+            elif state == "option":
+                answers += self._answer(self._verb, byte)
+                self._state = "data"
+            elif state == "sb":
+                if byte == IAC:
+                    self._state = "sb_iac"
+                else:
+                    self._subnegotiation.append(byte)
+            elif byte == SE:
+                answers += self._confirm(bytes(self._subnegotiation))
+                self._state = "data"
+            else:
+                self._subnegotiation.append(byte)
+                self._state = "sb"
+        return bytes(payload), bytes(answers)
+
+    def _answer(self, verb: int, option: int) -> bytes:
+        """Return the answer to a negotiation, or nothing if already given."""
+        if verb == WILL:
+            answer = DO if option in (BINARY, SGA, COM_PORT_OPTION) else DONT
+        elif verb == DO:
+            answer = WILL if option in (BINARY, SGA) else WONT
+        elif verb == DONT:
+            answer = WONT
+        else:
+            answer = DONT
+        if (answer, option) in self._sent:
+            return b""
+        self._sent.add((answer, option))
+        return bytes((IAC, answer, option))
+
+    @staticmethod
+    def _confirm(subnegotiation: bytes) -> bytes:
+        """Confirm a port setting, the serial side accepts anything."""
+        if len(subnegotiation) < 2 or subnegotiation[0] != COM_PORT_OPTION:
+            return b""
+        command = subnegotiation[1] + SERVER_OFFSET
+        value = subnegotiation[2:].replace(b"\xff", b"\xff\xff")
+        return bytes((IAC, SB, COM_PORT_OPTION, command)) + value + bytes((IAC, SE))
+
+
+class SimulatedAVR:
+    """An AVR-2310 behind a pseudo-terminal or a TCP port."""
+
+    def __init__(
+        self,
+        latency: float = DEFAULT_LATENCY,
+        jitter: float = 0.0,
+        settle: float = DEFAULT_SETTLE,
+        baudrate: int | None = DEFAULT_BAUDRATE,
+        event_interval: float | None = None,
+        drop_rate: float = 0.0,
+        garble_rate: float = 0.0,
+        seed: int | None = None,
+        link: str | None = None,
+        tcp_port: int | None = None,
+        rfc2217: bool = False,
+    ) -> None:
+        """Initialize the simulator, call start() to open the terminal.
+
+        With tcp_port the simulator listens there instead, 0 picks a free
+        port; rfc2217 makes it speak RFC 2217 on that port.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.settle = settle
+        # None sends as fast as the terminal takes it
+        self.baudrate = baudrate
+        self.event_interval = event_interval
+        self.drop_rate = drop_rate
+        self.garble_rate = garble_rate
+        self.link = link
+        self.tcp_port = tcp_port
+        self.rfc2217 = rfc2217
+        self.random = random.Random(seed)
+
+        self.path = ""
+        # Every command received, with the time it arrived
+        self.received: list[tuple[float, str]] = []
+
+        self.power = True
+        self.main_zone = True
+        self.volume = 50.0
+        self.max_volume = 98.0
+        self.muted = False
+        self.source = "DVD"
+        self.surround_mode = "STEREO"
+        self.channels = dict.fromkeys(CHANNELS, 50.0)
+        self.zone2 = False
+        self.zone2_volume = 40.0
+        self.zone2_muted = False
+        self.zone2_source = "CD"
+        self._settled_at = 0.0
+
+        self._master: int | None = None
+        self._slave: int | None = None
+        self._listener: socket.socket | None = None
+        self._client: socket.socket | None = None
+        self._telnet: TelnetServer | None = None
+        self._outbox: list[tuple[float, int, bytes]] = []
+        self._sequence = itertools.count()
+        self._outbox_ready = threading.Condition()
+        self._sending = False
+        self._sent_at = 0.0
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def __enter__(self) -> SimulatedAVR:
+        """Start the simulator."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop the simulator."""
+        self.stop()
+
+    def start(self) -> str:
+        """Open the pseudo-terminal or port and return the path to connect to."""
+        if self.tcp_port is not None:
+            self._listener = socket.create_server(("127.0.0.1", self.tcp_port))
+            scheme = "rfc2217" if self.rfc2217 else "socket"
+            self.path = f"{scheme}://127.0.0.1:{self._listener.getsockname()[1]}"
+        else:
+            self._master, self._slave = pty.openpty()
+            tty.setraw(self._master)
+            tty.setraw(self._slave)
+            self.path = os.ttyname(self._slave)
+        if self.link and self._listener is None:
+            if os.path.lexists(self.link):
+                os.remove(self.link)
+            os.symlink(self.path, self.link)
+            self.path = self.link
+
+        self._stop.clear()
+        targets = [self._read_loop, self._write_loop]
+        if self.event_interval:
+            targets.append(self._event_loop)
+        self._threads = [
+            threading.Thread(target=target, daemon=True) for target in targets
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self.path
+
+    def stop(self) -> None:
+        """Stop answering and close the pseudo-terminal."""
+        self._stop.set()
+        with self._outbox_ready:
+            self._outbox_ready.notify()
+        for thread in self._threads:
+            thread.join(1)
+        if self._listener is not None:
+            self.disconnect()
+            self._listener.close()
+            self._listener = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def disconnect(self) -> None:
+        """Drop the TCP client, as a bridge does when it restarts."""
+        client, self._client = self._client, None
+        self._master = None
+        self._telnet = None
+        if client is not None:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            client.close()
+
+    def _accept(self) -> None:
+        """Serve a new TCP client in place of the current one."""
+        client, _ = self._listener.accept()
+        self.disconnect()
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.rfc2217:
+            self._telnet = TelnetServer()
+            client.sendall(self._telnet.greeting())
+        self._client = client
+        self._master = client.fileno()
+        if self.link and os.path.lexists(self.link):
+            os.remove(self.link)
+
+    def emit(self, *lines: str, delay: float = 0.0) -> None:
+        """Send lines on the receiver's own accord, after delay seconds."""
+        if not lines:
+            return
+        data = b"".join(f"{line}\r".encode("ascii") for line in lines)
+        with self._outbox_ready:
+            heapq.heappush(
+                self._outbox, (time.monotonic() + delay, next(self._sequence), data)
+            )
+            self._outbox_ready.notify()
+
+    def wait_idle(self, quiet: float = 0.1, timeout: float = 10.0) -> bool:
+        """Wait until nothing was received or sent for quiet seconds.
+
+        Returns False if the line did not go quiet within timeout.
+        """
+        end = time.monotonic() + timeout
+        while time.monotonic() < end:
+            with self._outbox_ready:
+                busy = bool(self._outbox) or self._sending
+            last = self.received[-1][0] if self.received else 0.0
+            if not busy and time.monotonic() - max(last, self._sent_at) >= quiet:
+                return True
+            time.sleep(quiet / 4)
+        return False
+
+    def _read_loop(self) -> None:
+        """Read commands from the terminal or client and answer them."""
+        buffer = b""
+        while not self._stop.is_set():
+            fd = self._master
+            waiting = [fd] if fd is not None else []
+            if self._listener is not None:
+                waiting.append(self._listener)
+            readable, _, _ = select.select(waiting, [], [], 0.1)
+            if self._listener in readable:
+                self._accept()
+                buffer = b""
+                continue
+            if not readable:
+                continue
+            try:
+                data = os.read(fd, 1024)
+            except OSError:
+                data = b""
+            if not data:
+                if self._listener is None:
+                    return
+                # The client went away, wait for the next one
+                if fd == self._master:
+                    self.disconnect()
+                continue
+            if self._telnet is not None:
+                data, answers = self._telnet.feed(data)
+                if answers:
+                    os.write(fd, answers)
+            buffer += data
+            while (end := buffer.find(b"\r")) >= 0:
+                command = buffer[:end].decode("ascii", errors="replace")
+                buffer = buffer[end + 1 :]
+                self.received.append((time.monotonic(), command))
+                reply = self.handle(command)
+                if reply:
+                    self.emit(*reply, delay=self._reply_delay())
+
+    def _reply_delay(self) -> float:
+        """Return how long the receiver takes to answer."""
+        if not self.jitter:
+            return self.latency
+        return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def _write_loop(self) -> None:
+        """Send queued lines when they are due, at the line's baud rate."""
+        while not self._stop.is_set():
+            with self._outbox_ready:
+                if not self._outbox:
+                    self._outbox_ready.wait(0.1)
+                    continue
+                due, _, data = self._outbox[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self._outbox_ready.wait(wait)
+                    continue
+                heapq.heappop(self._outbox)
+                self._sending = True
+            data = self._damage(data)
+            if self.baudrate:
+                # 8N1 puts ten bits on the wire per byte
+                time.sleep(len(data) * 10 / self.baudrate)
+            if self._telnet is not None:
+                data = data.replace(b"\xff", b"\xff\xff")
+            try:
+                if self._master is not None:
+                    os.write(self._master, data)
+            except OSError:
+                if self._listener is None:
+                    return
+                # Lost with the client, like bytes sent to an unplugged cable
+            finally:
+                self._sent_at = time.monotonic()
+                self._sending = False
+
+    def _damage(self, data: bytes) -> bytes:
+        """Drop and garble bytes at the configured rates."""
+        if not self.drop_rate and not self.garble_rate:
+            return data
+        damaged = bytearray()
+        for byte in data:
+            if self.random.random() < self.drop_rate:
+                continue
+            if self.random.random() < self.garble_rate:
+                byte = self.random.randrange(256)
+            damaged.append(byte)
+        return bytes(damaged)
+
+    def _event_loop(self) -> None:
+        """Now and then change something, as if the remote was used."""
+        while not self._stop.wait(self.event_interval):
+            if not self.power:
+                continue
+            match self.random.randrange(4):
+                case 0:
+                    step = self.random.choice((-1, 1))
+                    self.emit(*self.handle("MVUP" if step > 0 else "MVDOWN"))
+                case 1:
+                    self.emit(*self.handle("SI" + self.random.choice(MAIN_SOURCES)))
+                case 2:
+                    self.emit(*self.handle("MUOFF" if self.muted else "MUON"))
+                case _:
+                    self.emit(*self.handle("MS" + self.random.choice(SURROUND_MODES)))
+
+    def handle(self, command: str) -> list[str]:
+        """Apply one command and return the lines the receiver answers with.
+
+        Like the real receiver, changes are answered with the new state
+        of the parameter, and queries with the current one.
+        """
+        if command.startswith("PW"):
+            return self._power(command[2:])
+        if not self.power:
+            # In standby only power commands are accepted
+            return []
+        if time.monotonic() < self._settled_at:
+            # Still starting up, the command is lost
+            return []
+        if command.startswith("MV"):
+            return self._main_volume(command[2:])
+        if command.startswith("MU"):
+            return self._main_mute(command[2:])
+        if command.startswith("SI"):
+            return self._main_source(command[2:])
+        if command.startswith("ZM"):
+            return self._main_zone(command[2:])
+        if command.startswith("MS"):
+            if command != "MS?":
+                self.surround_mode = command[2:]
+            return [f"MS{self.surround_mode}"]
+        if command.startswith("CV"):
+            return self._channel_volume(command[2:])
+        if command.startswith("Z2MU"):
+            return self._zone2_mute(command[4:])
+        if command.startswith("Z2"):
+            return self._zone2(command[2:])
+        match command:
+            case "SD?":
+                return ["SDAUTO"]
+            case "DC?":
+                return ["DCAUTO"]
+            case "SV?":
+                return ["SVOFF"]
+            case "SLP?":
+                return ["SLPOFF"]
+        return []
+
+    def _power(self, param: str) -> list[str]:
+        if param == "ON" and not self.power:
+            self.power = True
+            self.main_zone = True
+            self._settled_at = time.monotonic() + self.settle
+            # Switching on also reports the main zone, before settling
+            return ["PWON", "ZMON"]
+        if param == "STANDBY":
+            self.power = False
+            self.zone2 = False
+        elif param != "?" and param != "ON":
+            return []
+        return ["PWON" if self.power else "PWSTANDBY"]
+
+    def _main_volume(self, param: str) -> list[str]:
+        if param == "?":
+            return [
+                f"MV{self._volume_param(self.volume)}",
+                f"MVMAX {format_level(self.max_volume)}",
+            ]
+        if param == "UP":
+            self.volume = min(self.volume + 0.5, self.max_volume)
+        elif param == "DOWN":
+            self.volume = max(self.volume - 0.5, 0.0)
+        elif (level := parse_level(param)) is not None:
+            self.volume = 0.0 if level >= 99 else min(level, self.max_volume)
+        else:
+            return []
+        return [f"MV{self._volume_param(self.volume)}"]
+
+    @staticmethod
+    def _volume_param(level: float) -> str:
+        # The minimum setting is sent as 99
+        return "99" if level == 0 else format_level(level)
+
+    def _main_mute(self, param: str) -> list[str]:
+        if param in ("ON", "OFF"):
+            self.muted = param == "ON"
+        elif param != "?":
+            return []
+        return ["MUON" if self.muted else "MUOFF"]
+
+    def _main_source(self, param: str) -> list[str]:
+        if param in MAIN_SOURCES:
+            self.source = param
+        elif param != "?":
+            return []
+        return [f"SI{self.source}"]
+
+    def _main_zone(self, param: str) -> list[str]:
+        if param in ("ON", "OFF"):
+            self.main_zone = param == "ON"
+        elif param != "?":
+            return []
+        return ["ZMON" if self.main_zone else "ZMOFF"]
+
+    def _channel_volume(self, param: str) -> list[str]:
+        if param == "?":
+            return [
+                f"CV{channel} {format_level(level)}"
+                for channel, level in self.channels.items()
+            ]
+        channel, _, value = param.partition(" ")
+        if channel not in self.channels:
+            return []
+        if value == "UP":
+            self.channels[channel] = min(self.channels[channel] + 0.5, 62.0)
+        elif value == "DOWN":
+            self.channels[channel] = max(self.channels[channel] - 0.5, 38.0)
+        elif (level := parse_level(value)) is not None:
+            self.channels[channel] = level
+        else:
+            return []
+        return [f"CV{channel} {format_level(self.channels[channel])}"]
+
+    def _zone2_mute(self, param: str) -> list[str]:
+        if param in ("ON", "OFF"):
+            self.zone2_muted = param == "ON"
+        elif param != "?":
+            return []
+        return ["Z2MUON" if self.zone2_muted else "Z2MUOFF"]
+
+    def _zone2(self, param: str) -> list[str]:
+        if param == "?":
+            return [
+                f"Z2{self.zone2_source}",
+                "Z2ON" if self.zone2 else "Z2OFF",
+                f"Z2{self._volume_param(self.zone2_volume)}",
+            ]
+        if param in ("ON", "OFF"):
+            self.zone2 = param == "ON"
+            return [f"Z2{param}"]
+        if param == "UP":
+            self.zone2_volume = min(self.zone2_volume + 1, 98.0)
+        elif param == "DOWN":
+            self.zone2_volume = max(self.zone2_volume - 1, 0.0)
+        elif (level := parse_level(param)) is not None:
+            self.zone2_volume = 0.0 if level >= 99 else level
+        elif param in ZONE2_SOURCES:
+            self.zone2_source = param
+            return [f"Z2{param}"]
+        else:
+            return []
+        return [f"Z2{self._volume_param(self.zone2_volume)}"]
+
+
+def main() -> None:
+    """Run the simulator until interrupted."""
+    parser = argparse.ArgumentParser(description="Simulated Denon AVR-2310")
+    parser.add_argument("--link", help="also reachable through this symlink")
+    parser.add_argument("--tcp", type=int, metavar="PORT",
+                        help="listen on this TCP port instead of a terminal")
+    parser.add_argument("--rfc2217", action="store_true",
+                        help="speak RFC 2217 on the TCP port")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                        help="seconds before a reply starts (default %(default)s)")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="random +/- variation of the latency")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE,
+                        help="seconds commands are ignored after PWON")
+    parser.add_argument("--baudrate", type=int, default=DEFAULT_BAUDRATE,
+                        help="pace replies at this rate, 0 for no pacing")
+    parser.add_argument("--events", type=float, metavar="SECONDS",
+                        help="push a random front panel change this often")
+    parser.add_argument("--drop-rate", type=float, default=0.0,
+                        help="probability of dropping each sent byte")
+    parser.add_argument("--garble-rate", type=float, default=0.0,
+                        help="probability of corrupting each sent byte")
+    parser.add_argument("--standby", action="store_true",
+                        help="start in standby")
+    parser.add_argument("--seed", type=int, help="seed for events and faults")
+    args = parser.parse_args()
+    if args.rfc2217 and args.tcp is None:
+        parser.error("--rfc2217 needs --tcp")
+
+    avr = SimulatedAVR(
+        latency=args.latency,
+        jitter=args.jitter,
+        settle=args.settle,
+        baudrate=args.baudrate or None,
+        event_interval=args.events,
+        drop_rate=args.drop_rate,
+        garble_rate=args.garble_rate,
+        seed=args.seed,
+        link=args.link,
+        tcp_port=args.tcp,
+        rfc2217=args.rfc2217,
+    )
+    avr.power = not args.standby
+    # Handled here, not in the simulator's threads
+    stop_signals = {signal.SIGINT, signal.SIGTERM}
+    signal.pthread_sigmask(signal.SIG_BLOCK, stop_signals)
+    print(f"Simulated AVR-2310 on {avr.start()}", flush=True)
+    try:
+        signal.sigwait(stop_signals)
+    finally:
+        avr.stop()
+
+
+if __name__ == "__main__":
+    main()
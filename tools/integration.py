@@ -0,0 +1,31 @@
+"""
+Import the integration's modules without Home Assistant.
+
+The receivers and their helpers do not need Home Assistant, but importing
+them through custom_components.denon232 runs the integration's __init__,
+which does. load_integration() registers the package without running it,
+so its modules import on a machine that only has pyserial.
+"""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+from pathlib import Path
+import sys
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "denon232"
+PACKAGE = "denon232"
+
+
+def load_integration(module: str):
+    """Import a module of the integration without running its __init__."""
+    if PACKAGE not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            PACKAGE,
+            PACKAGE_DIR / "__init__.py",
+            submodule_search_locations=[str(PACKAGE_DIR)],
+        )
+        # Registered but never executed
+        sys.modules[PACKAGE] = importlib.util.module_from_spec(spec)
+    return importlib.import_module(f"{PACKAGE}.{module}")
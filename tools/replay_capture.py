@@ -0,0 +1,106 @@
+"""
+Replay a serial traffic capture through the protocol parser.
+
+    python tools/replay_capture.py /config/denon232/<entry id>.cap [--speed 10]
+
+Rotated files next to the capture (.cap.1, .cap.2, ...) are replayed
+first, oldest to newest. Files from separate recordings are replayed as
+separate sessions, each with its own timeline. Every line is printed with the event it parses
+to, and received lines the parser does not understand are listed at the
+end, which is usually where a field problem shows up.
+
+--speed 0 replays as fast as possible and reports the parse rate, for
+profiling. --entities also applies the lines to the main zone and Zone 2
+media player entities and prints their final state; that needs Home
+Assistant to be installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+import time
+from types import SimpleNamespace
+
+from integration import load_integration
+
+
+def build_entities() -> list:
+    """Create both zone entities, fed by the replay instead of a receiver."""
+    media_player = load_integration("media_player")
+    capabilities = load_integration("capabilities").Capabilities()
+    coordinator = SimpleNamespace(receiver=None, capabilities=capabilities)
+    return [
+        media_player.DenonMainZone(coordinator, "Replay", "replay", "replay"),
+        media_player.DenonZone2(coordinator, "Replay", "replay", "replay"),
+    ]
+
+
+def main() -> None:
+    """Replay a capture from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("capture", help="capture file, rotated files are included")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed, 0 for as fast as possible")
+    parser.add_argument("--entities", action="store_true",
+                        help="apply the lines to the media player entities")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args()
+
+    recorder = load_integration("recorder")
+    parse_line = load_integration("parser").parse_line
+    entities = build_entities() if args.entities else []
+
+    files = recorder.capture_files(args.capture)
+    if not files:
+        parser.error(f"no capture at {args.capture}")
+
+    counts: Counter[str] = Counter()
+    unparsed: Counter[str] = Counter()
+
+    def handle(frame) -> None:
+        line = frame.data.decode("ascii", errors="backslashreplace")
+        if frame.direction == recorder.TX:
+            counts["sent"] += 1
+            if not args.quiet:
+                print(f"{frame.time:10.3f} > {line}")
+            return
+        counts["received"] += 1
+        event = parse_line(line.strip())
+        if event is None:
+            unparsed[line] += 1
+        for entity in entities:
+            entity._apply(event)  # pylint: disable=protected-access
+        if not args.quiet:
+            print(f"{frame.time:10.3f} < {line:20} {event or ''}")
+
+    sessions = recorder.capture_sessions(files)
+    start = time.perf_counter()
+    for number, session in enumerate(sessions, 1):
+        if len(sessions) > 1 and not args.quiet:
+            print(f"--- recording {number}: {', '.join(session)}")
+        recorder.replay(recorder.read_captures(session), handle, args.speed)
+    elapsed = time.perf_counter() - start
+
+    total = counts["sent"] + counts["received"]
+    print(
+        f"\n{len(files)} file(s) from {len(sessions)} recording(s), "
+        f"{counts['sent']} sent, "
+        f"{counts['received']} received in {elapsed:.3f} s"
+        + (f" ({total / elapsed:,.0f} lines/s)" if not args.speed and elapsed else "")
+    )
+    if unparsed:
+        print("Received lines the parser did not understand:")
+        for line, count in unparsed.most_common():
+            print(f"  {count:6}  {line}")
+    for entity in entities:
+        volume = entity.volume_level
+        print(
+            f"{entity.name}: {entity.state}, "
+            f"volume {'unknown' if volume is None else f'{volume:.3f}'}, "
+            f"muted {entity.is_volume_muted}, source {entity.source}"
+        )
+
+
+if __name__ == "__main__":
+    main()